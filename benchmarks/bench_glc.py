@@ -0,0 +1,313 @@
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+"""
+Benchmarks das etapas de um gráfico do GLC: interpretação da função (parse_function),
+avaliação da malha (pela função do lambdify e pelo programa de ufuncs, em float64 e float32, e
+com os eixos x[None, :] e y[:, None] em vez do meshgrid, com e sem a separação de glc.separable),
+avaliação de f e do gradiente, plt.contour, montagem da figura do plotly
+e savefig.
+
+Cada etapa é medida separadamente, para um conjunto fixo de expressões e em várias resoluções.
+O caso "startup" mede, em processos novos, o tempo de importar o pacote glc e o de uma chamada
+avulsa do comando glc-contour gravando um PNG, sem e com o cache de expressões em disco.
+O resultado é gravado em JSON e pode ser comparado com uma linha de base gravada antes:
+
+    python benchmarks/bench_glc.py --output bench.json --baseline benchmarks/baseline.json
+    python benchmarks/bench_glc.py --save-baseline benchmarks/baseline.json
+
+Os tempos dependem da máquina; grave a linha de base na mesma máquina em que a comparação será feita.
+"""
+
+EXPRESSIONS: Dict[str, str] = {
+    'sqrt': 'sqrt(x) + y',
+    'gaussian': 'exp(-x**2 - y**2)',
+    'log': 'x * log(y + 1)',
+    'trig_heavy': 'sin(x)*cos(y) + sin(2*x)*cos(3*y) + cos(x*y)*sin(x + y) + tan(x/7)**2 * cos(y)**3',
+    'polynomial': '(x**2 + y**2 - 1)**3 - x**2*y**3 + 3*x**5*y - 7*x*y**4 + x**6 - y**6',
+}
+
+RANGES = ((0.0, 10.0), (-5.0, 5.0))
+DEFAULT_RESOLUTIONS = (100, 400, 1000)
+
+_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+STARTUP_EXPRESSION = EXPRESSIONS['trig_heavy']
+
+
+def _time(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    # Uma chamada de aquecimento fora da medição (imports, caches de fontes etc.).
+    func()
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {'min': min(samples), 'median': statistics.median(samples)}
+
+
+def run_case(name: str, func_str: str, resolution: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Mede todas as etapas de um gráfico para uma expressão e uma resolução.
+
+    Args:
+        name (str): Nome do caso.
+        func_str (str): Expressão em x e y.
+        resolution (int): Pontos por eixo.
+        repeat (int): Número de repetições de cada etapa.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Tempo mínimo e mediano (segundos) de cada etapa.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import plotly.graph_objs as go
+    import sympy as sp
+    from glc.cache import ExpressionCache
+    from glc.fused import GradientEvaluator
+    from glc.program import compile_program
+
+    results: Dict[str, Dict[str, float]] = {}
+    results['parse'] = _time(lambda: ExpressionCache().compile(func_str), repeat)
+    cache = ExpressionCache()
+    f = cache.compile(func_str).func
+    results['parse_cached'] = _time(lambda: cache.compile(func_str), repeat)
+
+    x = np.linspace(RANGES[0][0], RANGES[0][1], resolution)
+    y = np.linspace(RANGES[1][0], RANGES[1][1], resolution)
+    X, Y = np.meshgrid(x, y)
+
+    def evaluate():
+        with np.errstate(all='ignore'):
+            return f(X, Y)
+
+    results['evaluate'] = _time(evaluate, repeat)
+
+    # Sem meshgrid: a mesma função com os eixos arranjados para broadcasting, e a função gerada sem
+    # separar as partes de uma variável (separable=False), para comparação.
+    plain = cache.compile_expr(cache.compile(func_str).expr, separable=False).func
+    x_row, y_col = x[None, :], y[:, None]
+
+    def evaluate_broadcast():
+        with np.errstate(all='ignore'):
+            return f(x_row, y_col)
+
+    def evaluate_broadcast_plain():
+        with np.errstate(all='ignore'):
+            return plain(x_row, y_col)
+
+    results['evaluate_broadcast'] = _time(evaluate_broadcast, repeat)
+    results['evaluate_broadcast_plain'] = _time(evaluate_broadcast_plain, repeat)
+
+    # Programa de ufuncs (glc.program): mesmos buffers a cada repetição; em float32, malha em float32.
+    program = compile_program(cache.compile(func_str).expr)
+    program32 = compile_program(cache.compile(func_str).expr, dtype=np.float32)
+    X32, Y32 = X.astype(np.float32), Y.astype(np.float32)
+
+    def evaluate_program():
+        with np.errstate(all='ignore'):
+            return program(X, Y)
+
+    def evaluate_program_f32():
+        with np.errstate(all='ignore'):
+            return program32(X32, Y32)
+
+    def evaluate_program_broadcast():
+        with np.errstate(all='ignore'):
+            return program(x_row, y_col)
+
+    results['evaluate_program'] = _time(evaluate_program, repeat)
+    results['evaluate_program_broadcast'] = _time(evaluate_program_broadcast, repeat)
+    results['evaluate_program_f32'] = _time(evaluate_program_f32, repeat)
+
+    expr = cache.compile(func_str).expr
+    xs, ys = sp.symbols('x y')
+    separate = [cache.compile_expr(e).func for e in (expr, sp.diff(expr, xs), sp.diff(expr, ys))]
+    fused = GradientEvaluator(expr, cache=cache)
+
+    def gradient_separate():
+        with np.errstate(all='ignore'):
+            return [g(X, Y) for g in separate]
+
+    def gradient_fused():
+        with np.errstate(all='ignore'):
+            return fused(X, Y)
+
+    results['gradient_separate'] = _time(gradient_separate, repeat)
+    results['gradient_fused'] = _time(gradient_fused, repeat)
+    Z = np.broadcast_to(np.asarray(evaluate(), dtype=float), X.shape)
+    levels = np.linspace(np.nanmin(Z), np.nanmax(Z), 10)
+
+    def contour():
+        fig = plt.figure(figsize=(8, 8))
+        contours = plt.contour(X, Y, Z, levels=levels, cmap='viridis')
+        plt.clabel(contours, inline=True, fontsize=8)
+        fig.canvas.draw()
+        plt.close(fig)
+
+    results['contour'] = _time(contour, repeat)
+
+    def plotly_figure():
+        surface = go.Surface(z=Z, x=X, y=Y, colorscale='inferno')
+        contours = go.Contour(z=Z, x=x, y=y, colorscale='inferno')
+        fig = go.Figure(data=[surface, contours])
+        return fig.to_json()
+
+    results['plotly_figure'] = _time(plotly_figure, repeat)
+
+    fig = plt.figure(figsize=(8, 8))
+    contours = plt.contour(X, Y, Z, levels=levels, cmap='viridis')
+    plt.clabel(contours, inline=True, fontsize=8)
+
+    def savefig():
+        fig.savefig(io.BytesIO(), format='png')
+
+    results['savefig'] = _time(savefig, repeat)
+    plt.close(fig)
+    return results
+
+
+def run_startup(repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Mede o custo de iniciar o GLC num processo novo.
+
+    Etapas: import_glc (import glc), import_parse_function (from glc import parse_function, já
+    resolvido), cli_contour (glc-contour com o cache em disco desligado) e cli_contour_cached (o
+    mesmo comando com o cache em disco já preenchido).
+
+    Args:
+        repeat (int): Número de repetições de cada etapa.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Tempo mínimo e mediano (segundos) de cada etapa.
+    """
+    workdir = tempfile.mkdtemp(prefix='glc-bench-')
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(_SRC), MPLBACKEND='Agg')
+    cli = [sys.executable, '-m', 'glc', 'contour', STARTUP_EXPRESSION, '--output', os.path.join(workdir, 'out.png')]
+    commands = {
+        'import_glc': ([sys.executable, '-c', 'import glc'], {}),
+        'import_parse_function': ([sys.executable, '-c', 'from glc import parse_function; parse_function'], {}),
+        'cli_contour': (cli, {'GLC_EXPR_CACHE_DIR': ''}),
+        'cli_contour_cached': (cli, {'GLC_EXPR_CACHE_DIR': os.path.join(workdir, 'cache')}),
+    }
+
+    def command(argv, extra_env):
+        def call():
+            subprocess.run(argv, env=dict(env, **extra_env), check=True, stdout=subprocess.DEVNULL)
+        return call
+
+    try:
+        return {stage: _time(command(argv, extra_env), repeat) for stage, (argv, extra_env) in commands.items()}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(resolutions=DEFAULT_RESOLUTIONS, repeat: int = 5, cases: List[str] = None,
+        startup: bool = True) -> Dict[str, object]:
+    """
+    Executa o conjunto de benchmarks.
+
+    Args:
+        resolutions (Sequence[int], optional): Resoluções medidas.
+        repeat (int, optional): Número de repetições de cada etapa.
+        cases (List[str], optional): Nomes das expressões (chaves de EXPRESSIONS). Se None, usa todas.
+        startup (bool, optional): Inclui o caso "startup" (import do pacote e chamada avulsa do comando).
+
+    Returns:
+        Dict[str, object]: Resultado com o ambiente e o tempo de cada etapa por caso ("nome@resolução").
+    """
+    results = {}
+    if startup:
+        results['startup'] = run_startup(repeat)
+    for name in cases or EXPRESSIONS:
+        for resolution in resolutions:
+            results[f"{name}@{resolution}"] = run_case(name, EXPRESSIONS[name], resolution, repeat)
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+        },
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], threshold: float = 1.25,
+            min_seconds: float = 1e-3) -> List[Dict[str, object]]:
+    """
+    Compara um resultado com a linha de base, usando o tempo mínimo de cada etapa.
+
+    Args:
+        current (Dict[str, object]): Resultado de run().
+        baseline (Dict[str, object]): Linha de base no mesmo formato.
+        threshold (float, optional): Razão atual/base a partir da qual a etapa é uma regressão.
+        min_seconds (float, optional): Diferenças absolutas menores que isso são ignoradas.
+
+    Returns:
+        List[Dict[str, object]]: Uma linha por etapa presente nos dois resultados.
+    """
+    rows = []
+    for case, stages in current['results'].items():
+        base_stages = baseline['results'].get(case, {})
+        for stage, timing in stages.items():
+            if stage not in base_stages:
+                continue
+            now, before = timing['min'], base_stages[stage]['min']
+            ratio = now / before if before > 0 else float('inf')
+            rows.append({'case': case, 'stage': stage, 'baseline': before, 'current': now, 'ratio': ratio,
+                         'regression': ratio > threshold and now - before > min_seconds})
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks das etapas de um gráfico do GLC.")
+    parser.add_argument('--resolutions', type=int, nargs='+', default=list(DEFAULT_RESOLUTIONS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cases', nargs='+', choices=sorted(EXPRESSIONS), default=None)
+    parser.add_argument('--output', default=None, help="arquivo JSON para os resultados")
+    parser.add_argument('--baseline', default=None, help="linha de base para comparação")
+    parser.add_argument('--save-baseline', default=None, help="grava os resultados como nova linha de base")
+    parser.add_argument('--threshold', type=float, default=1.25, help="razão atual/base considerada regressão")
+    parser.add_argument('--no-startup', action='store_true', help="não mede o import do pacote nem a chamada do comando")
+    args = parser.parse_args(argv)
+
+    result = run(args.resolutions, args.repeat, args.cases, startup=not args.no_startup)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as fh:
+                json.dump(result, fh, indent=2)
+
+    for case, stages in result['results'].items():
+        timings = '  '.join(f"{stage}={timing['min'] * 1e3:.2f}ms" for stage, timing in stages.items())
+        print(f"{case:<24} {timings}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as fh:
+        baseline = json.load(fh)
+    rows = compare(result, baseline, args.threshold)
+    regressions = [row for row in rows if row['regression']]
+    for row in regressions:
+        print(f"REGRESSÃO {row['case']} {row['stage']}: {row['baseline'] * 1e3:.2f}ms -> "
+              f"{row['current'] * 1e3:.2f}ms ({row['ratio']:.2f}x)")
+    print(f"{len(rows)} etapas comparadas, {len(regressions)} regressões")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""
+GLC - Generator Level Curves.
+
+Pacote com as funções dos scripts LC-2D.py, surface3D.py, intsurf3D.py e GLC_3D/test_.py e os
+comandos glc-contour, glc-surface, glc-interactive, glc-analyze, glc-batch e glc-tiles.
+
+Importar o pacote não tem efeitos colaterais e não carrega NumPy, SymPy, matplotlib nem plotly:
+os nomes abaixo são resolvidos na primeira vez que são usados (glc.plot_contour importa
+glc.plot2d, e assim por diante).
+"""
+
+__version__ = '0.1.0'
+
+_EXPORTS = {
+    'compile_function': 'glc.cache',
+    'parse_function': 'glc.functions',
+    'parse_expression': 'glc.functions',
+    'parse_functions': 'glc.functions',
+    'validate_function': 'glc.functions',
+    'plot_contour': 'glc.plot2d',
+    'plot_surface_and_contour': 'glc.plot3d',
+    'plot_interactive_surface_and_contour': 'glc.interactive',
+    'plot_isosurfaces': 'glc.interactive',
+    'plot_surface_analysis': 'glc.analysis',
+}
+
+__all__ = ['__version__', *_EXPORTS]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'glc' has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_EXPORTS])
@@ -0,0 +1,9 @@
+import sys
+
+from glc.cli import main
+
+"""
+python -m glc <comando> [argumentos]
+"""
+
+sys.exit(main())
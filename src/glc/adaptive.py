@@ -0,0 +1,176 @@
+from typing import Callable, List, NamedTuple, Tuple
+
+import numpy as np
+
+from glc.levels import ValueSketch, select_levels
+
+"""
+Amostragem adaptativa (quadtree) para o gráfico de curvas de nível.
+
+Em vez de avaliar f numa malha uniforme, começamos com uma malha grossa e subdividimos apenas
+as células em que algum nível pedido cruza a célula, em que o erro da interpolação bilinear é
+grande ou que tocam a borda do domínio (pontos onde f é NaN). Todas as amostras ficam alinhadas
+a uma malha fina de (coarse * 2**max_depth + 1) pontos por eixo; os pontos que não foram
+avaliados são preenchidos por interpolação bilinear dentro da folha que os contém, de modo que
+o resultado pode ser passado direto para plt.contour.
+"""
+
+
+class AdaptiveSamples(NamedTuple):
+    """
+    Resultado da amostragem adaptativa.
+
+    Attributes:
+        x (np.ndarray): Eixo x da malha fina (1-D).
+        y (np.ndarray): Eixo y da malha fina (1-D).
+        Z (np.ndarray): Valores na malha fina, com os pontos não avaliados interpolados.
+        evaluated (np.ndarray): Máscara booleana dos pontos em que f foi de fato avaliada.
+        levels (np.ndarray): Níveis usados como critério de refinamento.
+        n_evals (int): Número de avaliações de f.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    Z: np.ndarray
+    evaluated: np.ndarray
+    levels: np.ndarray
+    n_evals: int
+
+    def points(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Retorna as coordenadas e os valores apenas dos pontos avaliados."""
+        rows, cols = np.nonzero(self.evaluated)
+        return self.x[cols], self.y[rows], self.Z[rows, cols]
+
+
+def _crosses(values: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    # values: (n, k) amostras de cada célula. Uma célula é cruzada se algum nível fica entre o
+    # mínimo e o máximo das suas amostras.
+    if levels.size == 0:
+        return np.zeros(values.shape[0], dtype=bool)
+    lo = np.fmin.reduce(values, axis=1)
+    hi = np.fmax.reduce(values, axis=1)
+    first_above_lo = np.searchsorted(levels, lo, side='left')
+    return (first_above_lo < levels.size) & (levels[np.minimum(first_above_lo, levels.size - 1)] <= hi)
+
+
+def adaptive_sample(f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                    x_range: Tuple[float, float],
+                    y_range: Tuple[float, float],
+                    levels: List[float] = None,
+                    coarse: int = 32,
+                    max_depth: int = 5,
+                    min_depth: int = 0,
+                    rel_tol: float = 5e-3,
+                    level_strategy: str = 'quantile') -> AdaptiveSamples:
+    """
+    Amostra f de forma adaptativa, refinando apenas onde as curvas de nível passam ou onde o erro local é alto.
+
+    Args:
+        f (Callable): Função que aceita dois argumentos (x, y) e retorna um valor.
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        levels (List, optional): Níveis das curvas. Se None, são usados 10 níveis escolhidos sobre a malha grossa.
+        coarse (int, optional): Número de células por eixo na malha inicial.
+        max_depth (int, optional): Número máximo de subdivisões de cada célula grossa.
+        min_depth (int, optional): Número de subdivisões aplicadas a todas as células.
+        rel_tol (float, optional): Erro de interpolação tolerado, relativo à amplitude dos valores.
+        level_strategy (str, optional): Estratégia dos níveis automáticos (ver glc.levels).
+
+    Returns:
+        AdaptiveSamples: Malha fina, máscara dos pontos avaliados e número de avaliações.
+    """
+    if coarse < 1 or max_depth < 0:
+        raise ValueError("coarse deve ser positivo e max_depth não pode ser negativo.")
+
+    n = coarse * 2 ** max_depth + 1
+    x = np.linspace(x_range[0], x_range[1], n)
+    y = np.linspace(y_range[0], y_range[1], n)
+    samples = np.full((n, n), np.nan)
+    evaluated = np.zeros((n, n), dtype=bool)
+    n_evals = 0
+
+    def evaluate(rows: np.ndarray, cols: np.ndarray) -> None:
+        nonlocal n_evals
+        flat = np.unique(rows * n + cols)
+        flat = flat[~evaluated.ravel()[flat]]
+        if flat.size == 0:
+            return
+        r, c = np.divmod(flat, n)
+        with np.errstate(all='ignore'):
+            values = np.asarray(f(x[c], y[r]), dtype=float)
+        samples[r, c] = np.broadcast_to(values, r.shape)
+        evaluated[r, c] = True
+        n_evals += flat.size
+
+    size = 2 ** max_depth
+    corner = np.arange(coarse) * size
+    rows, cols = np.meshgrid(corner, corner, indexing='ij')
+    rows, cols = rows.ravel(), cols.ravel()
+    grid = np.arange(coarse + 1) * size
+    evaluate(*[a.ravel() for a in np.meshgrid(grid, grid, indexing='ij')])
+
+    coarse_values = samples[np.ix_(grid, grid)]
+    finite = coarse_values[np.isfinite(coarse_values)]
+    if levels is None:
+        levels = select_levels(ValueSketch().update(finite), strategy=level_strategy)
+    levels = np.sort(np.asarray(levels, dtype=float))
+    value_range = float(np.ptp(finite)) if finite.size else 0.0
+    tol = rel_tol * value_range if value_range > 0 else rel_tol
+
+    leaves: List[Tuple[np.ndarray, np.ndarray, int]] = []
+    for depth in range(max_depth):
+        if rows.size == 0:
+            break
+        h = size // 2
+        offsets = [(0, 0), (0, h), (0, size), (h, 0), (h, h), (h, size), (size, 0), (size, h), (size, size)]
+        midpoints = [(0, h), (h, 0), (h, h), (h, size), (size, h)]
+        evaluate(np.concatenate([rows + a for a, _ in midpoints]),
+                 np.concatenate([cols + b for _, b in midpoints]))
+        values = np.stack([samples[rows + a, cols + b] for a, b in offsets], axis=1)
+
+        if depth < min_depth:
+            refine = np.ones(rows.size, dtype=bool)
+        else:
+            v00, v01, v11, v10 = values[:, 0], values[:, 2], values[:, 8], values[:, 6]
+            predicted = np.stack([(v00 + v01) / 2, (v00 + v10) / 2, (v00 + v01 + v10 + v11) / 4,
+                                  (v01 + v11) / 2, (v10 + v11) / 2], axis=1)
+            actual = values[:, [1, 3, 4, 5, 7]]
+            nan_count = np.isnan(values).sum(axis=1)
+            error = np.fmax.reduce(np.abs(actual - predicted), axis=1)
+            refine = ((error > tol)
+                      | ((nan_count > 0) & (nan_count < values.shape[1]))
+                      | _crosses(values, levels))
+
+        child_rows = np.concatenate([rows + a for a in (0, 0, h, h)])
+        child_cols = np.concatenate([cols + b for b in (0, h, 0, h)])
+        child_refine = np.tile(refine, 4)
+        leaves.append((child_rows[~child_refine], child_cols[~child_refine], h))
+        rows, cols = child_rows[child_refine], child_cols[child_refine]
+        size = h
+
+    if rows.size:
+        leaves.append((rows, cols, size))
+
+    Z = _fill_leaves(samples, leaves)
+    Z[evaluated] = samples[evaluated]
+    return AdaptiveSamples(x, y, Z, evaluated, levels, n_evals)
+
+
+def _fill_leaves(samples: np.ndarray, leaves: List[Tuple[np.ndarray, np.ndarray, int]]) -> np.ndarray:
+    # Preenche cada folha por interpolação bilinear a partir dos seus quatro cantos.
+    Z = np.full(samples.shape, np.nan)
+    for rows, cols, size in leaves:
+        if rows.size == 0:
+            continue
+        t = np.linspace(0.0, 1.0, size + 1)
+        v00 = samples[rows, cols][:, None, None]
+        v01 = samples[rows, cols + size][:, None, None]
+        v10 = samples[rows + size, cols][:, None, None]
+        v11 = samples[rows + size, cols + size][:, None, None]
+        ty = t[None, :, None]
+        tx = t[None, None, :]
+        patch = (v00 * (1 - ty) * (1 - tx) + v01 * (1 - ty) * tx
+                 + v10 * ty * (1 - tx) + v11 * ty * tx)
+        r = rows[:, None, None] + np.arange(size + 1)[None, :, None]
+        c = cols[:, None, None] + np.arange(size + 1)[None, None, :]
+        Z[r, c] = patch
+    return Z
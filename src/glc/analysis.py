@@ -0,0 +1,198 @@
+from typing import TYPE_CHECKING, Callable, Tuple
+
+import numpy as np
+
+from glc.compact import surface_and_contour, write_html
+from glc.profiling import stage
+from glc.quadrature import integrate_2d
+from glc.results import cached_arrays, cached_json, function_key
+from glc.tiled import DEFAULT_MEMORY_BUDGET, GridStats, evaluate_tiled
+
+if TYPE_CHECKING:
+    import sympy as sp
+
+"""
+Análise interativa de f(x, y) no navegador (GLC_3D/test_.py / glc-analyze): superfície, curvas de
+nível, extremos refinados, pontos críticos, derivadas parciais, integrais e limites.
+
+O plotly, o SymPy e os módulos que dependem deles só são importados quando o gráfico é montado.
+"""
+
+
+def plot_surface_analysis(f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                          expr: 'sp.Expr',
+                          x_range: Tuple[float, float],
+                          y_range: Tuple[float, float],
+                          resolution: int,
+                          title: str = 'Superfície e Curvas de Nível da Função',
+                          memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                          max_display_points: int = 500,
+                          compact: bool = True,
+                          html_path: str = None) -> None:
+    """
+    Plota tanto a superfície 3D quanto o gráfico de contorno e a curva de nível para a função dada f(x, y).
+    Também calcula e exibe o limite, derivada, gradiente, integrais simbólicas/numéricas e máximo/mínimo global.
+
+    Se as matrizes da malha não couberem em memory_budget, a malha é avaliada em blocos e gravada em
+    arquivos .npy temporários; o gráfico recebe então uma versão reduzida com até max_display_points
+    pontos por eixo, enquanto mínimo e máximo são calculados sobre a malha completa.
+
+    Args:
+        f (Callable): Função que aceita dois argumentos (x, y) e retorna um valor.
+        expr (sp.Expr): Expressão simbólica da função.
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        resolution (int): Resolução do gráfico (número de pontos para x e y).
+        title (str, optional): Título do gráfico.
+        memory_budget (int, optional): Memória em bytes disponível para as matrizes da malha.
+        max_display_points (int, optional): Pontos por eixo enviados ao gráfico no modo em blocos.
+        compact (bool, optional): Envia eixos 1-D e valores em float32, com a superfície reduzida ao tamanho da tela.
+        html_path (str, optional): Se informado, grava a figura num arquivo HTML independente em vez de abri-la.
+    """
+    import plotly.graph_objs as go
+    import sympy as sp
+
+    from glc.extrema import find_extrema
+    from glc.fused import GradientEvaluator
+    from glc.symbolic import default_analyzer
+
+    x, y = sp.symbols('x y')
+
+    # As análises simbólicas correm em outros processos enquanto a malha é avaliada; cada uma tem
+    # o seu prazo e, se ele se esgotar, a anotação mostra "tempo esgotado" em vez do resultado.
+    analyzer = default_analyzer()
+    analyses = {
+        'integral_x': analyzer.submit('integrate', expr, x),
+        'integral_y': analyzer.submit('integrate', expr, y),
+        'integral_xy': analyzer.submit('integrate', expr, (x, x_range[0], x_range[1]), (y, y_range[0], y_range[1])),
+        'limit_x0_y0': analyzer.submit('limit', expr, (x, 0), (y, 0)),
+    }
+
+    # f, ∂f/∂x e ∂f/∂y numa única função, com as subexpressões comuns calculadas uma só vez.
+    gradient = GradientEvaluator(expr)
+    fx = gradient.fx
+    fy = gradient.fy
+
+    # Três matrizes resolution x resolution: Z, Z_fx e Z_fy (x e y ficam nos eixos 1-D).
+    if resolution * resolution * 8 * 3 > memory_budget:
+        with stage('evaluate_tiled', points=resolution * resolution):
+            grid = evaluate_tiled({('Z', 'Z_fx', 'Z_fy'): gradient}, x_range, y_range, resolution,
+                                  memory_budget=memory_budget)
+        z_stats = grid.stats['Z']
+        x_vals, y_vals, Z = grid.preview('Z', max_display_points)
+        x_full, y_full = grid.x, grid.y
+        # A malha completa não cabe na memória: a integral é calculada por Gauss-Legendre.
+        integration_grid = None
+        grid.close()
+    else:
+        x_vals = np.linspace(x_range[0], x_range[1], resolution)
+        y_vals = np.linspace(y_range[0], y_range[1], resolution)
+        # Eixos arranjados para broadcasting em vez das matrizes do meshgrid; o GradientEvaluator
+        # devolve as três saídas já com a forma (len(y), len(x)). Com o cache de resultados ligado
+        # (glc.results), as três matrizes são lidas do disco numa nova análise da mesma função.
+        with stage('evaluate_gradient', points=resolution * resolution) as profile:
+            grids = cached_arrays('gradient', lambda: dict(zip(('Z', 'Z_fx', 'Z_fy'), gradient(x_vals[None, :], y_vals[:, None]))),
+                                  function=function_key(gradient), x=x_vals, y=y_vals)
+            profile.note(z=grids['Z'])
+        Z = grids['Z']
+
+        z_stats = GridStats()
+        z_stats.update(Z)
+        x_full, y_full = x_vals, y_vals
+        integration_grid = (x_vals, y_vals, Z)
+
+    # Reaproveita a malha Z já avaliada; se a estimativa de erro dela não bastar, usa Gauss-Legendre vetorizado.
+    with stage('integrate_2d'):
+        integral_numerica = cached_json('integral_2d', lambda: float(integrate_2d(f, x_range, y_range, grid=integration_grid).value),
+                                        function=function_key(f), x_range=x_range, y_range=y_range,
+                                        resolution=resolution, tiled=integration_grid is None)
+
+    Z_min = z_stats.min
+    Z_max = z_stats.max
+    min_row, min_col = z_stats.argmin or (0, 0)
+    max_row, max_col = z_stats.argmax or (0, 0)
+    x_min, y_min = x_full[min_col], y_full[min_row]
+    x_max, y_max = x_full[max_col], y_full[max_row]
+
+    # Os melhores candidatos da malha (e os extremos da malha completa) são refinados juntos pelo
+    # método de Newton, com o gradiente e a Hessiana simbólicos: a precisão não depende da resolução.
+    with stage('find_extrema'):
+        extrema = find_extrema(GradientEvaluator(expr, hessian=True), x_vals, y_vals, Z, x_range, y_range,
+                               min_seeds=[(x_min, y_min)], max_seeds=[(x_max, y_max)])
+    if extrema.minimum is not None:
+        x_min, y_min, Z_min = extrema.minimum.x, extrema.minimum.y, extrema.minimum.value
+        x_max, y_max, Z_max = extrema.maximum.x, extrema.maximum.y, extrema.maximum.value
+    critical_labels = {'min': 'mínimo local', 'max': 'máximo local', 'saddle': 'ponto de sela', 'degenerate': 'degenerado'}
+    critical_points = [p for p in extrema.critical_points if p.kind in critical_labels]
+
+    if compact:
+        surface, contours = surface_and_contour(x_vals, y_vals, Z, colorscale='inferno', showscale=False)
+    else:
+        surface = go.Surface(z=Z, x=x_vals, y=y_vals, colorscale='inferno', showscale=False)
+        contours = go.Contour(z=Z, x=x_vals, y=y_vals, colorscale='inferno', showscale=False)
+
+    layout = go.Layout(
+        title=title,
+        scene=dict(
+            xaxis=dict(title='x'),
+            yaxis=dict(title='y'),
+            zaxis=dict(title='z')
+        ),
+        xaxis=dict(title='x'),
+        yaxis=dict(title='y'),
+        showlegend=True
+    )
+
+    fig = go.Figure(data=[surface, contours], layout=layout)
+
+    fig.add_trace(go.Scatter3d(x=[x_min], y=[y_min], z=[Z_min],
+                               mode='markers', marker=dict(size=5, color='green', symbol='circle'),
+                               name=f'Mínimo Global: {Z_min:.2f}'))
+    fig.add_trace(go.Scatter3d(x=[x_max], y=[y_max], z=[Z_max],
+                               mode='markers', marker=dict(size=5, color='red', symbol='circle'),
+                               name=f'Máximo Global: {Z_max:.2f}'))
+    if critical_points:
+        fig.add_trace(go.Scatter3d(x=[p.x for p in critical_points], y=[p.y for p in critical_points],
+                                   z=[p.value for p in critical_points],
+                                   text=[critical_labels[p.kind] for p in critical_points],
+                                   mode='markers', marker=dict(size=3, color='white', symbol='diamond'),
+                                   name='Pontos Críticos'))
+
+    partials_text = f"∂f/∂x = {sp.pretty(fx)}\n∂f/∂y = {sp.pretty(fy)}"
+    symbolic = {name: analyzer.result(key) for name, key in analyses.items()}
+    integrals_text = (f"∫f(x) dx = {symbolic['integral_x'].text()}\n"
+                      f"∫f(y) dy = {symbolic['integral_y'].text()}\n"
+                      f"Integral dupla simbólica = {symbolic['integral_xy'].text()}\n"
+                      f"Integral dupla numérica ≈ {integral_numerica:.2f}")
+    limit_text = f"lim(x→0, y→0) f(x,y) = {symbolic['limit_x0_y0'].text()}"
+
+    fig.add_trace(go.Scatter(
+        x=[None], y=[None],
+        mode='markers',
+        marker=dict(size=1, color="white"),
+        showlegend=True,
+        name=f"Derivadas Parciais:\n{partials_text}"
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=[None], y=[None],
+        mode='markers',
+        marker=dict(size=1, color="white"),
+        showlegend=True,
+        name=f"Integrais:\n{integrals_text}"
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=[None], y=[None],
+        mode='markers',
+        marker=dict(size=1, color="white"),
+        showlegend=True,
+        name=f"Limites:\n{limit_text}"
+    ))
+
+    if html_path:
+        size = write_html(fig, html_path)
+        print(f"Gráfico salvo em {html_path} ({size / 2**20:.1f} MB).")
+    else:
+        with stage('show'):
+            fig.show()
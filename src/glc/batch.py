@@ -0,0 +1,355 @@
+import argparse
+import csv
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from glc import profiling
+from glc.decimate import DEFAULT_MAX_TRIANGLES, plot_surface_mesh
+
+"""
+Renderização em lote, sem interação, para o pipeline noturno.
+
+Lê um arquivo de trabalhos (JSONL ou CSV), renderiza cada gráfico com o backend Agg num pool
+de processos e grava um relatório com o resultado de cada trabalho. Cada trabalho descreve:
+
+    expression   expressão em x e y (obrigatório), ex.: "sin(x) * cos(y)"
+    output       caminho do arquivo de saída (obrigatório); o formato vem da extensão. No 'contour',
+                 .geojson e .glcb gravam só as curvas, como vetores (glc.export)
+    kind         'contour' (padrão, como no LC-2D.py) ou 'surface' (como no surface3D.py)
+    x_range      intervalo do eixo x, padrão [0, 10]
+    y_range      intervalo do eixo y, padrão [-5, 5]
+    levels       níveis das curvas; se vazio, 10 níveis escolhidos por level_strategy
+    level_strategy  níveis automáticos: 'quantile' (padrão), 'linear', 'log' ou 'equal-area' (glc.levels)
+    colormap     mapa de cores, padrão 'viridis'
+    line_style   estilo de linha, padrão '-'
+    fixed_vars   variáveis fixadas, ex.: {"z": 1}
+    resolution   pontos por eixo, padrão 400
+    title        título do gráfico
+    tolerance    tolerância da simplificação das curvas exportadas (padrão: 0,1% do maior lado)
+    surface_triangles  orçamento de triângulos da superfície no 'surface', padrão 5000 (glc.decimate);
+                 0 desenha com o plot_surface, que reduz a malha a 50x50 pontos
+    id           identificador usado no relatório (padrão: número da linha)
+
+No CSV, intervalos e níveis são números separados por espaço ("0 10") e fixed_vars usa o
+formato "z=1;w=2". Uso:
+
+    PYTHONPATH=src python -m glc.batch jobs.jsonl --workers 8 --timeout 60 --report report.json
+
+Com --result-cache DIR (ou GLC_RESULT_CACHE_DIR), as malhas avaliadas ficam no cache de resultados
+(glc.results) e uma nova rodada com as mesmas expressões, intervalos e resoluções só redesenha.
+"""
+
+DEFAULTS: Dict[str, Any] = {
+    'kind': 'contour',
+    'x_range': (0.0, 10.0),
+    'y_range': (-5.0, 5.0),
+    'levels': None,
+    'level_strategy': 'quantile',
+    'colormap': 'viridis',
+    'line_style': '-',
+    'fixed_vars': {},
+    'resolution': 400,
+    'title': None,
+    'tolerance': None,
+    'surface_triangles': DEFAULT_MAX_TRIANGLES,
+}
+
+KINDS = ('contour', 'surface')
+
+LEVEL_STRATEGIES = ('quantile', 'linear', 'log', 'equal-area')
+
+
+class JobTimeout(Exception):
+    """Levantada dentro do processo de trabalho quando o prazo do trabalho se esgota."""
+
+
+def _numbers(value: Any) -> List[float]:
+    if isinstance(value, str):
+        value = value.replace(',', ' ').replace(':', ' ').split()
+    return [float(v) for v in value]
+
+
+def _fixed_vars(value: Any) -> Dict[str, float]:
+    if isinstance(value, str):
+        pairs = [item.split('=') for item in value.split(';') if item.strip()]
+        return {var.strip(): float(val) for var, val in pairs}
+    return {str(var): float(val) for var, val in dict(value).items()}
+
+
+def normalize_job(raw: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """
+    Valida um trabalho lido do arquivo e preenche os valores padrão.
+
+    Args:
+        raw (Dict[str, Any]): Campos do trabalho como lidos do JSONL/CSV.
+        index (int): Posição do trabalho no arquivo (usada como id padrão).
+
+    Returns:
+        Dict[str, Any]: Trabalho normalizado.
+    """
+    raw = {k: v for k, v in raw.items() if v not in (None, '')}
+    if not raw.get('expression') or not raw.get('output'):
+        raise ValueError(f"Trabalho {index}: os campos 'expression' e 'output' são obrigatórios.")
+    job = dict(DEFAULTS)
+    job.update(raw)
+    job['id'] = str(raw.get('id', index))
+    job['x_range'] = tuple(_numbers(job['x_range']))
+    job['y_range'] = tuple(_numbers(job['y_range']))
+    if len(job['x_range']) != 2 or len(job['y_range']) != 2:
+        raise ValueError(f"Trabalho {index}: x_range e y_range precisam de dois valores.")
+    job['levels'] = _numbers(job['levels']) if job['levels'] is not None else None
+    job['fixed_vars'] = _fixed_vars(job['fixed_vars'])
+    job['resolution'] = int(job['resolution'])
+    job['tolerance'] = float(job['tolerance']) if job['tolerance'] is not None else None
+    job['surface_triangles'] = int(job['surface_triangles'])
+    if job['level_strategy'] not in LEVEL_STRATEGIES:
+        raise ValueError(f"Trabalho {index}: level_strategy deve ser uma de {LEVEL_STRATEGIES}.")
+    if job['kind'] not in KINDS:
+        raise ValueError(f"Trabalho {index}: kind deve ser um de {KINDS}.")
+    return job
+
+
+def load_jobs(path: str) -> List[Dict[str, Any]]:
+    """
+    Lê os trabalhos de um arquivo JSONL ou CSV (pela extensão).
+
+    Args:
+        path (str): Caminho do arquivo de trabalhos.
+
+    Returns:
+        List[Dict[str, Any]]: Trabalhos normalizados.
+    """
+    with open(path, newline='', encoding='utf-8') as fh:
+        if path.lower().endswith('.csv'):
+            rows = list(csv.DictReader(fh))
+        else:
+            rows = [json.loads(line) for line in fh if line.strip()]
+    return [normalize_job(row, i) for i, row in enumerate(rows, start=1)]
+
+
+def _grid(f, x_range, y_range, resolution):
+    from glc.functions import evaluate_grid
+
+    # Sem meshgrid: contour recebe os eixos 1-D e plot_surface, x[None, :] e y[:, None].
+    x = np.linspace(x_range[0], x_range[1], resolution)
+    y = np.linspace(y_range[0], y_range[1], resolution)
+    with np.errstate(all='ignore'):
+        Z = evaluate_grid(f, x, y)
+    return x, y, Z
+
+
+def _levels(Z: np.ndarray, levels, strategy: str):
+    if levels is not None:
+        return levels
+    from glc.levels import auto_levels
+
+    return auto_levels(Z, strategy=strategy)
+
+
+def _decorate_contour_axes(ax, title: str) -> None:
+    ax.set_title(title)
+    ax.set_xlabel('x')
+    ax.set_ylabel('y')
+    ax.grid(True)
+    ax.axhline(0, color='black', linewidth=0.5)
+    ax.axvline(0, color='black', linewidth=0.5)
+
+
+def render_job(job: Dict[str, Any]) -> str:
+    """
+    Renderiza um trabalho com o backend Agg e grava o arquivo de saída.
+
+    O gráfico 'contour' reproduz o plot_contour do LC-2D.py e o 'surface' reproduz o
+    plot_surface_and_contour do surface3D.py, mas usando Figure diretamente, sem o pyplot.
+
+    Args:
+        job (Dict[str, Any]): Trabalho normalizado por normalize_job.
+
+    Returns:
+        str: Caminho do arquivo gravado.
+    """
+    from matplotlib.figure import Figure
+    from glc.functions import parse_function
+
+    f = parse_function(job['expression'], job['fixed_vars'])
+    X, Y, Z = _grid(f, job['x_range'], job['y_range'], job['resolution'])
+    levels = _levels(Z, job['levels'], job['level_strategy'])
+
+    output = job['output']
+    if job['kind'] == 'contour' and os.path.splitext(output)[1].lower() in ('.geojson', '.glcb'):
+        from glc.export import write_contours
+
+        write_contours(output, X, Y, Z, levels, tolerance=job['tolerance'], color_map=job['colormap'])
+        return output
+
+    if job['kind'] == 'contour':
+        fig = Figure(figsize=(8, 8))
+        ax = fig.add_subplot()
+        with profiling.stage('contour', levels=len(levels)):
+            contours = ax.contour(X, Y, Z, levels=levels, cmap=job['colormap'], linestyles=job['line_style'])
+        with profiling.stage('clabel'):
+            ax.clabel(contours, inline=True, fontsize=8)
+        _decorate_contour_axes(ax, job['title'] or 'Gráfico das Curvas de Nível para a Função')
+    else:
+        fig = Figure(figsize=(14, 7))
+        ax1 = fig.add_subplot(121, projection='3d')
+        if job['surface_triangles']:
+            plot_surface_mesh(ax1, X, Y, Z, job['surface_triangles'], cmap=job['colormap'], edgecolor='none')
+        else:
+            with profiling.stage('plot_surface', z=Z):
+                ax1.plot_surface(X[None, :], Y[:, None], Z, cmap=job['colormap'], edgecolor='none')
+        ax1.set_title(f"3D: {job['title'] or 'Gráfico da Superfície'}")
+        ax1.set_xlabel('x')
+        ax1.set_ylabel('y')
+        ax1.set_zlabel('z')
+        ax2 = fig.add_subplot(122)
+        with profiling.stage('contour', levels=len(levels)):
+            contours = ax2.contour(X, Y, Z, levels=levels, cmap=job['colormap'], linestyles=job['line_style'])
+        with profiling.stage('clabel'):
+            ax2.clabel(contours, inline=True, fontsize=8)
+        _decorate_contour_axes(ax2, '2D: Gráfico das Curvas de Nível da Função')
+
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    with profiling.stage('savefig', path=output):
+        fig.savefig(output)
+    return output
+
+
+def _raise_timeout(signum, frame):
+    raise JobTimeout()
+
+
+def run_job(job: Dict[str, Any], timeout: float = None) -> Dict[str, Any]:
+    """
+    Executa um trabalho, sem deixar exceções escaparem, e retorna o registro para o relatório.
+
+    O prazo é aplicado com SIGALRM dentro do processo de trabalho, que continua vivo para os
+    próximos trabalhos. Em sistemas sem SIGALRM (Windows) o trabalho roda até o fim e é marcado
+    como 'timeout' se passar do prazo.
+
+    Args:
+        job (Dict[str, Any]): Trabalho normalizado.
+        timeout (float, optional): Prazo em segundos. Se None, não há prazo.
+
+    Returns:
+        Dict[str, Any]: id, status ('ok', 'error' ou 'timeout'), tempo gasto, saída e erro.
+    """
+    record = {'id': job['id'], 'output': job['output'], 'status': 'ok', 'error': None}
+    use_alarm = bool(timeout) and hasattr(signal, 'setitimer')
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        render_job(job)
+    except JobTimeout:
+        record['status'] = 'timeout'
+        record['error'] = f"prazo de {timeout} s excedido"
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+        profiling.flush()
+    record['seconds'] = time.perf_counter() - start
+    if timeout and record['status'] == 'ok' and record['seconds'] > timeout:
+        record['status'] = 'timeout'
+        record['error'] = f"prazo de {timeout} s excedido"
+    return record
+
+
+def _init_worker() -> None:
+    # Sem janela: o pipeline roda em máquinas sem display.
+    os.environ['MPLBACKEND'] = 'Agg'
+    import matplotlib
+    matplotlib.use('Agg')
+    # Carrega o matplotlib uma vez por processo, e não no primeiro trabalho. O SymPy só é importado
+    # pelo trabalho cuja expressão não está no cache em disco (glc.cache).
+    from matplotlib.figure import Figure  # noqa: F401
+    import glc.functions  # noqa: F401
+
+
+def run_batch(jobs: Sequence[Dict[str, Any]], workers: int = None, timeout: float = None) -> Dict[str, Any]:
+    """
+    Renderiza os trabalhos num pool de processos.
+
+    Args:
+        jobs (Sequence[Dict[str, Any]]): Trabalhos normalizados.
+        workers (int, optional): Número de processos. Se None, usa o número de CPUs.
+        timeout (float, optional): Prazo em segundos de cada trabalho.
+
+    Returns:
+        Dict[str, Any]: Relatório com o resumo e o registro de cada trabalho, na ordem de entrada.
+    """
+    start = time.perf_counter()
+    records: Dict[str, Dict[str, Any]] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(run_job, job, timeout): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                records[job['id']] = future.result()
+            except BrokenProcessPool as e:
+                records[job['id']] = {'id': job['id'], 'output': job['output'], 'status': 'error',
+                                      'error': f"BrokenProcessPool: {e}", 'seconds': None}
+    elapsed = time.perf_counter() - start
+
+    ordered = [records[job['id']] for job in jobs]
+    counts = {status: sum(r['status'] == status for r in ordered) for status in ('ok', 'error', 'timeout')}
+    return {
+        'total': len(ordered),
+        **counts,
+        'seconds': elapsed,
+        'jobs_per_hour': len(ordered) / elapsed * 3600 if elapsed > 0 else None,
+        'workers': workers or os.cpu_count(),
+        'jobs': ordered,
+    }
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Renderiza em lote os gráficos descritos num arquivo JSONL ou CSV.")
+    parser.add_argument('jobs', help="arquivo de trabalhos (.jsonl ou .csv)")
+    parser.add_argument('--workers', type=int, default=None, help="número de processos (padrão: número de CPUs)")
+    parser.add_argument('--timeout', type=float, default=None, help="prazo em segundos de cada trabalho")
+    parser.add_argument('--report', default=None, help="arquivo JSON para o relatório")
+    parser.add_argument('--result-cache', default=None, metavar='DIR',
+                        help="diretório do cache de resultados compartilhado pelos processos (ver glc.results)")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.jobs)
+    ids = [job['id'] for job in jobs]
+    if len(set(ids)) != len(ids):
+        parser.error("os ids dos trabalhos devem ser únicos")
+
+    if args.result_cache:
+        from glc.results import RESULT_CACHE_DIR_ENV
+
+        # Os processos do pool herdam o ambiente.
+        os.environ[RESULT_CACHE_DIR_ENV] = args.result_cache
+
+    report = run_batch(jobs, workers=args.workers, timeout=args.timeout)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+
+    for record in report['jobs']:
+        if record['status'] != 'ok':
+            print(f"[{record['status']}] {record['id']}: {record['error'] or ''}", file=sys.stderr)
+    print(f"{report['total']} trabalhos: {report['ok']} ok, {report['error']} com erro, "
+          f"{report['timeout']} fora do prazo em {report['seconds']:.1f} s")
+    return 0 if report['ok'] == report['total'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,390 @@
+import builtins
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, Tuple
+
+from glc.profiling import stage
+
+if TYPE_CHECKING:
+    import sympy as sp
+
+"""
+Cache de expressões compiladas usado pelo parse_function dos três scripts.
+
+Cada chamada de parse_function faz sp.sympify, expr.subs(fixed_vars) e sp.lambdify, o que
+para expressões grandes custa mais do que avaliar a malha inteira. O cache guarda as funções
+já compiladas em memória (com descarte LRU) e, opcionalmente, em disco como código-fonte
+gerado, indexado por um hash canônico da expressão. Assim uma nova chamada custa uma consulta
+a um dicionário e um processo novo não precisa repetir sympify/lambdify.
+
+O cache em disco é desligado por padrão. Para ligá-lo, defina a variável de ambiente
+GLC_EXPR_CACHE_DIR com o diretório desejado (ou passe cache_dir ao ExpressionCache).
+O código lido do disco é executado, portanto use apenas diretórios que você controla.
+
+O SymPy só é importado quando uma expressão precisa ser interpretada ou compilada: uma função
+lida do cache em disco é recriada apenas com o NumPy.
+"""
+
+CACHE_DIR_ENV = 'GLC_EXPR_CACHE_DIR'
+CACHE_SIZE_ENV = 'GLC_EXPR_CACHE_SIZE'
+
+_FORMAT_VERSION = 2
+_NUMPY_NAMESPACE_SOURCE = "import numpy\nfrom numpy import *\nfrom numpy.linalg import *\n"
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def input_key(func_str: str, fixed_vars: Dict[str, float] = None, args: Tuple[str, ...] = ('x', 'y')) -> str:
+    """
+    Calcula a chave da entrada do usuário, sem precisar chamar o SymPy.
+
+    Args:
+        func_str (str): String da função que o usuário insere.
+        fixed_vars (Dict[str, float], optional): Variáveis fixadas e seus valores.
+        args (Tuple[str, ...], optional): Nomes dos argumentos da função gerada.
+
+    Returns:
+        str: Hash hexadecimal da entrada normalizada.
+    """
+    fixed = sorted((str(k).strip(), repr(v)) for k, v in (fixed_vars or {}).items())
+    payload = [_FORMAT_VERSION, ' '.join(func_str.split()), fixed, list(args)]
+    return _sha256(json.dumps(payload))
+
+
+def expression_hash(expr: 'sp.Expr', args: Tuple[str, ...] = ('x', 'y'), cse: bool = False,
+                    separable: bool = False) -> str:
+    """
+    Calcula o hash canônico de uma expressão simbólica já interpretada.
+
+    Entradas diferentes que resultam na mesma expressão ('x+y' e 'y + x') têm o mesmo hash.
+
+    Args:
+        expr (sp.Expr): Expressão simbólica.
+        args (Tuple[str, ...], optional): Nomes dos argumentos da função gerada.
+        cse (bool, optional): Se o código é gerado com eliminação de subexpressões comuns.
+        separable (bool, optional): Se o código é gerado com as partes de uma variável separadas (glc.separable).
+
+    Returns:
+        str: Hash hexadecimal da expressão.
+    """
+    import sympy as sp
+
+    payload = [_FORMAT_VERSION, sp.srepr(expr), [str(a) for a in args]]
+    if cse:
+        payload.append('cse')
+    if separable:
+        payload.append('separable')
+    return _sha256(json.dumps(payload))
+
+
+class CompiledExpression:
+    """
+    Função compilada junto com as informações necessárias para recriar a expressão simbólica.
+
+    A expressão simbólica só é reconstruída quando o atributo expr é acessado, de modo que uma
+    função lida do disco não paga o custo do sympify.
+    """
+
+    __slots__ = ('func', 'key', 'source', 'args', '_expr', '_srepr')
+
+    def __init__(self, func: Callable, key: str, source: str, args: Tuple[str, ...],
+                 expr: 'sp.Expr' = None, srepr: str = None):
+        self.func = func
+        self.key = key
+        # Identifica a expressão da função para o cache de resultados (glc.results.function_key) e
+        # dá acesso à expressão simbólica a partir da função (glc.intervals).
+        func.cache_key = key
+        func.compiled = self
+        self.source = source
+        self.args = tuple(args)
+        self._expr = expr
+        if srepr is None:
+            import sympy as sp
+            srepr = sp.srepr(expr)
+        self._srepr = srepr
+
+    @property
+    def expr(self) -> 'sp.Expr':
+        if self._expr is None:
+            import sympy as sp
+            self._expr = sp.sympify(self._srepr)
+        return self._expr
+
+    @property
+    def srepr(self) -> str:
+        return self._srepr
+
+    def __call__(self, *values):
+        return self.func(*values)
+
+
+class ExpressionCache:
+    """
+    Cache LRU de expressões compiladas, com persistência opcional em disco.
+
+    Args:
+        maxsize (int, optional): Número máximo de funções mantidas em memória.
+        cache_dir (str, optional): Diretório para salvar o código gerado. Se None, o cache fica só em memória.
+    """
+
+    def __init__(self, maxsize: int = 128, cache_dir: str = None):
+        if maxsize < 1:
+            raise ValueError("O tamanho do cache deve ser pelo menos 1.")
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._entries: 'OrderedDict[str, CompiledExpression]' = OrderedDict()
+        self._aliases: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._namespace = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def compile(self, func_str: str, fixed_vars: Dict[str, float] = None,
+                args: Tuple[str, ...] = ('x', 'y')) -> CompiledExpression:
+        """
+        Retorna a função compilada para a string dada, usando o cache sempre que possível.
+
+        Args:
+            func_str (str): String da função que o usuário insere.
+            fixed_vars (Dict[str, float], optional): Variáveis a serem fixadas com seus respectivos valores.
+            args (Tuple[str, ...], optional): Nomes dos argumentos da função gerada.
+
+        Returns:
+            CompiledExpression: Função compilada e metadados da expressão.
+        """
+        key = input_key(func_str, fixed_vars, args)
+        with self._lock:
+            entry = self._lookup_alias(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+        entry = self._load_alias_from_disk(key)
+        if entry is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._store(entry, key)
+            return entry
+
+        import sympy as sp
+
+        with stage('sympify', expr=func_str):
+            expr = sp.sympify(func_str)
+            if fixed_vars:
+                expr = expr.subs(fixed_vars)
+        entry = self.compile_expr(expr, args)
+        with self._lock:
+            self._store(entry, key)
+        self._write_alias(key, entry.key)
+        return entry
+
+    def compile_expr(self, expr: 'sp.Expr', args: Tuple[str, ...] = ('x', 'y'), cse: bool = False,
+                     separable: bool = True) -> CompiledExpression:
+        """
+        Retorna a função compilada para uma expressão simbólica já interpretada.
+
+        Args:
+            expr (sp.Expr): Expressão simbólica. Um sp.Tuple gera uma função que retorna uma tupla.
+            args (Tuple[str, ...], optional): Nomes dos argumentos da função gerada.
+            cse (bool, optional): Calcula uma única vez as subexpressões comuns a todo o código gerado.
+            separable (bool, optional): Calcula as partes que dependem de uma só variável em auxiliares
+                separadas (ver glc.separable), para que a função chamada com f(x[None, :], y[:, None]) só
+                crie arrays do tamanho da malha ao combiná-las. Ignorado com cse=True.
+
+        Returns:
+            CompiledExpression: Função compilada e metadados da expressão.
+        """
+        separable = separable and not cse
+        expr_key = expression_hash(expr, args, cse, separable)
+        with self._lock:
+            entry = self._entries.get(expr_key)
+            if entry is not None:
+                self._entries.move_to_end(expr_key)
+                self.hits += 1
+                return entry
+
+        entry = self._load_from_disk(expr_key)
+        if entry is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._store(entry)
+            return entry
+
+        import sympy as sp
+
+        if separable:
+            from glc.separable import separable_cse
+            cse = separable_cse(args)
+        with stage('lambdify', cse=bool(cse)):
+            func = sp.lambdify(args, expr, modules=['numpy'], cse=cse)
+        entry = CompiledExpression(func, expr_key, inspect.getsource(func), args, expr=expr)
+        with self._lock:
+            self.misses += 1
+            self._store(entry)
+        self._write_to_disk(entry)
+        return entry
+
+    def clear(self) -> None:
+        """Esvazia o cache em memória (o cache em disco é mantido)."""
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        """Retorna estatísticas de uso do cache."""
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup_alias(self, key: str):
+        expr_key = self._aliases.get(key)
+        if expr_key is None:
+            return None
+        entry = self._entries.get(expr_key)
+        if entry is None:
+            del self._aliases[key]
+            return None
+        self._aliases.move_to_end(key)
+        self._entries.move_to_end(expr_key)
+        return entry
+
+    def _store(self, entry: CompiledExpression, alias: str = None) -> None:
+        self._entries[entry.key] = entry
+        self._entries.move_to_end(entry.key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        if alias is not None:
+            self._aliases[alias] = entry.key
+            self._aliases.move_to_end(alias)
+            while len(self._aliases) > 4 * self.maxsize:
+                self._aliases.popitem(last=False)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def _numpy_namespace(self) -> Dict[str, object]:
+        if self._namespace is None:
+            namespace: Dict[str, object] = {}
+            exec(_NUMPY_NAMESPACE_SOURCE, namespace)
+            self._namespace = namespace
+        return self._namespace
+
+    def _is_portable(self, entry: CompiledExpression) -> bool:
+        # A função só pode ser recriada do disco se todos os nomes usados no código gerado
+        # existirem no namespace do NumPy (ou forem builtins).
+        namespace = self._numpy_namespace()
+        codes = [entry.func.__code__]
+        while codes:
+            code = codes.pop()
+            for name in code.co_names:
+                if name not in namespace and not hasattr(builtins, name):
+                    return False
+            codes.extend(c for c in code.co_consts if inspect.iscode(c))
+        return True
+
+    def _write_atomic(self, name: str, text: str) -> None:
+        path = self._path(name)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            fh.write(text)
+        os.replace(tmp, path)
+
+    def _write_to_disk(self, entry: CompiledExpression) -> None:
+        if not self.cache_dir or not self._is_portable(entry):
+            return
+        try:
+            meta = {'version': _FORMAT_VERSION, 'args': list(entry.args), 'srepr': entry.srepr}
+            self._write_atomic(f"{entry.key}.py", entry.source)
+            self._write_atomic(f"{entry.key}.json", json.dumps(meta))
+        except OSError:
+            pass
+
+    def _write_alias(self, key: str, expr_key: str) -> None:
+        if not self.cache_dir or not os.path.exists(self._path(f"{expr_key}.py")):
+            return
+        try:
+            self._write_atomic(f"{key}.key", expr_key)
+        except OSError:
+            pass
+
+    def _load_alias_from_disk(self, key: str):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(f"{key}.key"), encoding='utf-8') as fh:
+                expr_key = fh.read().strip()
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(expr_key)
+        return entry if entry is not None else self._load_from_disk(expr_key)
+
+    def _load_from_disk(self, expr_key: str):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(f"{expr_key}.json"), encoding='utf-8') as fh:
+                meta = json.load(fh)
+            with open(self._path(f"{expr_key}.py"), encoding='utf-8') as fh:
+                source = fh.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != _FORMAT_VERSION:
+            return None
+        namespace = dict(self._numpy_namespace())
+        try:
+            exec(compile(source, self._path(f"{expr_key}.py"), 'exec'), namespace)
+        except SyntaxError:
+            return None
+        func = namespace.get('_lambdifygenerated')
+        if func is None:
+            return None
+        return CompiledExpression(func, expr_key, source, tuple(meta['args']), srepr=meta['srepr'])
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> ExpressionCache:
+    """
+    Retorna o cache compartilhado pelo processo, criado na primeira chamada.
+
+    O tamanho e o diretório em disco podem ser configurados pelas variáveis de ambiente
+    GLC_EXPR_CACHE_SIZE e GLC_EXPR_CACHE_DIR.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            maxsize = int(os.environ.get(CACHE_SIZE_ENV, '128'))
+            _default_cache = ExpressionCache(maxsize=maxsize, cache_dir=os.environ.get(CACHE_DIR_ENV) or None)
+        return _default_cache
+
+
+def compile_function(func_str: str, fixed_vars: Dict[str, float] = None,
+                     args: Tuple[str, ...] = ('x', 'y')) -> CompiledExpression:
+    """
+    Compila a string da função usando o cache compartilhado.
+
+    Args:
+        func_str (str): String da função que o usuário insere.
+        fixed_vars (Dict[str, float], optional): Variáveis a serem fixadas com seus respectivos valores.
+        args (Tuple[str, ...], optional): Nomes dos argumentos da função gerada.
+
+    Returns:
+        CompiledExpression: Função compilada e metadados da expressão.
+    """
+    return default_cache().compile(func_str, fixed_vars, args)
@@ -0,0 +1,459 @@
+import argparse
+import os
+import sys
+from typing import Dict, List, Sequence, Tuple
+
+"""
+Comandos do GLC: glc-contour, glc-surface, glc-interactive e glc-analyze (também disponíveis como
+python -m glc <comando>).
+
+Sem a expressão na linha de comando, cada comando faz as mesmas perguntas dos scripts originais
+(LC-2D.py, surface3D.py, intsurf3D.py e GLC_3D/test_.py). Com a expressão, roda sem interação:
+
+    glc-contour "sin(x) * cos(y)" --levels -0.5 0 0.5 --output curvas.png
+    glc-surface "x**2 + y**2 + z" --fix z=1 --output superficie.png
+    glc-interactive "x**2 + y**2 + z**2" --z-range -5 5 --levels 4 16 --output iso.html
+    glc-analyze "exp(-x**2 - y**2)" --x-range -2 2 --y-range -2 2 --resolution 200
+
+Este módulo só importa a biblioteca padrão; NumPy, SymPy, matplotlib e plotly são carregados
+pelos caminhos que precisam deles. Quando um comando grava uma imagem sem abrir janela, o
+matplotlib usa o backend Agg, sem carregar nenhum toolkit gráfico.
+
+Os comandos ligam o cache de expressões em disco (glc.cache) em ~/.cache/glc/expressions (ou
+$XDG_CACHE_HOME/glc/expressions): ao repetir uma expressão, o processo novo lê o código gerado
+em vez de importar o SymPy e refazer sympify/lambdify. Defina GLC_EXPR_CACHE_DIR para usar
+outro diretório, ou deixe-a vazia para desligar o cache em disco. Da mesma forma, os resultados
+(malhas, derivadas, superfícies de nível e integrais simbólicas) ficam no cache de resultados
+(glc.results) em ~/.cache/glc/results; GLC_RESULT_CACHE_DIR muda ou, vazia, desliga esse cache.
+
+Com --profile (ou GLC_PROFILE=1), cada etapa do comando é medida e gravada num trace do Chrome
+(ver glc.profiling).
+"""
+
+DEFAULT_X_RANGE = (0.0, 10.0)
+DEFAULT_Y_RANGE = (-5.0, 5.0)
+
+INVALID_FUNCTION = "Erro: A função inserida é inválida. Por favor, insira uma função válida."
+FUNCTION_PROMPT = "Digite a função que deseja calcular (use x e y como variáveis): "
+
+
+def _print_examples(examples: Sequence[str]) -> None:
+    print("\nExemplos de funções que você pode inserir:")
+    for example in examples:
+        print(f"  - '{example}'")
+    print("\nDigite a função desejada no formato indicado e veja o resultado!")
+
+
+def show_contour_instructions() -> None:
+    """
+    Exibe as instruções do gráfico de curvas de nível.
+    """
+    print("Bem-vindo ao Gerador de Mapas de Contornos/Curva de Nível!")
+    print("Este programa permite que você insira uma função matemática de duas variáveis (x, y) e visualize seu gráfico de contorno.")
+    print("\nInstruções:")
+    print("1) Insira a função desejada usando 'x' e 'y' como variáveis.")
+    print("2) Utilize as funções matemáticas como exp, sin, cos, sqrt, etc.")
+    print("3) Não inclua a parte 'f(x,y) =' na sua entrada. Apenas insira a expressão matemática.")
+    print("4) Use '**' para exponenciação em vez de '^'.")
+    _print_examples(['sqrt(x) + y', 'x**2 + y**2', 'sin(x) * cos(y)', 'exp(-x**2 - y**2)', 'x * log(y + 1)'])
+
+
+def show_instructions(title: str = "Bem-vindo ao Gerador de Gráfico de Curvas de Nível e Superfícies!") -> None:
+    """
+    Exibe as instruções sobre como usar o código e fornece exemplos de funções que podem ser inseridas.
+
+    Args:
+        title (str, optional): Primeira linha da mensagem.
+    """
+    print(title)
+    print("Este programa permite que você insira uma função matemática de múltiplas variáveis (x, y, z, etc.) e visualize seu gráfico de contorno e/ou superfície.")
+    print("\nInstruções:")
+    print("1) Insira a função desejada usando 'x', 'y', 'z', etc. como variáveis.")
+    print("2) Utilize as funções matemáticas do SymPy, como exp, sin, cos, sqrt, etc.")
+    print("3) Fixe valores para variáveis adicionais que não serão plotadas (ex.: z=1).")
+    print("4) Não inclua a parte 'f(x,y,...) =' na sua entrada. Apenas insira a expressão matemática.")
+    print("5) Use '**' para exponenciação em vez de '^'.")
+    _print_examples(['sqrt(x) + y + z', 'x**2 + y**2 + z**2', 'sin(x) * cos(y) * z', 'exp(-x**2 - y**2 + z)'])
+
+
+def _enable_disk_cache() -> None:
+    # Precisa acontecer antes do primeiro default_cache(); uma GLC_EXPR_CACHE_DIR já definida prevalece.
+    from glc.cache import CACHE_DIR_ENV
+    from glc.results import RESULT_CACHE_DIR_ENV
+
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    os.environ.setdefault(CACHE_DIR_ENV, os.path.join(base, 'glc', 'expressions'))
+    os.environ.setdefault(RESULT_CACHE_DIR_ENV, os.path.join(base, 'glc', 'results'))
+
+
+def _enable_profiling(path: str) -> None:
+    if path:
+        from glc.profiling import enable
+        enable(path)
+
+
+def _use_headless_backend() -> None:
+    # Sem janela, o Agg evita importar o toolkit gráfico (Tk, Qt...) do backend padrão.
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _prompt_fixed_vars(enter: str = 'Enter') -> Dict[str, float]:
+    fixed_vars = {}
+    while True:
+        var_input = input(f"Digite a variável e valor para fixar (ex.: z=1), ou pressione {enter} para continuar: ")
+        if not var_input:
+            break
+        var, value = var_input.split('=')
+        fixed_vars[var.strip()] = float(value.strip())
+    return fixed_vars
+
+
+def _fixed_vars_arg(items: List[str]) -> Dict[str, float]:
+    from glc.functions import parse_fixed_vars
+
+    fixed_vars: Dict[str, float] = {}
+    for item in items or []:
+        fixed_vars.update(parse_fixed_vars(item))
+    return fixed_vars
+
+
+def _parser(prog: str, description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    parser.add_argument('expression', nargs='?', default=None,
+                        help="expressão em x e y; se omitida, o comando pergunta interativamente")
+    parser.add_argument('--x-range', type=float, nargs=2, default=None, metavar=('MIN', 'MAX'))
+    parser.add_argument('--y-range', type=float, nargs=2, default=None, metavar=('MIN', 'MAX'))
+    parser.add_argument('--fix', action='append', default=[], metavar='VAR=VALOR',
+                        help="fixa uma variável, ex.: --fix z=1 (pode ser repetido)")
+    parser.add_argument('--profile', nargs='?', const='glc-profile.json', default=None, metavar='ARQUIVO',
+                        help="mede cada etapa (tempo, CPU, pico de memória) e grava um trace do Chrome em ARQUIVO "
+                             "(padrão glc-profile.json), com um resumo de uma linha no fim")
+    return parser
+
+
+def _add_engine_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--engine', choices=('lambdify', 'ufunc'), default='lambdify',
+                        help="avaliação pela função do lambdify ou pelo programa de ufuncs com buffers reaproveitados")
+    parser.add_argument('--float32', action='store_true', help="malha e avaliação em float32")
+
+
+def _add_progressive_arg(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--progressive', action='store_true',
+                        help="abre a janela com uma prévia grosseira e refina a malha em segundo plano; "
+                             "um zoom refina de novo na nova vista")
+
+
+def _add_level_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--levels', type=float, nargs='+', default=None,
+                        help="níveis das curvas; se omitido, 10 níveis escolhidos por --level-strategy")
+    parser.add_argument('--level-strategy', choices=('quantile', 'linear', 'log', 'equal-area'), default='quantile',
+                        help="níveis automáticos: entre os quantis 1%% e 99%% (padrão), entre o mínimo e o máximo, "
+                             "em progressão geométrica ou com a mesma área entre níveis vizinhos")
+
+
+def _ranges(args: argparse.Namespace) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+    return tuple(args.x_range or DEFAULT_X_RANGE), tuple(args.y_range or DEFAULT_Y_RANGE)
+
+
+def contour_main(argv: Sequence[str] = None) -> int:
+    """Comando glc-contour: curvas de nível com o matplotlib (como o LC-2D.py)."""
+    parser = _parser('glc-contour', "Gráfico das curvas de nível de f(x, y).")
+    _add_level_args(parser)
+    parser.add_argument('--colormap', default='viridis')
+    parser.add_argument('--line-style', default='-')
+    parser.add_argument('--adaptive', action='store_true', help="usa amostragem adaptativa")
+    parser.add_argument('--output', default=None,
+                        help="arquivo PNG; se informado, a janela não é aberta. Com .svg, .geojson ou .glcb, "
+                             "as curvas são exportadas como vetores (ver glc.export)")
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help="tolerância da simplificação das curvas exportadas, em unidades de x e y "
+                             "(padrão: 0,1%% do maior lado do domínio)")
+    parser.add_argument('--simplify', choices=('douglas-peucker', 'visvalingam', 'none'), default='douglas-peucker',
+                        help="simplificação das curvas exportadas")
+    parser.add_argument('--resolution', type=int, default=400, help="pontos por eixo da malha")
+    parser.add_argument('--no-prune', action='store_true',
+                        help="avalia a malha inteira mesmo com --levels (sem a poda por aritmética intervalar)")
+    _add_progressive_arg(parser)
+    _add_engine_args(parser)
+    args = parser.parse_args(argv)
+    _enable_disk_cache()
+    _enable_profiling(args.profile)
+
+    if args.expression is None:
+        return _contour_interactive()
+    if args.output:
+        _use_headless_backend()
+    from glc.export import export_contours, export_format
+    from glc.functions import parse_function
+    from glc.plot2d import plot_contour
+
+    try:
+        dtype = 'float32' if args.float32 else 'float64'
+        user_function = parse_function(args.expression, _fixed_vars_arg(args.fix), engine=args.engine, dtype=dtype)
+    except ValueError:
+        print(INVALID_FUNCTION)
+        return 1
+    x_range, y_range = _ranges(args)
+    if args.output and export_format(args.output):
+        stats = export_contours(user_function, x_range, y_range, args.output, levels=args.levels,
+                                resolution=args.resolution, tolerance=args.tolerance, method=args.simplify,
+                                color_map=args.colormap, level_strategy=args.level_strategy, dtype=dtype,
+                                prune=not args.no_prune)
+        print(f"Curvas de nível exportadas para {args.output}: {stats['paths']} curvas, "
+              f"{stats['points_out']} de {stats['points_in']} pontos, {stats['bytes']} bytes")
+        return 0
+    plot_contour(user_function, x_range, y_range, levels=args.levels, save_as_png=bool(args.output),
+                 filename=args.output, color_map=args.colormap, line_style=args.line_style,
+                 adaptive=args.adaptive, show=not args.output, dtype=dtype, level_strategy=args.level_strategy,
+                 resolution=args.resolution, prune=not args.no_prune, progressive=args.progressive)
+    return 0
+
+
+def _contour_interactive() -> int:
+    from glc.functions import parse_function
+    from glc.plot2d import plot_contour
+
+    show_contour_instructions()
+
+    func_str = input(FUNCTION_PROMPT)
+    user_function = parse_function(func_str)
+
+    save_option = input("Deseja salvar o Gráfico das Curvas de Nível? (Y/N): ").strip().lower()
+    save_as_png = save_option == 'y'
+
+    filename = "GLC.png"
+    if save_as_png:
+        custom_filename = input("Digite o nome do arquivo (ex: meu_grafico.png): ").strip()
+        if custom_filename:
+            filename = custom_filename
+
+    color_map = input("Escolha um mapa de cores (ex: 'viridis', 'plasma', 'inferno', 'cividis'): ").strip()
+    if not color_map:
+        color_map = 'viridis'
+
+    line_style = input("Escolha um estilo de linha (ex: '-', '--', '-.', ':'): ").strip()
+    if not line_style:
+        line_style = '-'
+
+    adaptive_option = input("Deseja usar amostragem adaptativa? (Y/N): ").strip().lower()
+    adaptive = adaptive_option == 'y'
+
+    plot_contour(user_function, DEFAULT_X_RANGE, DEFAULT_Y_RANGE, levels=[0.1, 0.2, 0.4, 0.6, 0.8, 1.0],
+                 save_as_png=save_as_png, filename=filename, color_map=color_map, line_style=line_style,
+                 adaptive=adaptive)
+    return 0
+
+
+def surface_main(argv: Sequence[str] = None) -> int:
+    """Comando glc-surface: superfície 3D e curvas de nível com o matplotlib (como o surface3D.py)."""
+    parser = _parser('glc-surface', "Superfície 3D e curvas de nível de f(x, y).")
+    _add_level_args(parser)
+    parser.add_argument('--sweep', default=None, metavar='VAR=INÍCIO:FIM:QUADROS',
+                        help="anima a variável, ex.: --sweep z=0:2:50")
+    parser.add_argument('--output', default=None,
+                        help="imagem (ou .gif/.mp4 com --sweep); se informado, a janela não é aberta")
+    parser.add_argument('--surface-triangles', type=int, default=5000, metavar='N',
+                        help="orçamento de triângulos da superfície, concentrados onde ela se curva; "
+                             "0 usa o plot_surface com 50x50 pontos igualmente espaçados")
+    _add_progressive_arg(parser)
+    _add_engine_args(parser)
+    args = parser.parse_args(argv)
+    _enable_disk_cache()
+    _enable_profiling(args.profile)
+
+    if args.expression is None:
+        return _surface_interactive()
+    if args.output:
+        _use_headless_backend()
+    fixed_vars = _fixed_vars_arg(args.fix)
+    x_range, y_range = _ranges(args)
+    if args.sweep:
+        from glc.sweep import parse_sweep, render_sweep
+
+        try:
+            param, values = parse_sweep(args.sweep)
+            render_sweep(args.expression, x_range, y_range, param, values, fixed_vars, levels=args.levels,
+                         save_path=args.output, level_strategy=args.level_strategy)
+        except ValueError as e:
+            print(e)
+            return 1
+        return 0
+
+    from glc.functions import parse_function
+    from glc.plot3d import plot_surface_and_contour
+
+    try:
+        dtype = 'float32' if args.float32 else 'float64'
+        user_function = parse_function(args.expression, fixed_vars, engine=args.engine, dtype=dtype)
+    except ValueError:
+        print(INVALID_FUNCTION)
+        return 1
+    plot_surface_and_contour(user_function, x_range, y_range, levels=args.levels, save_path=args.output,
+                             show=not args.output, dtype=dtype, level_strategy=args.level_strategy,
+                             progressive=args.progressive, surface_triangles=args.surface_triangles)
+    return 0
+
+
+def _surface_interactive() -> int:
+    from glc.functions import parse_function, validate_function
+    from glc.plot3d import plot_surface_and_contour
+    from glc.sweep import parse_sweep, render_sweep
+
+    show_instructions("Bem-vindo ao Gerador de Mapas de Contorno e Superfícies!")
+
+    func_str = input(FUNCTION_PROMPT)
+    if not validate_function(func_str):
+        print(INVALID_FUNCTION)
+        return 1
+
+    fixed_vars = _prompt_fixed_vars()
+    sweep_input = input("Digite a variável e os valores para animar (ex.: z=0:2:50), ou pressione Enter para não animar: ")
+
+    if sweep_input:
+        # A variável animada continua livre na função compilada: todos os quadros numa só avaliação.
+        param, values = parse_sweep(sweep_input)
+        save_path = input("Digite o caminho para salvar a animação (ex.: 'animacao.gif'), ou pressione Enter para não salvar: ")
+        render_sweep(func_str, DEFAULT_X_RANGE, DEFAULT_Y_RANGE, param, values, fixed_vars, save_path=save_path or None)
+        return 0
+
+    user_function = parse_function(func_str, fixed_vars)
+    save_path = input("Digite o caminho para salvar o gráfico (ex.: 'meu_grafico.png'), ou pressione Enter para não salvar: ")
+    plot_surface_and_contour(user_function, DEFAULT_X_RANGE, DEFAULT_Y_RANGE, levels=[0.1, 0.4, 0.7, 1, 1.2, 1.4, 1.8],
+                             save_path=save_path or None)
+    return 0
+
+
+def interactive_main(argv: Sequence[str] = None) -> int:
+    """Comando glc-interactive: gráficos do plotly no navegador (como o intsurf3D.py)."""
+    parser = _parser('glc-interactive', "Superfície e curvas de nível de f(x, y), ou superfícies de nível de f(x, y, z), no navegador.")
+    parser.add_argument('--z-range', type=float, nargs=2, default=(-5.0, 5.0), metavar=('MIN', 'MAX'),
+                        help="intervalo de z quando z é uma variável livre")
+    parser.add_argument('--levels', type=float, nargs='+', default=[1.0],
+                        help="níveis k das superfícies f(x, y, z) = k")
+    parser.add_argument('--output', default=None, help="arquivo HTML; se omitido, o gráfico abre no navegador")
+    args = parser.parse_args(argv)
+    _enable_disk_cache()
+    _enable_profiling(args.profile)
+
+    if args.expression is None:
+        return _interactive_interactive()
+    fixed_vars = _fixed_vars_arg(args.fix)
+    x_range, y_range = _ranges(args)
+    return _plot_interactive(args.expression, fixed_vars, x_range, y_range, tuple(args.z_range), args.levels,
+                             args.output)
+
+
+def _plot_interactive(func_str: str, fixed_vars: Dict[str, float], x_range, y_range, z_range, levels,
+                      html_path: str = None) -> int:
+    from glc.cache import compile_function
+    from glc.functions import free_variables, normalize_function, parse_function
+    from glc.interactive import plot_interactive_surface_and_contour, plot_isosurfaces
+
+    try:
+        if 'z' in free_variables(func_str) - set(fixed_vars):
+            # Função de três variáveis: superfícies de nível f(x, y, z) = k em vez da superfície z = f(x, y).
+            user_function = compile_function(normalize_function(func_str), fixed_vars, args=('x', 'y', 'z')).func
+            plot_isosurfaces(user_function, x_range, y_range, z_range, levels, html_path=html_path)
+            return 0
+        user_function = parse_function(func_str, fixed_vars)
+    except (ValueError, TypeError):
+        print(INVALID_FUNCTION)
+        return 1
+    plot_interactive_surface_and_contour(user_function, x_range, y_range, html_path=html_path)
+    return 0
+
+
+def _interactive_interactive() -> int:
+    from glc.functions import validate_function
+
+    show_instructions()
+
+    func_str = input(FUNCTION_PROMPT)
+    if not validate_function(func_str):
+        print(INVALID_FUNCTION)
+        return 1
+
+    fixed_vars = _prompt_fixed_vars('ENTER')
+    html_path = input("Digite o arquivo HTML para salvar o gráfico, ou pressione ENTER para abri-lo no navegador: ").strip()
+
+    from glc.functions import free_variables
+
+    z_range, levels = None, None
+    if 'z' in free_variables(func_str) - set(fixed_vars):
+        z_range = tuple(map(float, (input("Digite o intervalo de z (ex.: -5 5): ").split() or ['-5', '5'])))
+        levels_input = input("Digite os níveis k separados por vírgula (ex.: 1, 4, 9): ")
+        levels = [float(v) for v in levels_input.split(',')] if levels_input.strip() else [1.0]
+    return _plot_interactive(func_str, fixed_vars, DEFAULT_X_RANGE, DEFAULT_Y_RANGE, z_range, levels, html_path or None)
+
+
+def analyze_main(argv: Sequence[str] = None) -> int:
+    """Comando glc-analyze: análise completa de f(x, y) no navegador (como o GLC_3D/test_.py)."""
+    parser = _parser('glc-analyze', "Superfície, extremos, derivadas, integrais e limites de f(x, y) no navegador.")
+    parser.add_argument('--resolution', type=int, default=400, help="número de pontos por eixo")
+    parser.add_argument('--output', default=None, help="arquivo HTML; se omitido, o gráfico abre no navegador")
+    args = parser.parse_args(argv)
+    _enable_disk_cache()
+    _enable_profiling(args.profile)
+
+    if args.expression is None:
+        return _analyze_interactive()
+    x_range, y_range = _ranges(args)
+    return _plot_analysis(args.expression, _fixed_vars_arg(args.fix), x_range, y_range, args.resolution, args.output)
+
+
+def _plot_analysis(func_str: str, fixed_vars: Dict[str, float], x_range, y_range, resolution: int,
+                   html_path: str = None) -> int:
+    from glc.analysis import plot_surface_analysis
+    from glc.functions import parse_expression
+
+    try:
+        user_function, expr = parse_expression(func_str, fixed_vars)
+    except ValueError:
+        print(INVALID_FUNCTION)
+        return 1
+    plot_surface_analysis(user_function, expr, x_range, y_range, resolution, html_path=html_path)
+    return 0
+
+
+def _analyze_interactive() -> int:
+    from glc.functions import validate_function
+
+    show_instructions()
+
+    func_str = input(FUNCTION_PROMPT)
+    if not validate_function(func_str):
+        print(INVALID_FUNCTION)
+        return 1
+
+    fixed_vars = _prompt_fixed_vars()
+    x_range = tuple(map(float, input("Digite o intervalo para o eixo x (ex.: 0 10): ").split()))
+    y_range = tuple(map(float, input("Digite o intervalo para o eixo y (ex.: -5 5): ").split()))
+    resolution = int(input("Digite a resolução (número de pontos): "))
+    html_path = input("Digite o arquivo HTML para salvar o gráfico, ou pressione ENTER para abri-lo no navegador: ").strip()
+    return _plot_analysis(func_str, fixed_vars, x_range, y_range, resolution, html_path or None)
+
+
+COMMANDS = {
+    'contour': contour_main,
+    'surface': surface_main,
+    'interactive': interactive_main,
+    'analyze': analyze_main,
+}
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """Ponto de entrada de python -m glc <comando>; inclui também os comandos batch e tiles."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    commands = sorted([*COMMANDS, 'batch', 'tiles'])
+    if not argv or argv[0] not in commands:
+        print(f"Uso: python -m glc {{{','.join(commands)}}} [argumentos]")
+        return 0 if argv and argv[0] in ('-h', '--help') else 2
+    command, rest = argv[0], argv[1:]
+    if command == 'batch':
+        from glc.batch import main as batch_main
+        return batch_main(rest)
+    if command == 'tiles':
+        from glc.tileserver import main as tiles_main
+        return tiles_main(rest)
+    return COMMANDS[command](rest)
@@ -0,0 +1,184 @@
+import html
+import json
+from typing import TYPE_CHECKING, Sequence, Tuple
+
+import numpy as np
+
+from glc.profiling import stage
+
+if TYPE_CHECKING:
+    import plotly.graph_objs as go
+
+"""
+Figuras compactas do plotly para malhas grandes.
+
+Com as matrizes X e Y do meshgrid e Z repetido na superfície e no contorno, em float64, o HTML
+de uma malha 2000x2000 passa de centenas de MB. Aqui:
+
+- a malha retangular é enviada só com os eixos 1-D x e y;
+- os valores vão em float32, que o plotly serializa como arrays binários em base64;
+- a superfície é reduzida a um nível de detalhe compatível com o tamanho da tela (não adianta
+  mandar mais vértices do que pixels);
+- no HTML independente gerado por write_html, a superfície e o contorno usam os mesmos arrays
+  x, y e z, que aparecem uma única vez no arquivo.
+"""
+
+DEFAULT_SCREEN_SIZE = (1280, 800)
+DEFAULT_PIXELS_PER_VERTEX = 4
+
+
+def lod_indices(n: int, max_points: int) -> np.ndarray:
+    """
+    Índices de até max_points pontos igualmente distribuídos em range(n), sempre incluindo o primeiro e o último.
+
+    Args:
+        n (int): Número de pontos do eixo.
+        max_points (int): Número máximo de pontos mantidos.
+    """
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max(max_points, 2)).round().astype(np.intp))
+
+
+def max_points_for_screen(screen_size: Tuple[int, int] = DEFAULT_SCREEN_SIZE,
+                          pixels_per_vertex: int = DEFAULT_PIXELS_PER_VERTEX) -> int:
+    """Número de pontos por eixo a partir do qual a tela não mostra mais detalhes."""
+    return max(2, int(max(screen_size) // max(pixels_per_vertex, 1)))
+
+
+def downsample(x: np.ndarray, y: np.ndarray, Z: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reduz uma malha retangular a no máximo max_points pontos por eixo, mantendo as bordas.
+
+    Args:
+        x (np.ndarray): Eixo x (1-D).
+        y (np.ndarray): Eixo y (1-D).
+        Z (np.ndarray): Valores (len(y), len(x)); pode ser um memmap.
+        max_points (int): Número máximo de pontos por eixo.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Eixos e malha reduzidos, em memória.
+    """
+    cols = lod_indices(len(x), max_points)
+    rows = lod_indices(len(y), max_points)
+    return np.asarray(x)[cols], np.asarray(y)[rows], np.asarray(Z)[np.ix_(rows, cols)]
+
+
+def compact_array(values: np.ndarray, dtype: type = np.float32) -> np.ndarray:
+    """
+    Converte para um array contíguo de dtype (float32 por padrão), trocando infinitos por NaN.
+
+    O plotly serializa arrays numpy como dados binários em base64 com o dtype original; NaN vira
+    uma lacuna no gráfico, enquanto infinitos estragariam a escala de cores.
+    """
+    values = np.ascontiguousarray(values, dtype=dtype)
+    if not np.isfinite(values).all():
+        values = np.where(np.isfinite(values), values, np.nan).astype(dtype)
+    return values
+
+
+def surface_and_contour(x: np.ndarray,
+                        y: np.ndarray,
+                        Z: np.ndarray,
+                        colorscale: str = 'inferno',
+                        showscale: bool = True,
+                        screen_size: Tuple[int, int] = DEFAULT_SCREEN_SIZE,
+                        pixels_per_vertex: int = DEFAULT_PIXELS_PER_VERTEX,
+                        dtype: type = np.float32) -> Tuple['go.Surface', 'go.Contour']:
+    """
+    Cria os traços go.Surface e go.Contour de uma malha retangular em formato compacto.
+
+    Os dois traços recebem os mesmos eixos 1-D e o mesmo array z reduzido, em float32.
+
+    Args:
+        x (np.ndarray): Eixo x (1-D).
+        y (np.ndarray): Eixo y (1-D).
+        Z (np.ndarray): Valores (len(y), len(x)).
+        colorscale (str, optional): Mapa de cores.
+        showscale (bool, optional): Mostra a barra de cores.
+        screen_size (Tuple[int, int], optional): Tamanho da tela em pixels, usado no nível de detalhe.
+        pixels_per_vertex (int, optional): Pixels por vértice da superfície.
+        dtype (type, optional): Tipo dos valores enviados ao navegador.
+
+    Returns:
+        Tuple[go.Surface, go.Contour]: Superfície e contorno.
+    """
+    import plotly.graph_objs as go
+
+    x, y, Z = downsample(x, y, np.broadcast_to(Z, (len(y), len(x))),
+                         max_points_for_screen(screen_size, pixels_per_vertex))
+    x, y, Z = compact_array(x, dtype), compact_array(y, dtype), compact_array(Z, dtype)
+    surface = go.Surface(z=Z, x=x, y=y, colorscale=colorscale, showscale=showscale)
+    contour = go.Contour(z=Z, x=x, y=y, colorscale=colorscale, showscale=showscale)
+    return surface, contour
+
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{plotlyjs}
+</head>
+<body style="margin: 0">
+<div id="glc-figure" style="width: 100%; height: 100vh"></div>
+<script type="text/javascript">
+var figure = {figure};
+var shared = {shared};
+shared.forEach(function (s) {{ figure.data[s[2]][s[0]] = figure.data[s[1]][s[0]]; }});
+Plotly.newPlot('glc-figure', figure.data, figure.layout, {{responsive: true}});
+</script>
+</body>
+</html>
+"""
+
+
+def write_html(fig: 'go.Figure',
+               path: str,
+               shared: Sequence[Tuple[str, int, int]] = (('x', 0, 1), ('y', 0, 1), ('z', 0, 1)),
+               include_plotlyjs: str = 'cdn') -> int:
+    """
+    Grava a figura num arquivo HTML independente, com os arrays compartilhados escritos uma só vez.
+
+    Args:
+        fig (go.Figure): Figura.
+        path (str): Caminho do arquivo .html.
+        shared (Sequence[Tuple[str, int, int]], optional): Triplas (atributo, traço de origem, traço de destino);
+            o destino recebe, no navegador, o mesmo array da origem. O padrão compartilha x, y e z entre
+            os traços 0 e 1 (superfície e contorno de surface_and_contour).
+        include_plotlyjs (str, optional): 'cdn' para carregar o plotly.js da CDN, ou 'inline' para embuti-lo
+            no arquivo (cerca de 4,5 MB, mas funciona sem internet).
+
+    Returns:
+        int: Tamanho do arquivo em bytes.
+    """
+    import plotly.io as pio
+
+    if include_plotlyjs not in ('cdn', 'inline'):
+        raise ValueError("include_plotlyjs deve ser 'cdn' ou 'inline'.")
+    with stage('to_json'):
+        figure = json.loads(pio.to_json(fig, validate=False))
+    links = []
+    for attr, source, target in shared:
+        traces = figure['data']
+        if max(source, target) < len(traces) and attr in traces[source] and \
+                traces[target].get(attr) == traces[source][attr]:
+            traces[target].pop(attr)
+            links.append([attr, source, target])
+
+    if include_plotlyjs == 'inline':
+        from plotly.offline import get_plotlyjs
+        plotlyjs = f'<script type="text/javascript">{get_plotlyjs()}</script>'
+    else:
+        from plotly.offline.offline import get_plotlyjs_version
+        plotlyjs = f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js" charset="utf-8"></script>'
+
+    title = figure.get('layout', {}).get('title', {})
+    title = title.get('text', 'GLC') if isinstance(title, dict) else str(title)
+    content = _HTML_TEMPLATE.format(title=html.escape(title), plotlyjs=plotlyjs,
+                                    figure=json.dumps(figure, separators=(',', ':')).replace('</', '<\\/'),
+                                    shared=json.dumps(links))
+    with stage('write_html', path=path, nbytes=len(content)):
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(content)
+    return len(content.encode('utf-8'))
@@ -0,0 +1,189 @@
+from typing import List, Sequence
+
+import numpy as np
+
+"""
+Extração de curvas de nível sem matplotlib (marching squares vetorizado em NumPy).
+
+Recebe a malha Z e a lista de níveis e devolve, para cada nível, as poligonais da curva.
+Cada célula da malha é classificada pelos quatro cantos (acima/abaixo do nível); as células de
+sela são desambiguadas pelo valor médio dos cantos. Os segmentos são orientados de modo que a
+região mais alta fique sempre à esquerda, o que faz cada ponto de cruzamento ter no máximo um
+sucessor e um antecessor. A costura dos segmentos em caminhos abertos ou fechados é feita por
+saltos de ponteiros (pointer jumping), sem laços em Python sobre os pontos.
+
+Convenções: os cantos de uma célula são numerados no sentido anti-horário a partir do canto
+inferior esquerdo (c0, c1, c2, c3) e a aresta k liga o canto k ao canto k+1.
+"""
+
+
+def _segment_table() -> np.ndarray:
+    # table[case, center_high] -> até dois segmentos (aresta_origem, aresta_destino), -1 se vazio.
+    # Um segmento sai de uma aresta "alto -> baixo" e entra numa aresta "baixo -> alto".
+    table = np.full((16, 2, 2, 2), -1, dtype=np.int64)
+    for case in range(16):
+        high = [(case >> k) & 1 for k in range(4)]
+        leaving = [k for k in range(4) if high[k] and not high[(k + 1) % 4]]
+        entering = [k for k in range(4) if not high[k] and high[(k + 1) % 4]]
+        for center_high in (0, 1):
+            if len(leaving) == 1:
+                pairs = [(leaving[0], entering[0])]
+            else:
+                step = 1 if center_high else -1
+                pairs = [(k, (k + step) % 4) for k in leaving]
+            for slot, pair in enumerate(pairs):
+                table[case, center_high, slot] = pair
+    return table
+
+
+_SEGMENTS = _segment_table()
+
+
+def _axis(values: np.ndarray, axis: int) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 2:
+        values = values[0, :] if axis == 1 else values[:, 0]
+    return values
+
+
+def _stitch(src: np.ndarray, dst: np.ndarray, n_nodes: int):
+    """
+    Costura segmentos orientados (src -> dst) em caminhos.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: ordem dos nós ao longo dos caminhos, índice de
+        início de cada caminho nessa ordem e máscara de caminhos fechados.
+    """
+    nodes = np.arange(n_nodes)
+    nxt = nodes.copy()
+    nxt[src] = dst
+    rounds = int(np.ceil(np.log2(max(n_nodes, 2)))) + 1
+
+    # Nós de ciclos nunca chegam a um nó terminal (nxt[n] == n).
+    jump = nxt.copy()
+    for _ in range(rounds):
+        jump = jump[jump]
+    on_cycle = nxt[jump] != jump
+
+    # Cada ciclo é aberto no seu menor nó, que passa a ser o início do caminho.
+    closed_head = np.zeros(n_nodes, dtype=bool)
+    if on_cycle.any():
+        label = np.where(on_cycle, nodes, n_nodes)
+        jump = np.where(on_cycle, nxt, nodes)
+        for _ in range(rounds):
+            label = np.minimum(label, label[jump])
+            jump = jump[jump]
+        closed_head = on_cycle & (label == nodes)
+        nxt = np.where(on_cycle & closed_head[nxt], nodes, nxt)
+
+    dist = (nxt != nodes).astype(np.int64)
+    jump = nxt.copy()
+    for _ in range(rounds):
+        dist = dist + dist[jump]
+        jump = jump[jump]
+
+    order = np.lexsort((-dist, jump))
+    terminal = jump[order]
+    starts = np.flatnonzero(np.r_[True, terminal[1:] != terminal[:-1]])
+    return order, starts, closed_head[order[starts]]
+
+
+def marching_squares(x: np.ndarray,
+                     y: np.ndarray,
+                     Z: np.ndarray,
+                     levels: Sequence[float],
+                     max_cells: int = 1 << 24) -> List[List[np.ndarray]]:
+    """
+    Extrai as curvas de nível de uma malha retangular.
+
+    Args:
+        x (np.ndarray): Eixo x (1-D, tamanho nx) ou a malha X (ny, nx) do np.meshgrid.
+        y (np.ndarray): Eixo y (1-D, tamanho ny) ou a malha Y (ny, nx) do np.meshgrid.
+        Z (np.ndarray): Valores da função na malha (ny, nx). Células com NaN são ignoradas.
+        levels (Sequence[float]): Níveis das curvas.
+        max_cells (int, optional): Limite de células x níveis processadas de uma vez, para controlar a memória.
+
+    Returns:
+        List[List[np.ndarray]]: Para cada nível, a lista de poligonais (arrays (n, 2) com colunas x, y).
+        Caminhos fechados repetem o primeiro ponto no final.
+    """
+    x = _axis(x, 1)
+    y = _axis(y, 0)
+    Z = np.asarray(Z, dtype=float)
+    levels = np.atleast_1d(np.asarray(levels, dtype=float))
+    ny, nx = Z.shape
+    if x.shape != (nx,) or y.shape != (ny,):
+        raise ValueError("As dimensões de x, y e Z não são compatíveis.")
+
+    result: List[List[np.ndarray]] = [[] for _ in range(levels.size)]
+    if nx < 2 or ny < 2 or levels.size == 0:
+        return result
+
+    # Só interessam as células em que algum nível fica entre o menor e o maior canto.
+    c0, c1, c2, c3 = Z[:-1, :-1], Z[:-1, 1:], Z[1:, 1:], Z[1:, :-1]
+    cmin = np.minimum(np.minimum(c0, c1), np.minimum(c2, c3))
+    cmax = np.maximum(np.maximum(c0, c1), np.maximum(c2, c3))
+    sorted_levels = np.sort(levels)
+    with np.errstate(invalid='ignore'):
+        first_level = np.searchsorted(sorted_levels, cmin, side='left')
+        crossed = np.isfinite(cmin) & np.isfinite(cmax) & (first_level < sorted_levels.size)
+        crossed &= sorted_levels[np.minimum(first_level, sorted_levels.size - 1)] < cmax
+    rows, cols = np.nonzero(crossed)
+    corners = np.stack([c0[rows, cols], c1[rows, cols], c2[rows, cols], c3[rows, cols]], axis=1)
+    center = corners.mean(axis=1)
+
+    n_h = ny * (nx - 1)
+    n_edges = n_h + (ny - 1) * nx
+    # Identificador global de cada aresta da célula: e0 inferior, e1 direita, e2 superior, e3 esquerda.
+    edge_ids = np.stack([rows * (nx - 1) + cols,
+                         n_h + rows * nx + cols + 1,
+                         (rows + 1) * (nx - 1) + cols,
+                         n_h + rows * nx + cols], axis=1)
+
+    chunk = max(1, max_cells // max(rows.size, 1))
+    for first in range(0, levels.size, chunk):
+        block = levels[first:first + chunk]
+        high = corners[None, :, :] > block[:, None, None]
+        case = (high[..., 0] | (high[..., 1] << 1) | (high[..., 2] << 2) | (high[..., 3] << 3)).astype(np.int64)
+        center_high = (center[None, :] > block[:, None]).astype(np.int64)
+        level_idx, cell = np.nonzero((case != 0) & (case != 15))
+        segments = _SEGMENTS[case[level_idx, cell], center_high[level_idx, cell]]
+
+        used = segments[:, :, 0] >= 0
+        seg_level = np.broadcast_to(level_idx[:, None], used.shape)[used]
+        seg_cell = np.broadcast_to(cell[:, None], used.shape)[used]
+        base = seg_level.astype(np.int64) * n_edges
+        src = base + edge_ids[seg_cell, segments[:, :, 0][used]]
+        dst = base + edge_ids[seg_cell, segments[:, :, 1][used]]
+        if src.size == 0:
+            continue
+
+        node_ids, inverse = np.unique(np.concatenate([src, dst]), return_inverse=True)
+        points = _crossings(node_ids % n_edges, x, y, Z, block[node_ids // n_edges], nx, n_h)
+        order, starts, closed = _stitch(inverse[:src.size], inverse[src.size:], node_ids.size)
+
+        # Caminhos fechados repetem o primeiro ponto no final.
+        path_level = first + node_ids[order[starts]] // n_edges
+        ends = np.r_[starts[1:], order.size]
+        order = np.insert(order, ends[closed], order[starts[closed]])
+        starts = starts + np.cumsum(closed) - closed
+        for level, path in zip(path_level, np.split(points[order], starts[1:])):
+            result[level].append(path)
+    return result
+
+
+def _crossings(edges: np.ndarray, x: np.ndarray, y: np.ndarray, Z: np.ndarray,
+               level: np.ndarray, nx: int, n_h: int) -> np.ndarray:
+    # Ponto em que o nível cruza cada aresta, por interpolação linear entre os extremos.
+    horizontal = edges < n_h
+    vertical_id = edges - n_h
+    row = np.where(horizontal, edges // max(nx - 1, 1), vertical_id // nx)
+    col = np.where(horizontal, edges % max(nx - 1, 1), vertical_id % nx)
+    row2 = np.where(horizontal, row, row + 1)
+    col2 = np.where(horizontal, col + 1, col)
+    z1 = Z[row, col]
+    z2 = Z[row2, col2]
+    t = (level - z1) / (z2 - z1)
+    px = x[col] + t * (x[col2] - x[col])
+    py = y[row] + t * (y[row2] - y[row])
+    return np.column_stack([px, py])
@@ -0,0 +1,217 @@
+import functools
+import heapq
+from typing import NamedTuple
+
+import numpy as np
+
+from glc.profiling import stage
+
+"""
+Malha reduzida da superfície 3D do matplotlib (surface3D.py / glc-surface).
+
+O ax.plot_surface reduz qualquer malha a 50x50 pontos (rcount=ccount=50) pegando linhas e colunas
+igualmente espaçadas: um pico estreito ou uma crista entre duas linhas some da superfície, por
+maior que seja a resolução avaliada; pedir mais pontos (rstride=cstride=1) deixa a rotação e o
+savefig lentos. Aqui o orçamento de triângulos é gasto onde a superfície se curva.
+
+A malha avaliada é dividida numa quadtree de células. O erro de uma célula é o maior desvio entre
+os valores da malha dentro dela e os dois triângulos formados pelos seus quatro cantos (pela pior
+das duas diagonais), ou seja, o que se perde ao desenhá-la assim; ele cresce com a curvatura. A
+célula de maior erro é dividida em quatro, até o maior erro ficar abaixo da tolerância ou o
+orçamento acabar. Os cantos das células finais (mais o mínimo e o máximo da malha) são
+triangulados (Delaunay nos índices da malha, sem fendas nas junções entre células de tamanhos
+diferentes) e desenhados com ax.plot_trisurf. Células com pontos fora do domínio (NaN) são
+divididas até a borda do domínio, e os triângulos que cruzam um buraco são mascarados. Sem
+triângulos para desenhar (nenhum ponto no domínio, ou menos de três pontos não colineares),
+plot_surface_mesh volta ao ax.plot_surface.
+
+O gráfico das curvas de nível continua usando a malha completa.
+"""
+
+# Cerca do mesmo número de polígonos do plot_surface padrão (2 * 49 * 49).
+DEFAULT_MAX_TRIANGLES = 5000
+
+# Tolerância padrão, como fração da amplitude de z.
+DEFAULT_RELATIVE_TOLERANCE = 1e-3
+
+# Células por eixo da divisão inicial.
+_INITIAL_CELLS = 8
+
+
+class SurfaceMesh(NamedTuple):
+    """
+    Malha triangular reduzida de uma superfície z = f(x, y).
+
+    Attributes:
+        x (np.ndarray): Coordenada x de cada vértice.
+        y (np.ndarray): Coordenada y de cada vértice.
+        z (np.ndarray): Valor de cada vértice.
+        triangles (np.ndarray): Índices (m, 3) dos vértices de cada triângulo.
+        mask (np.ndarray): Triângulos (m,) que cruzam pontos fora do domínio, ou None.
+        error (float): Maior desvio, nas células mantidas, entre a malha avaliada e a reduzida.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    z: np.ndarray
+    triangles: np.ndarray
+    mask: np.ndarray
+    error: float
+
+
+@functools.lru_cache(maxsize=256)
+def _weights(rows: int, cols: int) -> np.ndarray:
+    # Pesos (2, 4, rows, cols) de z00, z01, z10 e z11 na interpolação pelos dois triângulos da célula,
+    # por cada uma das diagonais. As células da quadtree têm poucos tamanhos diferentes.
+    u = np.linspace(0.0, 1.0, cols)[None, :]
+    v = np.linspace(0.0, 1.0, rows)[:, None]
+    zero = np.zeros((rows, cols))
+    upper = u >= v
+    diagonal = [np.where(upper, 1 - u, 1 - v), np.where(upper, u - v, zero),
+                np.where(upper, zero, v - u), np.where(upper, v, u)]
+    lower = u + v <= 1
+    anti = [np.where(lower, 1 - u - v, zero), np.where(lower, u, 1 - v),
+            np.where(lower, v, 1 - u), np.where(lower, zero, u + v - 1)]
+    weights = np.array([np.broadcast_to(w, (rows, cols)) for w in diagonal + anti]).reshape(2, 4, rows, cols)
+    weights.flags.writeable = False
+    return weights
+
+
+def _cell_error(Z: np.ndarray, r0: int, r1: int, c0: int, c1: int) -> float:
+    sub = Z[r0:r1 + 1, c0:c1 + 1]
+    valid = np.isfinite(sub)
+    if not valid.any():
+        return 0.0
+    if not valid.all():
+        # Borda do domínio: a célula é dividida até onde for possível.
+        return np.inf
+    # A célula vira dois triângulos, por uma das diagonais (a triangulação escolhe): o erro é o pior
+    # entre as duas escolhas.
+    corners = np.array([sub[0, 0], sub[0, -1], sub[-1, 0], sub[-1, -1]])
+    planes = np.einsum('k,dkij->dij', corners, _weights(*sub.shape))
+    return float(np.abs(sub - planes).max())
+
+
+def _split(lo: int, hi: int):
+    if hi - lo <= 1:
+        return [(lo, hi)]
+    mid = (lo + hi) // 2
+    return [(lo, mid), (mid, hi)]
+
+
+def decimate_surface(x: np.ndarray, y: np.ndarray, Z: np.ndarray,
+                     max_triangles: int = DEFAULT_MAX_TRIANGLES, tolerance: float = None) -> SurfaceMesh:
+    """
+    Reduz a malha avaliada a uma malha triangular, com os triângulos concentrados onde a superfície se curva.
+
+    Args:
+        x (np.ndarray): Eixo x (1-D).
+        y (np.ndarray): Eixo y (1-D).
+        Z (np.ndarray): Valores (len(y), len(x)); NaN, infinitos e pontos mascarados ficam fora da malha.
+        max_triangles (int, optional): Orçamento aproximado de triângulos.
+        tolerance (float, optional): Desvio máximo aceito, nas unidades de z. Se None,
+            DEFAULT_RELATIVE_TOLERANCE vezes a amplitude de z. O refinamento para antes se o
+            orçamento acabar; o desvio alcançado fica em SurfaceMesh.error.
+
+    Returns:
+        SurfaceMesh: Vértices, triângulos e máscara, prontos para ax.plot_trisurf.
+    """
+    from matplotlib.tri import Triangulation
+
+    x = np.asarray(x)
+    y = np.asarray(y)
+    Z = np.ma.filled(np.ma.asarray(Z, dtype=float), np.nan)
+    if Z.shape != (y.size, x.size) or min(Z.shape) < 2:
+        raise ValueError("A malha deve ter a forma (len(y), len(x)), com pelo menos 2 pontos por eixo.")
+    if max_triangles < 2:
+        raise ValueError("O orçamento de triângulos deve ser pelo menos 2.")
+    finite = np.isfinite(Z)
+    if not finite.any():
+        empty = np.empty(0)
+        return SurfaceMesh(empty, empty, empty, np.empty((0, 3), dtype=np.intp), None, 0.0)
+    Z = np.where(finite, Z, np.nan)
+    ny, nx = Z.shape
+    if tolerance is None:
+        tolerance = DEFAULT_RELATIVE_TOLERANCE * float(np.nanmax(Z) - np.nanmin(Z))
+
+    rows = np.unique(np.linspace(0, ny - 1, min(_INITIAL_CELLS, ny - 1) + 1).round().astype(np.intp))
+    cols = np.unique(np.linspace(0, nx - 1, min(_INITIAL_CELLS, nx - 1) + 1).round().astype(np.intp))
+    # Vértices marcados até aqui: a triangulação de V vértices tem cerca de 2V triângulos.
+    keep = np.zeros(Z.shape, dtype=bool)
+    keep[np.ix_(rows, cols)] = True
+    vertices = int(keep.sum())
+    heap = []
+    for r0, r1 in zip(rows[:-1], rows[1:]):
+        for c0, c1 in zip(cols[:-1], cols[1:]):
+            heap.append((-_cell_error(Z, r0, r1, c0, c1), r0, r1, c0, c1))
+    heapq.heapify(heap)
+    leaves = []
+    # Dividir uma célula cria no máximo 5 vértices novos (o centro e os meios dos lados).
+    while heap and 2 * (vertices + 5) <= max_triangles:
+        cell = heap[0]
+        if -cell[0] <= tolerance:
+            break
+        heapq.heappop(heap)
+        _, r0, r1, c0, c1 = cell
+        if r1 - r0 <= 1 and c1 - c0 <= 1:
+            leaves.append(cell)
+            continue
+        rm, cm = (r0 + r1) // 2, (c0 + c1) // 2
+        for r, c in ((rm, c0), (rm, cm), (rm, c1), (r0, cm), (r1, cm)):
+            if not keep[r, c]:
+                keep[r, c] = True
+                vertices += 1
+        for rr0, rr1 in _split(r0, r1):
+            for cc0, cc1 in _split(c0, c1):
+                heapq.heappush(heap, (-_cell_error(Z, rr0, rr1, cc0, cc1), rr0, rr1, cc0, cc1))
+    leaves.extend(heap)
+
+    # O mínimo e o máximo da malha ficam sempre entre os vértices.
+    keep[np.unravel_index(np.nanargmin(Z), Z.shape)] = True
+    keep[np.unravel_index(np.nanargmax(Z), Z.shape)] = True
+    vr, vc = np.nonzero(keep & finite)
+
+    # Delaunay nos índices da malha, e não em x e y: intervalos de escalas muito diferentes não
+    # geram triângulos finos.
+    try:
+        triangles = Triangulation(vc.astype(float), vr.astype(float)).triangles
+    except (ValueError, RuntimeError):
+        # Menos de três vértices, ou todos colineares (o qhull recusa).
+        triangles = np.empty((0, 3), dtype=np.intp)
+    mask = None
+    if not finite.all():
+        centroid_r = np.rint(vr[triangles].mean(axis=1)).astype(np.intp)
+        centroid_c = np.rint(vc[triangles].mean(axis=1)).astype(np.intp)
+        mask = ~finite[centroid_r, centroid_c]
+    errors = [-cell[0] for cell in leaves if np.isfinite(cell[0])]
+    return SurfaceMesh(x[vc], y[vr], Z[vr, vc], triangles, mask, max(errors, default=0.0))
+
+
+def plot_surface_mesh(ax, x: np.ndarray, y: np.ndarray, Z: np.ndarray,
+                      max_triangles: int = DEFAULT_MAX_TRIANGLES, **kwargs):
+    """
+    Desenha a superfície com a malha reduzida por decimate_surface.
+
+    Se a malha reduzida não tiver triângulos visíveis, a superfície é desenhada pelo ax.plot_surface
+    com a malha completa, que aceita malhas sem nenhum ponto no domínio.
+
+    Args:
+        ax (Axes3D): Eixos 3D.
+        x (np.ndarray): Eixo x (1-D).
+        y (np.ndarray): Eixo y (1-D).
+        Z (np.ndarray): Valores (len(y), len(x)).
+        max_triangles (int, optional): Orçamento aproximado de triângulos.
+        **kwargs: Repassados ao ax.plot_trisurf ou ao ax.plot_surface (cmap, edgecolor, ...).
+
+    Returns:
+        Poly3DCollection: Artista da superfície.
+    """
+    with stage('decimate', z=Z, max_triangles=max_triangles) as profile:
+        mesh = decimate_surface(x, y, Z, max_triangles)
+        profile.note(triangles=len(mesh.triangles), error=mesh.error)
+    visible = len(mesh.triangles) if mesh.mask is None else int(np.count_nonzero(~mesh.mask))
+    if not visible:
+        # plot_surface faz o broadcasting de x[None, :] e y[:, None] com Z; a malha não é montada aqui.
+        with stage('plot_surface', z=Z):
+            return ax.plot_surface(np.asarray(x)[None, :], np.asarray(y)[:, None], Z, **kwargs)
+    with stage('plot_surface', triangles=visible):
+        return ax.plot_trisurf(mesh.x, mesh.y, mesh.z, triangles=mesh.triangles, mask=mesh.mask, **kwargs)
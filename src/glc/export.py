@@ -0,0 +1,484 @@
+import heapq
+import json
+import os
+import struct
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from glc.contour import marching_squares
+from glc.profiling import stage
+
+"""
+Exportação das curvas de nível como vetores (SVG, GeoJSON e um formato binário compacto).
+
+O LC-2D.py e o surface3D.py só gravam a figura do matplotlib como PNG; para usar as curvas em outro
+programa era preciso rasterizar de novo com mais DPI. Aqui as poligonais do marching squares
+(glc.contour) são gravadas diretamente, sem montar nenhuma figura: as curvas de todos os níveis
+saem de uma só passada pela malha e cada nível vai para o arquivo assim que é simplificado.
+
+Antes de gravar, cada poligonal é simplificada com uma tolerância em unidades de x e y
+(Douglas-Peucker ou Visvalingam-Whyatt) e as coordenadas são arredondadas para uma grade de passo
+tolerância / 4. Um trecho reto de curva vira dois pontos, qualquer que seja a resolução da malha,
+e o tamanho do arquivo acompanha a complexidade das curvas. Curvas fechadas menores que a
+tolerância desaparecem.
+
+Formatos, pela extensão do arquivo:
+
+    .svg      um <path> por nível, em coordenadas inteiras da grade (o y cresce para cima)
+    .geojson  FeatureCollection com uma MultiLineString por nível (propriedades level e stroke)
+    .glcb     binário: cabeçalho '<4sB3xddd' (b'GLCB', versão, origem x, origem y, passo da grade) e,
+              por nível, '<dII' (nível, número de caminhos, bytes dos dados) seguido dos dados: para
+              cada caminho, o número de pontos, o primeiro ponto e as diferenças entre pontos
+              consecutivos, em inteiros da grade codificados como varint zigzag (ver read_binary)
+"""
+
+FORMATS = {'.svg': 'svg', '.geojson': 'geojson', '.glcb': 'binary'}
+
+SIMPLIFY_METHODS = ('douglas-peucker', 'visvalingam', 'none')
+
+# Tolerância padrão, como fração do maior lado do domínio.
+DEFAULT_RELATIVE_TOLERANCE = 1e-3
+
+# Passos da grade de quantização por tolerância: o arredondamento desloca um ponto no máximo 1/8 da tolerância.
+_QUANTA_PER_TOLERANCE = 4
+
+_BINARY_MAGIC = b'GLCB'
+_BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct('<4sB3xddd')
+_BINARY_LEVEL = struct.Struct('<dII')
+
+# Largura do SVG em pixels; a altura segue a proporção do domínio.
+_SVG_WIDTH = 800
+
+
+def _distances(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Distância de cada ponto ao segmento ab (a == b nas curvas fechadas).
+    ab = b - a
+    ap = points - a
+    length2 = float(ab @ ab)
+    if length2 == 0.0:
+        return np.hypot(ap[:, 0], ap[:, 1])
+    t = np.clip(ap @ ab / length2, 0.0, 1.0)
+    d = ap - t[:, None] * ab
+    return np.hypot(d[:, 0], d[:, 1])
+
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Simplifica uma poligonal pelo algoritmo de Douglas-Peucker.
+
+    Args:
+        points (np.ndarray): Pontos (n, 2).
+        tolerance (float): Distância máxima entre a poligonal original e a simplificada.
+
+    Returns:
+        np.ndarray: Subconjunto dos pontos, mantendo o primeiro e o último.
+    """
+    n = len(points)
+    if n <= 2:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        d = _distances(points[first + 1:last], points[first], points[last])
+        k = int(np.argmax(d))
+        if d[k] > tolerance:
+            k += first + 1
+            keep[k] = True
+            stack.append((first, k))
+            stack.append((k, last))
+    return points[keep]
+
+
+def visvalingam(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Simplifica uma poligonal pelo algoritmo de Visvalingam-Whyatt.
+
+    Remove repetidamente o ponto cujo triângulo com os vizinhos tem a menor área, enquanto essa
+    área for menor que tolerance². Preserva melhor a forma geral que o Douglas-Peucker, com
+    menos pontos nas curvas suaves.
+
+    Args:
+        points (np.ndarray): Pontos (n, 2).
+        tolerance (float): Tolerância; a área mínima mantida é tolerance².
+
+    Returns:
+        np.ndarray: Subconjunto dos pontos, mantendo o primeiro e o último.
+    """
+    n = len(points)
+    if n <= 2:
+        return points
+    threshold = tolerance ** 2
+    xs, ys = points[:, 0].tolist(), points[:, 1].tolist()
+    prev = list(range(-1, n - 1))
+    nxt = list(range(1, n + 1))
+
+    def area(i: int) -> float:
+        a, c = prev[i], nxt[i]
+        return abs((xs[i] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[i] - ys[a])) / 2
+
+    current = [np.inf] + [area(i) for i in range(1, n - 1)] + [np.inf]
+    heap = [(current[i], i) for i in range(1, n - 1)]
+    heapq.heapify(heap)
+    removed = np.zeros(n, dtype=bool)
+    while heap:
+        a, i = heapq.heappop(heap)
+        if removed[i] or a != current[i]:
+            continue
+        if a >= threshold:
+            break
+        removed[i] = True
+        p, q = prev[i], nxt[i]
+        nxt[p], prev[q] = q, p
+        for j in (p, q):
+            if 0 < j < n - 1:
+                # A área efetiva de um vizinho nunca fica menor que a do ponto removido.
+                current[j] = max(area(j), a)
+                heapq.heappush(heap, (current[j], j))
+    return points[~removed]
+
+
+def simplify(points: np.ndarray, tolerance: float, method: str = 'douglas-peucker') -> np.ndarray:
+    """
+    Simplifica uma poligonal com o método escolhido.
+
+    Args:
+        points (np.ndarray): Pontos (n, 2).
+        tolerance (float): Tolerância em unidades de x e y.
+        method (str, optional): 'douglas-peucker', 'visvalingam' ou 'none'.
+
+    Returns:
+        np.ndarray: Pontos mantidos.
+    """
+    if method not in SIMPLIFY_METHODS:
+        raise ValueError(f"Método de simplificação desconhecido: {method!r}. Use um de {SIMPLIFY_METHODS}.")
+    if method == 'douglas-peucker':
+        return douglas_peucker(points, tolerance)
+    if method == 'visvalingam':
+        return visvalingam(points, tolerance)
+    return points
+
+
+def quantize(points: np.ndarray, origin: np.ndarray, quantum: float) -> np.ndarray:
+    """
+    Arredonda os pontos para a grade de passo quantum e remove os pontos repetidos em sequência.
+
+    Returns:
+        np.ndarray: Coordenadas inteiras (n, 2) da grade, contadas a partir de origin.
+    """
+    q = np.rint((np.asarray(points, dtype=float) - origin) / quantum).astype(np.int64)
+    keep = np.r_[True, np.any(q[1:] != q[:-1], axis=1)]
+    return q[keep]
+
+
+def level_colors(n: int, color_map: str = 'viridis') -> List[str]:
+    """Cores '#rrggbb' de n níveis no mapa de cores do matplotlib, como no ax.contour."""
+    from matplotlib import colormaps
+    from matplotlib.colors import to_hex
+
+    cmap = colormaps[color_map]
+    return [to_hex(cmap(t)) for t in np.linspace(0.0, 1.0, n)]
+
+
+def _varints(values: np.ndarray) -> bytes:
+    # Inteiros com sinal em varint zigzag (LEB128): 7 bits por byte, bit alto = continua.
+    v = np.asarray(values, dtype=np.int64).ravel()
+    z = ((v << 1) ^ (v >> 63)).view(np.uint64)
+    shifts = np.arange(10, dtype=np.uint64) * np.uint64(7)
+    more = (z[:, None] >> shifts[1:]) != 0
+    length = 1 + more.sum(axis=1)
+    groups = ((z[:, None] >> shifts) & np.uint64(0x7f)).astype(np.uint8)
+    groups[:, :-1] |= more.astype(np.uint8) << 7
+    return groups[np.arange(10) < length[:, None]].tobytes()
+
+
+def _unvarints(data: bytes) -> np.ndarray:
+    b = np.frombuffer(data, dtype=np.uint8)
+    if b.size == 0:
+        return np.empty(0, dtype=np.int64)
+    last = b < 0x80
+    starts = np.flatnonzero(np.r_[True, last[:-1]])
+    position = np.arange(b.size) - np.repeat(starts, np.diff(np.r_[starts, b.size]))
+    z = np.bitwise_or.reduceat((b & 0x7f).astype(np.uint64) << (position * 7).astype(np.uint64), starts)
+    return (z >> np.uint64(1)).astype(np.int64) ^ -(z & np.uint64(1)).astype(np.int64)
+
+
+class ContourWriter:
+    """
+    Grava as curvas de nível num arquivo, um nível de cada vez.
+
+    Use como gerenciador de contexto; cada write_level vai direto para o arquivo.
+
+    Args:
+        path (str): Arquivo de saída.
+        bounds (Tuple[float, float, float, float]): Domínio (x0, x1, y0, y1).
+        quantum (float): Passo da grade das coordenadas.
+    """
+
+    mode = 'w'
+
+    def __init__(self, path: str, bounds: Tuple[float, float, float, float], quantum: float):
+        self.path = path
+        self.bounds = tuple(float(b) for b in bounds)
+        self.quantum = float(quantum)
+        self.origin = np.array([self.bounds[0], self.bounds[2]])
+        self.paths = 0
+        self.points = 0
+        self._fh = None
+
+    def __enter__(self) -> 'ContourWriter':
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._fh = open(self.path, self.mode, **({} if 'b' in self.mode else {'encoding': 'utf-8'}))
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.end()
+        finally:
+            self._fh.close()
+
+    def begin(self) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def write_level(self, level: float, paths: Sequence[np.ndarray], color: str = '#000000') -> None:
+        """
+        Grava as curvas de um nível.
+
+        Args:
+            level (float): Nível.
+            paths (Sequence[np.ndarray]): Poligonais em coordenadas inteiras da grade (ver quantize).
+            color (str, optional): Cor do traço.
+        """
+        self.paths += len(paths)
+        self.points += sum(len(p) for p in paths)
+        self._write_level(float(level), paths, color)
+
+    def _write_level(self, level: float, paths: Sequence[np.ndarray], color: str) -> None:
+        raise NotImplementedError
+
+
+class SVGWriter(ContourWriter):
+    """Um <path> por nível, com as coordenadas inteiras da grade e deslocamentos relativos."""
+
+    def begin(self) -> None:
+        x0, x1, y0, y1 = self.bounds
+        self._width = max(1, int(round((x1 - x0) / self.quantum)))
+        self._height = max(1, int(round((y1 - y0) / self.quantum)))
+        height = max(1, round(_SVG_WIDTH * self._height / self._width))
+        self._fh.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{_SVG_WIDTH}" height="{height}" '
+                       f'viewBox="0 0 {self._width} {self._height}" fill="none" stroke-width="1" '
+                       f'stroke-linejoin="round" stroke-linecap="round">\n')
+
+    def _write_level(self, level: float, paths: Sequence[np.ndarray], color: str) -> None:
+        if not paths:
+            return
+        commands = []
+        for path in paths:
+            # O y do SVG cresce para baixo.
+            start = f"M{path[0, 0]} {self._height - path[0, 1]}"
+            closed = len(path) > 2 and (path[0] == path[-1]).all()
+            steps = np.diff(path[:-1] if closed else path, axis=0) * (1, -1)
+            commands.append(start + ('l' + ' '.join(map(str, steps.ravel().tolist())) if steps.size else '')
+                            + ('z' if closed else ''))
+        self._fh.write(f'<path data-level="{level!r}" stroke="{color}" vector-effect="non-scaling-stroke" '
+                       f'd="{"".join(commands)}"/>\n')
+
+    def end(self) -> None:
+        self._fh.write('</svg>\n')
+
+
+class GeoJSONWriter(ContourWriter):
+    """FeatureCollection com uma MultiLineString por nível, em coordenadas x, y arredondadas à grade."""
+
+    def begin(self) -> None:
+        x0, x1, y0, y1 = self.bounds
+        # Casas decimais suficientes para representar o passo da grade.
+        self._digits = max(0, int(np.ceil(-np.log10(self.quantum))))
+        self._fh.write('{"type": "FeatureCollection", "bbox": %s, "features": [' % json.dumps([x0, y0, x1, y1]))
+        self._first = True
+
+    def _write_level(self, level: float, paths: Sequence[np.ndarray], color: str) -> None:
+        if not paths:
+            return
+        lines = [np.round(path * self.quantum + self.origin, self._digits).tolist() for path in paths]
+        feature = {'type': 'Feature', 'properties': {'level': level, 'stroke': color},
+                   'geometry': {'type': 'MultiLineString', 'coordinates': lines}}
+        self._fh.write(('\n' if self._first else ',\n') + json.dumps(feature, separators=(',', ':')))
+        self._first = False
+
+    def end(self) -> None:
+        self._fh.write('\n]}\n')
+
+
+class BinaryWriter(ContourWriter):
+    """Formato .glcb: inteiros da grade em varint zigzag, com diferenças entre pontos consecutivos."""
+
+    mode = 'wb'
+
+    def begin(self) -> None:
+        self._fh.write(_BINARY_HEADER.pack(_BINARY_MAGIC, _BINARY_VERSION, self.origin[0], self.origin[1], self.quantum))
+
+    def _write_level(self, level: float, paths: Sequence[np.ndarray], color: str) -> None:
+        parts = []
+        for path in paths:
+            parts.append([len(path)])
+            parts.append(np.diff(path, axis=0, prepend=[[0, 0]]).ravel())
+        data = _varints(np.concatenate(parts)) if parts else b''
+        self._fh.write(_BINARY_LEVEL.pack(level, len(paths), len(data)))
+        self._fh.write(data)
+
+
+_WRITERS = {'svg': SVGWriter, 'geojson': GeoJSONWriter, 'binary': BinaryWriter}
+
+
+def export_format(path: str) -> str:
+    """Formato de exportação pela extensão do arquivo ('svg', 'geojson' ou 'binary'), ou None."""
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def read_binary(path: str) -> List[Tuple[float, List[np.ndarray]]]:
+    """
+    Lê um arquivo .glcb.
+
+    Args:
+        path (str): Arquivo gravado por write_contours.
+
+    Returns:
+        List[Tuple[float, List[np.ndarray]]]: Para cada nível, o nível e as poligonais (n, 2) em x, y.
+    """
+    with open(path, 'rb') as fh:
+        magic, version, ox, oy, quantum = _BINARY_HEADER.unpack(fh.read(_BINARY_HEADER.size))
+        if magic != _BINARY_MAGIC or version != _BINARY_VERSION:
+            raise ValueError(f"{path} não é um arquivo .glcb (versão {_BINARY_VERSION}).")
+        origin = np.array([ox, oy])
+        levels = []
+        while True:
+            header = fh.read(_BINARY_LEVEL.size)
+            if len(header) < _BINARY_LEVEL.size:
+                return levels
+            level, n_paths, n_bytes = _BINARY_LEVEL.unpack(header)
+            values = _unvarints(fh.read(n_bytes))
+            paths, i = [], 0
+            for _ in range(n_paths):
+                n = int(values[i])
+                paths.append(values[i + 1:i + 1 + 2 * n].reshape(n, 2).cumsum(axis=0) * quantum + origin)
+                i += 1 + 2 * n
+            levels.append((level, paths))
+
+
+def write_contours(path: str,
+                   x: np.ndarray,
+                   y: np.ndarray,
+                   Z: np.ndarray,
+                   levels: Sequence[float],
+                   tolerance: float = None,
+                   method: str = 'douglas-peucker',
+                   color_map: str = 'viridis',
+                   fmt: str = None) -> Dict[str, int]:
+    """
+    Extrai as curvas de nível de uma malha já avaliada e as grava, um nível de cada vez.
+
+    Args:
+        path (str): Arquivo de saída.
+        x (np.ndarray): Eixo x (1-D).
+        y (np.ndarray): Eixo y (1-D).
+        Z (np.ndarray): Valores (len(y), len(x)); NaN e infinitos são ignorados.
+        levels (Sequence[float]): Níveis das curvas.
+        tolerance (float, optional): Tolerância da simplificação em unidades de x e y. Se None,
+            DEFAULT_RELATIVE_TOLERANCE vezes o maior lado do domínio.
+        method (str, optional): 'douglas-peucker', 'visvalingam' ou 'none' (só a quantização).
+        color_map (str, optional): Mapa de cores dos níveis (SVG e GeoJSON).
+        fmt (str, optional): 'svg', 'geojson' ou 'binary'. Se None, vem da extensão de path.
+
+    Returns:
+        Dict[str, int]: Níveis, caminhos, pontos extraídos, pontos gravados e bytes do arquivo.
+    """
+    fmt = fmt or export_format(path)
+    if fmt not in _WRITERS:
+        raise ValueError(f"Formato de exportação desconhecido para {path!r}. Use uma das extensões {tuple(FORMATS)}.")
+    if method not in SIMPLIFY_METHODS:
+        raise ValueError(f"Método de simplificação desconhecido: {method!r}. Use um de {SIMPLIFY_METHODS}.")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    Z = np.ma.filled(np.ma.asarray(Z, dtype=float), np.nan)
+    Z = np.where(np.isfinite(Z), Z, np.nan)
+    bounds = (x[0], x[-1], y[0], y[-1])
+    if tolerance is None:
+        tolerance = DEFAULT_RELATIVE_TOLERANCE * max(abs(x[-1] - x[0]), abs(y[-1] - y[0]))
+    if not tolerance > 0:
+        raise ValueError("A tolerância da simplificação deve ser positiva.")
+    quantum = tolerance / _QUANTA_PER_TOLERANCE
+    levels = [float(level) for level in np.atleast_1d(levels)]
+    colors = level_colors(len(levels), color_map)
+
+    with stage('write_contours', format=fmt, levels=len(levels)) as profile:
+        extracted = 0
+        with _WRITERS[fmt](path, bounds, quantum) as writer:
+            for level, color, contours in zip(levels, colors, marching_squares(x, y, Z, levels)):
+                paths = []
+                for points in contours:
+                    extracted += len(points)
+                    closed = len(points) > 2 and (points[0] == points[-1]).all()
+                    q = quantize(simplify(points, tolerance, method), writer.origin, quantum)
+                    # Curvas fechadas que encolheram até um segmento estão abaixo da tolerância.
+                    if len(q) >= (4 if closed else 2):
+                        paths.append(q)
+                writer.write_level(level, paths, color)
+        profile.note(points_in=extracted, points_out=writer.points)
+    return {'levels': len(levels), 'paths': writer.paths, 'points_in': extracted,
+            'points_out': writer.points, 'bytes': os.path.getsize(path)}
+
+
+def export_contours(f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                    x_range: Tuple[float, float],
+                    y_range: Tuple[float, float],
+                    path: str,
+                    levels: Sequence[float] = None,
+                    resolution: int = 400,
+                    tolerance: float = None,
+                    method: str = 'douglas-peucker',
+                    color_map: str = 'viridis',
+                    level_strategy: str = 'quantile',
+                    dtype: type = np.float64,
+                    prune: bool = True) -> Dict[str, Any]:
+    """
+    Avalia f(x, y) e exporta as curvas de nível como vetores (formato pela extensão de path).
+
+    Args:
+        f (Callable): Função que aceita dois argumentos (x, y) e retorna um valor.
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        path (str): Arquivo .svg, .geojson ou .glcb.
+        levels (Sequence[float], optional): Níveis. Se None, 10 níveis escolhidos por level_strategy.
+        resolution (int, optional): Pontos por eixo.
+        tolerance (float, optional): Tolerância da simplificação (ver write_contours).
+        method (str, optional): 'douglas-peucker', 'visvalingam' ou 'none'.
+        color_map (str, optional): Mapa de cores dos níveis.
+        level_strategy (str, optional): Estratégia dos níveis automáticos (ver glc.levels).
+        dtype (type, optional): Tipo da malha.
+        prune (bool, optional): Com levels dados, avalia f só nos blocos que podem ser cruzados por
+            algum nível (ver glc.functions.contour_grid).
+
+    Returns:
+        Dict[str, Any]: Estatísticas de write_contours.
+    """
+    from glc.functions import contour_grid
+    from glc.levels import auto_levels
+
+    x = np.linspace(x_range[0], x_range[1], resolution, dtype=dtype)
+    y = np.linspace(y_range[0], y_range[1], resolution, dtype=dtype)
+    Z = contour_grid(f, x, y, levels, prune)
+    if levels is None:
+        levels = auto_levels(Z, strategy=level_strategy)
+    return write_contours(path, x, y, Z, levels, tolerance=tolerance, method=method, color_map=color_map)
@@ -0,0 +1,272 @@
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from glc.fused import GradientEvaluator
+
+"""
+Refinamento local, em lote, dos mínimos e máximos encontrados na malha.
+
+np.argmin(Z) só acerta o extremo até o espaçamento da malha. Aqui os k melhores candidatos da
+malha (mínimos e máximos locais discretos) servem de pontos de partida para o método de Newton
+com busca linear, usando o gradiente e a Hessiana simbólicos. Todos os candidatos avançam
+juntos: cada iteração é uma única chamada vetorizada do GradientEvaluator para todos os pontos.
+
+Onde a Hessiana não é definida (positiva para mínimos, negativa para máximos) o passo é o de
+maior descida. Os pontos ficam presos ao retângulo do domínio; as componentes do gradiente que
+apontam para fora dele são descartadas, de modo que extremos na fronteira também convergem.
+"""
+
+KINDS = ('min', 'max', 'saddle', 'degenerate', 'boundary', 'regular')
+
+
+class CriticalPoint(NamedTuple):
+    """
+    Ponto encontrado pelo refinamento.
+
+    Attributes:
+        x (float): Coordenada x.
+        y (float): Coordenada y.
+        value (float): f(x, y).
+        kind (str): 'min', 'max', 'saddle', 'degenerate' (Hessiana singular), 'boundary'
+            (extremo na fronteira do domínio, com gradiente não nulo) ou 'regular' (ponto interior
+            com gradiente não nulo, quando o refinamento não convergiu).
+    """
+    x: float
+    y: float
+    value: float
+    kind: str
+
+
+class Extrema(NamedTuple):
+    """
+    Resultado de find_extrema.
+
+    Attributes:
+        minimum (CriticalPoint): Menor valor encontrado (None se f não tiver valores finitos).
+        maximum (CriticalPoint): Maior valor encontrado.
+        critical_points (List[CriticalPoint]): Pontos distintos para onde os candidatos convergiram.
+    """
+    minimum: CriticalPoint
+    maximum: CriticalPoint
+    critical_points: List[CriticalPoint]
+
+
+def grid_candidates(Z: np.ndarray, k: int = 8, which: str = 'min') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Retorna as posições dos k menores (ou maiores) mínimos (ou máximos) locais discretos da malha.
+
+    Um ponto é extremo local discreto se não for maior (ou menor) que nenhum dos 8 vizinhos.
+    Valores NaN ou infinitos são ignorados.
+
+    Args:
+        Z (np.ndarray): Malha de valores (linhas = y, colunas = x).
+        k (int, optional): Número máximo de candidatos.
+        which (str, optional): 'min' ou 'max'.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Linhas e colunas dos candidatos, do melhor para o pior.
+    """
+    if which not in ('min', 'max'):
+        raise ValueError("which deve ser 'min' ou 'max'.")
+    values = np.where(np.isfinite(Z), Z if which == 'min' else -Z, np.inf)
+    padded = np.pad(values, 1, constant_values=np.inf)
+    rows, cols = values.shape
+    local = np.isfinite(values)
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            if dr or dc:
+                local &= values <= padded[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+    flat = np.flatnonzero(local)
+    if flat.size > k:
+        flat = flat[np.argpartition(values.flat[flat], k - 1)[:k]]
+    flat = flat[np.argsort(values.flat[flat], kind='stable')]
+    return np.unravel_index(flat, values.shape)
+
+
+def _derivatives(evaluator: GradientEvaluator, px: np.ndarray, py: np.ndarray, sign: float):
+    with np.errstate(all='ignore'):
+        return [sign * np.array(v, dtype=float) for v in evaluator(px, py)]
+
+
+def refine(evaluator: GradientEvaluator,
+           px: np.ndarray,
+           py: np.ndarray,
+           x_range: Tuple[float, float],
+           y_range: Tuple[float, float],
+           which: str = 'min',
+           max_iter: int = 50,
+           tol: float = 1e-10) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Refina vários pontos de partida ao mesmo tempo, minimizando (ou maximizando) f no retângulo.
+
+    Args:
+        evaluator (GradientEvaluator): Avaliador criado com hessian=True.
+        px (np.ndarray): Coordenadas x iniciais (1-D).
+        py (np.ndarray): Coordenadas y iniciais (1-D).
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        which (str, optional): 'min' ou 'max'.
+        max_iter (int, optional): Número máximo de iterações.
+        tol (float, optional): Tolerância relativa ao tamanho do domínio para o passo.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Coordenadas x, y finais e f nesses pontos.
+    """
+    if evaluator.names[3:] != ('fxx', 'fxy', 'fyy'):
+        raise ValueError("O refinamento exige um GradientEvaluator criado com hessian=True.")
+    sign = 1.0 if which == 'min' else -1.0
+    (x0, x1), (y0, y1) = sorted(x_range), sorted(y_range)
+    span = max(x1 - x0, y1 - y0) or 1.0
+    px = np.clip(np.array(px, dtype=float), x0, x1)
+    py = np.clip(np.array(py, dtype=float), y0, y1)
+    f, fx, fy, fxx, fxy, fyy = _derivatives(evaluator, px, py, sign)
+    active = np.isfinite(f) & np.isfinite(fx) & np.isfinite(fy)
+
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        gx, gy = fx[idx].copy(), fy[idx].copy()
+        # Na fronteira, as componentes do gradiente que levariam para fora do domínio são descartadas.
+        gx[((px[idx] <= x0) & (gx > 0)) | ((px[idx] >= x1) & (gx < 0))] = 0.0
+        gy[((py[idx] <= y0) & (gy > 0)) | ((py[idx] >= y1) & (gy < 0))] = 0.0
+        a, b, c = fxx[idx], fxy[idx], fyy[idx]
+        det = a * c - b * b
+        newton = (a > 0) & (det > 0) & np.isfinite(det)
+        g_norm = np.hypot(gx, gy)
+        with np.errstate(all='ignore'):
+            # Maior descida: o comprimento inicial do passo é |g| / |curvatura|.
+            curvature = np.abs(a) + np.abs(c)
+            length = np.where(curvature > 0, g_norm / curvature, np.inf)
+            dx = np.where(newton, -(c * gx - b * gy) / det, -gx * length / g_norm)
+            dy = np.where(newton, -(a * gy - b * gx) / det, -gy * length / g_norm)
+            # Nenhum passo maior que 10% do domínio.
+            shrink = np.minimum(1.0, 0.1 * span / np.hypot(dx, dy))
+        dx = np.nan_to_num(dx * shrink, posinf=0.0, neginf=0.0)
+        dy = np.nan_to_num(dy * shrink, posinf=0.0, neginf=0.0)
+        slope = gx * dx + gy * dy
+
+        # Busca linear vetorizada (condição de Armijo), com passo reduzido à metade onde falhar.
+        t = np.ones(idx.size)
+        accepted = np.zeros(idx.size, dtype=bool)
+        trial = [np.full(idx.size, np.nan) for _ in range(6)]
+        for _ in range(40):
+            pending = np.flatnonzero(~accepted)
+            if pending.size == 0:
+                break
+            tx = np.clip(px[idx[pending]] + t[pending] * dx[pending], x0, x1)
+            ty = np.clip(py[idx[pending]] + t[pending] * dy[pending], y0, y1)
+            values = _derivatives(evaluator, tx, ty, sign)
+            ok = values[0] <= f[idx[pending]] + 1e-4 * t[pending] * slope[pending]
+            ok &= np.isfinite(values[0])
+            hit = pending[ok]
+            for new, v in zip(trial, values):
+                new[hit] = v[ok]
+            px[idx[hit]] = tx[ok]
+            py[idx[hit]] = ty[ok]
+            accepted[hit] = True
+            t[pending[~ok]] *= 0.5
+
+        moved = accepted
+        for array, new in zip((f, fx, fy, fxx, fxy, fyy), trial):
+            array[idx[moved]] = new[moved]
+        step = t * np.hypot(dx, dy)
+        done = ~moved | (step <= tol * span)
+        active[idx[done]] = False
+
+    return px, py, sign * f
+
+
+def classify(fx: np.ndarray, fy: np.ndarray, fxx: np.ndarray, fxy: np.ndarray, fyy: np.ndarray,
+             on_boundary: np.ndarray = None, scale: float = 1.0, tol: float = 1e-6) -> np.ndarray:
+    """
+    Classifica pontos pelo gradiente e pelo teste da segunda derivada.
+
+    Args:
+        fx, fy (np.ndarray): Derivadas parciais nos pontos.
+        fxx, fxy, fyy (np.ndarray): Segundas derivadas nos pontos.
+        on_boundary (np.ndarray, optional): Indica os pontos que estão na fronteira do domínio.
+        scale (float, optional): Escala de f (por exemplo, max|Z|), usada na tolerância do gradiente.
+        tol (float, optional): Tolerância relativa para gradiente nulo e Hessiana singular.
+
+    Returns:
+        np.ndarray: Um dos KINDS para cada ponto.
+    """
+    with np.errstate(all='ignore'):
+        det = fxx * fyy - fxy ** 2
+        curvature = np.maximum(np.abs(fxx) + np.abs(fyy), 1e-300)
+        stationary = np.hypot(fx, fy) <= tol * max(scale, 1.0)
+        singular = np.abs(det) <= tol * curvature ** 2
+    kind = np.full(np.shape(det), 'regular', dtype=object)
+    if on_boundary is not None:
+        kind[~stationary & on_boundary] = 'boundary'
+    kind[stationary & singular] = 'degenerate'
+    kind[stationary & ~singular & (det < 0)] = 'saddle'
+    kind[stationary & ~singular & (det > 0) & (fxx > 0)] = 'min'
+    kind[stationary & ~singular & (det > 0) & (fxx < 0)] = 'max'
+    return kind
+
+
+def find_extrema(evaluator: GradientEvaluator,
+                 x: np.ndarray,
+                 y: np.ndarray,
+                 Z: np.ndarray,
+                 x_range: Tuple[float, float] = None,
+                 y_range: Tuple[float, float] = None,
+                 k: int = 8,
+                 min_seeds: Sequence[Tuple[float, float]] = (),
+                 max_seeds: Sequence[Tuple[float, float]] = ()) -> Extrema:
+    """
+    Encontra o mínimo e o máximo globais com precisão além da malha e classifica os pontos críticos.
+
+    Args:
+        evaluator (GradientEvaluator): Avaliador criado com hessian=True.
+        x (np.ndarray): Eixo x da malha (1-D).
+        y (np.ndarray): Eixo y da malha (1-D).
+        Z (np.ndarray): Valores de f na malha (len(y), len(x)); pode ser uma versão reduzida.
+        x_range (Tuple, optional): Domínio em x. Se None, usa os extremos de x.
+        y_range (Tuple, optional): Domínio em y. Se None, usa os extremos de y.
+        k (int, optional): Número de candidatos da malha para mínimos e para máximos.
+        min_seeds (Sequence, optional): Pontos de partida extras (x, y) para o mínimo.
+        max_seeds (Sequence, optional): Pontos de partida extras (x, y) para o máximo.
+
+    Returns:
+        Extrema: Mínimo, máximo e pontos críticos distintos encontrados.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    Z = np.broadcast_to(np.asarray(Z, dtype=float), (y.size, x.size))
+    x_range = x_range or (x[0], x[-1])
+    y_range = y_range or (y[0], y[-1])
+    span = max(abs(x_range[1] - x_range[0]), abs(y_range[1] - y_range[0])) or 1.0
+
+    points = []
+    for which, seeds in (('min', min_seeds), ('max', max_seeds)):
+        rows, cols = grid_candidates(Z, k, which)
+        px = np.concatenate([x[cols], [s[0] for s in seeds]])
+        py = np.concatenate([y[rows], [s[1] for s in seeds]])
+        if px.size:
+            points.append(refine(evaluator, px, py, x_range, y_range, which))
+    if not points:
+        return Extrema(None, None, [])
+
+    px = np.concatenate([p[0] for p in points])
+    py = np.concatenate([p[1] for p in points])
+    values = np.concatenate([p[2] for p in points])
+    finite = np.isfinite(values)
+    px, py, values = px[finite], py[finite], values[finite]
+    if values.size == 0:
+        return Extrema(None, None, [])
+
+    # Candidatos que convergiram para o mesmo ponto contam uma vez só.
+    grid_step = span * 1e-7
+    _, unique = np.unique(np.round(np.column_stack([px, py]) / grid_step), axis=0, return_index=True)
+    px, py, values = px[unique], py[unique], values[unique]
+    _, fx, fy, fxx, fxy, fyy = _derivatives(evaluator, px, py, 1.0)
+    on_boundary = (np.isin(px, x_range) | np.isin(py, y_range))
+    kinds = classify(fx, fy, fxx, fxy, fyy, on_boundary, scale=float(np.max(np.abs(values))) / span)
+
+    critical = [CriticalPoint(float(a), float(b), float(v), str(kd)) for a, b, v, kd in zip(px, py, values, kinds)]
+    critical.sort(key=lambda p: p.value)
+    return Extrema(critical[0], critical[-1], critical)
@@ -0,0 +1,228 @@
+from typing import TYPE_CHECKING, Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+from glc.cache import compile_function
+from glc.profiling import stage
+
+if TYPE_CHECKING:
+    import sympy as sp
+
+    from glc.fused import FunctionFamily
+
+"""
+Interpretação das funções digitadas pelo usuário, comum a todos os comandos.
+
+O SymPy só é importado quando uma função precisa ser interpretada e não está no cache em disco
+(glc.cache); com o cache, parse_function num processo novo custa só a leitura do código gerado.
+"""
+
+ENGINES = ('lambdify', 'ufunc')
+
+# Malhas menores que isso são avaliadas inteiras por contour_grid: a poda precisa da expressão
+# simbólica (e portanto do SymPy) e não compensa.
+PRUNE_MIN_POINTS = 2 ** 18
+
+# Nomes do NumPy aceitos na entrada, trocados pelos equivalentes do SymPy antes do sympify.
+NUMPY_TO_SYMPY = {
+    'np.sin': 'sin',
+    'np.cos': 'cos',
+    'np.tan': 'tan',
+    'np.exp': 'exp',
+    'np.log': 'log',
+    'np.sqrt': 'sqrt',
+    'np.abs': 'Abs'
+}
+
+
+def normalize_function(func_str: str) -> str:
+    """Troca os nomes do NumPy (np.sin, np.exp, ...) pelos do SymPy."""
+    for np_func, sp_func in NUMPY_TO_SYMPY.items():
+        func_str = func_str.replace(np_func, sp_func)
+    return func_str
+
+
+def parse_function(func_str: str, fixed_vars: Dict[str, float] = None, engine: str = 'lambdify',
+                   dtype: type = np.float64) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+    """
+    Converte uma string de função matemática em uma função Python segura, permitindo a fixação de variáveis.
+
+    Args:
+        func_str (str): String da função que o usuário insere.
+        fixed_vars (Dict[str, float], optional): Dicionário de variáveis a serem fixadas com seus respectivos valores.
+        engine (str, optional): 'lambdify' (função gerada pelo SymPy) ou 'ufunc' (programa de ufuncs com buffers
+            reaproveitados, ver glc.program).
+        dtype (type, optional): Tipo do resultado do programa de ufuncs (np.float64 ou np.float32).
+
+    Returns:
+        Callable[[np.ndarray, np.ndarray], np.ndarray]: Função que calcula o valor baseado na entrada x e y, considerando variáveis fixas.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Motor de avaliação desconhecido: {engine!r}. Use um de {ENGINES}.")
+    try:
+        if engine == 'ufunc':
+            from glc.program import compile_program_function
+            return compile_program_function(normalize_function(func_str), fixed_vars, dtype)
+        return compile_function(normalize_function(func_str), fixed_vars).func
+    except (ValueError, TypeError) as e:  # SympifyError é um ValueError
+        raise ValueError(f"Erro ao interpretar a função: {e}")
+
+
+def evaluate_grid(f: Callable[[np.ndarray, np.ndarray], np.ndarray], x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Avalia f na malha dos eixos x e y sem montar as matrizes X e Y do np.meshgrid.
+
+    A função recebe x[None, :] e y[:, None] e o resultado sai do broadcasting; com as funções
+    compiladas pelo glc.cache (ver glc.separable), as partes que dependem de uma só variável são
+    calculadas sobre os eixos 1-D.
+
+    Com o cache de resultados ligado (glc.results), a malha de uma função compilada pelo glc é
+    gravada em disco e, na próxima vez com a mesma função e os mesmos eixos, lida de volta sem
+    nenhuma avaliação.
+
+    Args:
+        f (Callable): Função que aceita dois argumentos (x, y) e retorna um valor.
+        x (np.ndarray): Eixo x (1-D).
+        y (np.ndarray): Eixo y (1-D).
+
+    Returns:
+        np.ndarray: Matriz (len(y), len(x)), somente leitura. Para uma família de funções
+            (parse_functions), matriz (n, len(y), len(x)).
+    """
+    from glc.results import cached_array, function_key
+
+    def compute() -> np.ndarray:
+        Z = np.asarray(f(x[None, :], y[:, None]))
+        return Z if np.issubdtype(Z.dtype, np.inexact) else Z.astype(x.dtype)
+
+    # O resultado é gravado antes do broadcasting: se f depende de uma só variável, o arquivo é 1-D.
+    with stage('evaluate_grid', points=x.size * y.size) as profile:
+        Z = cached_array('grid', compute, function=function_key(f), x=x, y=y)
+        profile.note(z=Z)
+    return np.broadcast_to(Z, Z.shape[:-2] + (y.size, x.size))
+
+
+def contour_grid(f: Callable[[np.ndarray, np.ndarray], np.ndarray], x: np.ndarray, y: np.ndarray,
+                 levels=None, prune: bool = True) -> np.ma.MaskedArray:
+    """
+    Avalia f na malha para as curvas de nível, com os pontos fora do domínio mascarados e sem avisos do NumPy.
+
+    Com níveis dados, numa malha de pelo menos PRUNE_MIN_POINTS pontos e com uma função compilada
+    pelo glc, só os blocos que podem ser cruzados por algum nível são avaliados (ver
+    glc.intervals.pruned_grid). Os outros pontos recebem valores que não criam curvas: o resultado
+    serve para as curvas, não para cores ou estatísticas.
+
+    Args:
+        f (Callable): Função que aceita dois argumentos (x, y) e retorna um valor.
+        x (np.ndarray): Eixo x (1-D).
+        y (np.ndarray): Eixo y (1-D).
+        levels (Sequence[float], optional): Níveis das curvas. Se None, a malha inteira é avaliada.
+        prune (bool, optional): Permite a poda por aritmética intervalar.
+
+    Returns:
+        np.ma.MaskedArray: Matriz (len(y), len(x)).
+    """
+    if prune and levels is not None and x.size * y.size >= PRUNE_MIN_POINTS and getattr(f, 'compiled', None) is not None:
+        from glc.intervals import pruned_grid
+        from glc.results import cached_array, function_key
+
+        def compute() -> np.ndarray:
+            grid = pruned_grid(f, x, y, levels)
+            profile.note(evaluated=grid.evaluated, skipped=grid.skipped)
+            return grid.Z.filled(np.nan)
+
+        levels = [float(level) for level in np.atleast_1d(levels)]
+        with stage('pruned_grid', points=x.size * y.size, levels=len(levels)) as profile:
+            Z = cached_array('pruned_grid', compute, function=function_key(f), x=x, y=y, levels=levels)
+            return np.ma.masked_invalid(Z)
+    with np.errstate(all='ignore'):
+        return np.ma.masked_invalid(evaluate_grid(f, x, y))
+
+
+def parse_expression(func_str: str, fixed_vars: Dict[str, float] = None) -> Tuple[Callable[[np.ndarray, np.ndarray], np.ndarray], 'sp.Expr']:
+    """
+    Como parse_function, mas também retorna a expressão simbólica (com as variáveis fixadas substituídas).
+
+    Returns:
+        Tuple[Callable, sp.Expr]: Função compilada e expressão simbólica.
+    """
+    try:
+        compiled = compile_function(normalize_function(func_str), fixed_vars)
+        return compiled.func, compiled.expr
+    except (ValueError, TypeError) as e:  # SympifyError é um ValueError
+        raise ValueError(f"Erro ao interpretar a função: {e}")
+
+
+def parse_functions(func_strs: Sequence[str], fixed_vars: Dict[str, float] = None) -> 'FunctionFamily':
+    """
+    Compila várias funções juntas, para avaliá-las numa só passada sobre a mesma malha.
+
+    As subexpressões comuns a toda a família (o núcleo gaussiano de exp(-x**2 - y**2) * k, os termos
+    trigonométricos de sin(x)*cos(y) + c) são calculadas uma só vez por chamada, em vez de uma vez
+    por função. evaluate_grid(family, x, y) retorna a matriz (n, len(y), len(x)).
+
+    Args:
+        func_strs (Sequence[str]): Strings das funções.
+        fixed_vars (Dict[str, float], optional): Variáveis fixadas em todas as funções.
+
+    Returns:
+        FunctionFamily: Função f(X, Y) que retorna as funções empilhadas no primeiro eixo.
+    """
+    import sympy as sp
+
+    from glc.fused import FunctionFamily
+
+    exprs = []
+    with stage('sympify', functions=len(func_strs)):
+        for func_str in func_strs:
+            try:
+                expr = sp.sympify(normalize_function(func_str))
+                if fixed_vars:
+                    expr = expr.subs(fixed_vars)
+            except (ValueError, TypeError) as e:  # SympifyError é um ValueError
+                raise ValueError(f"Erro ao interpretar a função {func_str!r}: {e}")
+            exprs.append(expr)
+    return FunctionFamily(exprs)
+
+
+def validate_function(func_str: str) -> bool:
+    """
+    Valida se a string de função fornecida é válida e pode ser convertida em uma função.
+
+    Args:
+        func_str (str): String da função que o usuário insere.
+
+    Returns:
+        bool: True se a função for válida, False caso contrário.
+    """
+    import sympy as sp
+    from sympy.core.sympify import SympifyError
+
+    try:
+        sp.sympify(normalize_function(func_str))
+        return True
+    except SympifyError:
+        return False
+
+
+def free_variables(func_str: str) -> set:
+    """Nomes das variáveis livres da função."""
+    import sympy as sp
+
+    return {str(s) for s in sp.sympify(normalize_function(func_str)).free_symbols}
+
+
+def parse_fixed_vars(text: str) -> Dict[str, float]:
+    """
+    Interpreta variáveis fixadas no formato 'z=1' ou 'z=1,w=2'.
+
+    Returns:
+        Dict[str, float]: Variáveis e seus valores.
+    """
+    fixed_vars = {}
+    for item in text.replace(';', ',').split(','):
+        if not item.strip():
+            continue
+        var, value = item.split('=')
+        fixed_vars[var.strip()] = float(value.strip())
+    return fixed_vars
@@ -0,0 +1,132 @@
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import sympy as sp
+
+from glc.cache import ExpressionCache, default_cache
+from glc.profiling import stage
+
+"""
+Avaliação conjunta de f, das derivadas parciais e (opcionalmente) da Hessiana, e de famílias de funções.
+
+Em vez de gerar uma função do lambdify para cada saída, todas as saídas são compiladas numa
+única função com eliminação de subexpressões comuns (sp.lambdify(..., cse=True)). Fatores
+como exp(-x**2 - y**2) aparecem em f, em ∂f/∂x e em ∂f/∂y, mas são calculados uma só vez
+por chamada. Do mesmo modo, numa família como exp(-x**2 - y**2) * k para vários k, ou
+sin(x)*cos(y) + c para vários c, a parte comum é calculada uma vez para a família inteira
+(FunctionFamily).
+"""
+
+GRADIENT_NAMES = ('f', 'fx', 'fy')
+HESSIAN_NAMES = ('fxx', 'fxy', 'fyy')
+
+
+class GradientEvaluator:
+    """
+    Avaliador de f(x, y), ∂f/∂x, ∂f/∂y e, se pedido, das segundas derivadas, numa só passada.
+
+    Args:
+        expr (sp.Expr): Expressão simbólica da função.
+        args (Tuple[str, str], optional): Nomes das variáveis x e y.
+        hessian (bool, optional): Inclui fxx, fxy e fyy nas saídas.
+        cache (ExpressionCache, optional): Cache das funções compiladas. Se None, usa o cache compartilhado.
+
+    Attributes:
+        names (Tuple[str, ...]): Nomes das saídas, na ordem retornada por __call__.
+        derivatives (Dict[str, sp.Expr]): Expressão simbólica de cada saída.
+    """
+
+    def __init__(self, expr: sp.Expr, args: Tuple[str, str] = ('x', 'y'), hessian: bool = False,
+                 cache: ExpressionCache = None):
+        x, y = sp.symbols(args)
+        with stage('diff', hessian=hessian):
+            fx = sp.diff(expr, x)
+            fy = sp.diff(expr, y)
+            self.derivatives: Dict[str, sp.Expr] = {'f': expr, 'fx': fx, 'fy': fy}
+            if hessian:
+                self.derivatives.update({'fxx': sp.diff(fx, x), 'fxy': sp.diff(fx, y), 'fyy': sp.diff(fy, y)})
+        self.names = tuple(self.derivatives)
+        cache = cache or default_cache()
+        self._compiled = cache.compile_expr(sp.Tuple(*self.derivatives.values()), args, cse=True)
+        self.cache_key = self._compiled.key
+
+    @property
+    def expr(self) -> sp.Expr:
+        return self.derivatives['f']
+
+    @property
+    def fx(self) -> sp.Expr:
+        return self.derivatives['fx']
+
+    @property
+    def fy(self) -> sp.Expr:
+        return self.derivatives['fy']
+
+    def __call__(self, X: np.ndarray, Y: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Avalia todas as saídas nos pontos dados.
+
+        Args:
+            X (np.ndarray): Coordenadas x (qualquer forma compatível com Y por broadcasting).
+            Y (np.ndarray): Coordenadas y.
+
+        Returns:
+            Tuple[np.ndarray, ...]: Uma matriz por saída, na ordem de names, todas com a forma do broadcast de X e Y.
+        """
+        shape = np.broadcast_shapes(np.shape(X), np.shape(Y))
+        values = self._compiled.func(X, Y)
+        return tuple(np.broadcast_to(np.asarray(v, dtype=float), shape) for v in values)
+
+    def evaluate(self, X: np.ndarray, Y: np.ndarray) -> Dict[str, np.ndarray]:
+        """Como __call__, mas retorna um dicionário indexado por names."""
+        return dict(zip(self.names, self(X, Y)))
+
+
+class FunctionFamily:
+    """
+    Avaliador de várias funções de (x, y) numa só passada, com as subexpressões comuns a todas calculadas uma vez.
+
+    Chamado como as funções do parse_function, f(X, Y), retorna as funções empilhadas no primeiro
+    eixo: com evaluate_grid (glc.functions), uma matriz (n, len(y), len(x)) pronta para as curvas
+    de nível de cada função ou para gráficos lado a lado.
+
+    Args:
+        exprs (Sequence[sp.Expr]): Expressões simbólicas das funções.
+        args (Tuple[str, str], optional): Nomes das variáveis x e y.
+        cache (ExpressionCache, optional): Cache das funções compiladas. Se None, usa o cache compartilhado.
+
+    Attributes:
+        exprs (Tuple[sp.Expr, ...]): Expressões, na ordem do primeiro eixo do resultado.
+    """
+
+    def __init__(self, exprs: Sequence[sp.Expr], args: Tuple[str, str] = ('x', 'y'), cache: ExpressionCache = None):
+        if not exprs:
+            raise ValueError("A família precisa de pelo menos uma função.")
+        self.exprs = tuple(exprs)
+        cache = cache or default_cache()
+        self._compiled = cache.compile_expr(sp.Tuple(*self.exprs), args, cse=True)
+        self.cache_key = self._compiled.key
+
+    def __len__(self) -> int:
+        return len(self.exprs)
+
+    def __call__(self, X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+        """
+        Avalia todas as funções nos pontos dados.
+
+        Args:
+            X (np.ndarray): Coordenadas x (qualquer forma compatível com Y por broadcasting).
+            Y (np.ndarray): Coordenadas y.
+
+        Returns:
+            np.ndarray: Matriz (n, *forma do broadcast de X e Y), com a função i em [i]. Entradas em
+                float32 dão um resultado em float32.
+        """
+        shape = np.broadcast_shapes(np.shape(X), np.shape(Y))
+        dtype = np.result_type(np.asarray(X).dtype, np.asarray(Y).dtype, np.float32)
+        values = self._compiled.func(X, Y)
+        # Cada saída (um escalar, se a função for constante) é copiada direto na sua fatia do resultado.
+        out = np.empty((len(self.exprs),) + shape, dtype=dtype)
+        for i, value in enumerate(values):
+            out[i] = value
+        return out
@@ -0,0 +1,113 @@
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from glc.compact import surface_and_contour, write_html
+from glc.functions import evaluate_grid
+from glc.isosurface import isosurfaces, mesh3d_traces
+from glc.profiling import stage
+
+"""
+Gráficos interativos do plotly no navegador (intsurf3D.py / glc-interactive): superfície e curvas
+de nível de f(x, y) e superfícies de nível de f(x, y, z).
+
+O plotly só é importado quando o gráfico é montado.
+"""
+
+
+def plot_interactive_surface_and_contour(f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                                         x_range: Tuple[float, float],
+                                         y_range: Tuple[float, float],
+                                         title: str = 'Superfície e Curvas de Nível da Função',
+                                         compact: bool = True,
+                                         html_path: str = None) -> None:
+    """
+    Plota tanto a superfície 3D quanto o gráfico de contorno e a curva de nível para a função dada f(x, y).
+
+    Args:
+        f (Callable): Função que aceita dois argumentos (x, y) e retorna um valor.
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        title (str, optional): Título do gráfico.
+        compact (bool, optional): Envia eixos 1-D e valores em float32, com a superfície reduzida ao tamanho da tela.
+        html_path (str, optional): Se informado, grava a figura num arquivo HTML independente em vez de abri-la.
+    """
+    import plotly.graph_objs as go
+
+    x = np.linspace(x_range[0], x_range[1], 400)
+    y = np.linspace(y_range[0], y_range[1], 400)
+    Z = evaluate_grid(f, x, y)
+
+    if compact:
+        surface, contours = surface_and_contour(x, y, Z, colorscale='inferno')
+    else:
+        surface = go.Surface(z=Z, x=x, y=y, colorscale='inferno')
+        contours = go.Contour(z=Z, x=x, y=y, colorscale='inferno')
+
+    layout = go.Layout(
+        title=title,
+        scene=dict(
+            xaxis=dict(title='x'),
+            yaxis=dict(title='y'),
+            zaxis=dict(title='z')
+        ),
+        xaxis=dict(title='x'),
+        yaxis=dict(title='y')
+    )
+
+    fig = go.Figure(data=[surface, contours], layout=layout)
+
+    if html_path:
+        size = write_html(fig, html_path)
+        print(f"Gráfico salvo em {html_path} ({size / 2**20:.1f} MB).")
+    else:
+        with stage('show'):
+            fig.show()
+
+
+def plot_isosurfaces(f: Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray],
+                     x_range: Tuple[float, float],
+                     y_range: Tuple[float, float],
+                     z_range: Tuple[float, float],
+                     levels: List[float],
+                     resolution: int = 64,
+                     title: str = 'Superfícies de Nível da Função',
+                     html_path: str = None) -> None:
+    """
+    Plota as superfícies de nível f(x, y, z) = k de uma função de três variáveis.
+
+    Args:
+        f (Callable): Função que aceita três argumentos (x, y, z) e retorna um valor.
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        z_range (Tuple): Intervalo para o eixo z (min, max).
+        levels (List[float]): Níveis k das superfícies.
+        resolution (int, optional): Pontos por eixo da malha 3-D.
+        title (str, optional): Título do gráfico.
+        html_path (str, optional): Se informado, grava a figura num arquivo HTML independente em vez de abri-la.
+    """
+    import plotly.graph_objs as go
+
+    with stage('isosurfaces', points=resolution ** 3, levels=len(levels)):
+        meshes = isosurfaces(f, x_range, y_range, z_range, levels, resolution=resolution)
+    for mesh in meshes:
+        if mesh.faces.size == 0:
+            print(f"Aviso: nenhuma superfície encontrada para o nível {mesh.level:g} no domínio.")
+
+    layout = go.Layout(
+        title=title,
+        scene=dict(
+            xaxis=dict(title='x', range=list(x_range)),
+            yaxis=dict(title='y', range=list(y_range)),
+            zaxis=dict(title='z', range=list(z_range))
+        )
+    )
+
+    fig = go.Figure(data=mesh3d_traces(meshes), layout=layout)
+
+    if html_path:
+        size = write_html(fig, html_path, shared=())
+        print(f"Gráfico salvo em {html_path} ({size / 2**20:.1f} MB).")
+    else:
+        with stage('show'):
+            fig.show()
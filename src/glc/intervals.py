@@ -0,0 +1,406 @@
+from typing import Callable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import sympy as sp
+
+"""
+Poda de blocos da malha por aritmética intervalar antes das curvas de nível.
+
+O plot_contour avalia f em todos os pontos da malha, inclusive onde a função não está definida
+(sqrt(x) com x < 0, log(y + 1) com y <= -1) e em regiões grandes cujos valores não chegam a nenhum
+dos níveis pedidos. Aqui a expressão simbólica é avaliada sobre intervalos: para um bloco
+[x0, x1] x [y0, y1] da malha, cada operação devolve um intervalo que contém todos os valores
+possíveis da subexpressão no bloco (com arredondamento para fora), e o domínio de cada função
+(log, sqrt, asin, potências fracionárias...) diz se existe algum ponto do bloco em que ela está
+definida. Todos os blocos de um nível da hierarquia são avaliados juntos, em arrays.
+
+Os blocos formam uma quadtree sobre as células da malha:
+
+    fora do domínio   nenhum ponto está definido: os pontos ficam NaN, sem avaliação
+    sem nível         o intervalo não contém nenhum nível: nenhuma célula do bloco é cruzada por uma
+                      curva; os pontos recebem um valor da mesma faixa entre níveis (ver pruned_grid)
+    indeciso          é dividido em quatro, até o tamanho mínimo; só esses blocos são avaliados
+
+Funções e operações sem regra intervalar (Piecewise, funções especiais...) dão (-inf, inf), o que
+só faz o bloco ser avaliado: a poda nunca descarta uma curva.
+"""
+
+# Lado mínimo dos blocos, em células da malha; em malhas grandes, 1/64 do maior lado (menos chamadas de f).
+DEFAULT_LEAF_SIZE = 32
+
+# Acima desta fração de pontos a avaliar, a malha inteira é avaliada numa só chamada.
+DEFAULT_DENSE_FRACTION = 0.25
+
+# Arredondamento para fora após cada operação, em unidades na última casa.
+_ULPS = 4
+
+
+class Interval(NamedTuple):
+    """
+    Valores de uma subexpressão sobre blocos da malha.
+
+    Attributes:
+        lo (np.ndarray): Limite inferior dos valores definidos em cada bloco.
+        hi (np.ndarray): Limite superior dos valores definidos em cada bloco.
+        defined (np.ndarray): Falso nos blocos em que nenhum ponto está no domínio.
+    """
+    lo: np.ndarray
+    hi: np.ndarray
+    defined: np.ndarray
+
+
+class PrunedGrid(NamedTuple):
+    """
+    Malha avaliada só nos blocos que podem conter uma curva de nível.
+
+    Attributes:
+        Z (np.ma.MaskedArray): Valores (len(y), len(x)); os pontos fora do domínio são mascarados
+            (com NaN por baixo). Nos blocos sem nível, os valores são representantes da faixa entre
+            níveis, e não valores de f: servem para as curvas, não para cores ou estatísticas.
+        evaluated (int): Pontos em que f foi avaliada (as bordas entre blocos vizinhos contam duas vezes).
+        skipped (int): Pontos de blocos sem nível.
+        outside (int): Pontos de blocos fora do domínio.
+    """
+    Z: np.ma.MaskedArray
+    evaluated: int
+    skipped: int
+    outside: int
+
+
+def _outward(lo, hi) -> Tuple[np.ndarray, np.ndarray]:
+    lo = np.where(np.isnan(lo), -np.inf, lo)
+    hi = np.where(np.isnan(hi), np.inf, hi)
+    lo = np.where(np.isfinite(lo), lo - _ULPS * np.abs(np.spacing(lo)), lo)
+    hi = np.where(np.isfinite(hi), hi + _ULPS * np.abs(np.spacing(hi)), hi)
+    return lo, hi
+
+
+def _unknown(*children: Interval) -> Interval:
+    return Interval(np.float64(-np.inf), np.float64(np.inf), _all_defined(children))
+
+
+def _all_defined(children: Sequence[Interval]):
+    # NaN se propaga pelas operações: se um operando não está definido em ponto nenhum, o resultado também não.
+    defined = True
+    for child in children:
+        defined = defined & child.defined
+    return defined
+
+
+def _add(a: Interval, b: Interval) -> Interval:
+    return Interval(*_outward(a.lo + b.lo, a.hi + b.hi), a.defined & b.defined)
+
+
+def _mul(a: Interval, b: Interval) -> Interval:
+    products = np.stack(np.broadcast_arrays(a.lo * b.lo, a.lo * b.hi, a.hi * b.lo, a.hi * b.hi))
+    # Convenção da aritmética intervalar: 0 * inf = 0.
+    products = np.where(np.isnan(products), 0.0, products)
+    return Interval(*_outward(products.min(axis=0), products.max(axis=0)), a.defined & b.defined)
+
+
+def _reciprocal(a: Interval) -> Interval:
+    lo, hi = a.lo, a.hi
+    # 1/0 dá inf no NumPy: os blocos que contêm o zero continuam definidos, mas sem limite.
+    straddles = (lo < 0) & (hi > 0)
+    rlo = np.where(straddles | (hi == 0), -np.inf, 1.0 / np.where(hi == 0, 1.0, hi))
+    rhi = np.where(straddles | (lo == 0), np.inf, 1.0 / np.where(lo == 0, 1.0, lo))
+    return Interval(*_outward(rlo, rhi), a.defined)
+
+
+def _integer_power(a: Interval, n: int) -> Interval:
+    if n == 0:
+        return Interval(np.float64(1.0), np.float64(1.0), a.defined)
+    if n < 0:
+        return _reciprocal(_integer_power(a, -n))
+    plo, phi = a.lo ** n, a.hi ** n
+    if n % 2:
+        return Interval(*_outward(plo, phi), a.defined)
+    # Potência par: o mínimo é 0 se o intervalo contém o zero.
+    lo = np.where(a.lo >= 0, plo, np.where(a.hi <= 0, phi, 0.0))
+    return Interval(*_outward(lo, np.maximum(plo, phi)), a.defined)
+
+
+def _monotone(a: Interval, fn: Callable, increasing: bool = True, low: float = -np.inf, high: float = np.inf,
+              open_low: bool = False, open_high: bool = False) -> Interval:
+    # Função monótona com domínio [low, high] (ou aberto nas pontas indicadas).
+    defined = a.defined & ((a.hi > low) if open_low else (a.hi >= low)) & ((a.lo < high) if open_high else (a.lo <= high))
+    clo, chi = np.maximum(a.lo, low), np.minimum(a.hi, high)
+    flo, fhi = fn(clo), fn(chi)
+    if not increasing:
+        flo, fhi = fhi, flo
+    return Interval(*_outward(flo, fhi), defined)
+
+
+def _real_power(a: Interval, e: float) -> Interval:
+    # Expoente fracionário: o NumPy dá NaN para bases negativas.
+    if e > 0:
+        return _monotone(a, lambda v: np.power(v, e), True, 0.0)
+    return _monotone(a, lambda v: np.power(v, e), False, 0.0, open_low=True)
+
+
+def _sin(a: Interval) -> Interval:
+    lo, hi = a.lo, a.hi
+    # O intervalo contém um máximo (pi/2 + 2k pi) ou um mínimo (-pi/2 + 2k pi) de sin?
+    has_max = np.pi / 2 + 2 * np.pi * np.ceil((lo - np.pi / 2) / (2 * np.pi)) <= hi
+    has_min = -np.pi / 2 + 2 * np.pi * np.ceil((lo + np.pi / 2) / (2 * np.pi)) <= hi
+    unbounded = ~np.isfinite(lo) | ~np.isfinite(hi)
+    slo, shi = np.sin(lo), np.sin(hi)
+    rlo = np.where(has_min | unbounded, -1.0, np.minimum(slo, shi))
+    rhi = np.where(has_max | unbounded, 1.0, np.maximum(slo, shi))
+    rlo, rhi = _outward(rlo, rhi)
+    return Interval(np.maximum(rlo, -1.0), np.minimum(rhi, 1.0), a.defined)
+
+
+def _cos(a: Interval) -> Interval:
+    return _sin(Interval(*_outward(a.lo + np.pi / 2, a.hi + np.pi / 2), a.defined))
+
+
+def _tan(a: Interval) -> Interval:
+    lo, hi = a.lo, a.hi
+    pole = np.pi / 2 + np.pi * np.ceil((lo - np.pi / 2) / np.pi) <= hi
+    pole |= ~np.isfinite(lo) | ~np.isfinite(hi)
+    return Interval(*_outward(np.where(pole, -np.inf, np.tan(lo)), np.where(pole, np.inf, np.tan(hi))), a.defined)
+
+
+def _abs(a: Interval) -> Interval:
+    lo = np.where(a.lo >= 0, a.lo, np.where(a.hi <= 0, -a.hi, 0.0))
+    hi = np.maximum(np.abs(a.lo), np.abs(a.hi))
+    return Interval(lo, hi, a.defined)
+
+
+def _extremum(children: List[Interval], fn: Callable) -> Interval:
+    return Interval(fn.reduce(np.broadcast_arrays(*[c.lo for c in children])),
+                    fn.reduce(np.broadcast_arrays(*[c.hi for c in children])), _all_defined(children))
+
+
+_MONOTONE = {
+    sp.exp: (np.exp, True, {}),
+    sp.log: (np.log, True, {'low': 0.0, 'open_low': True}),
+    sp.sinh: (np.sinh, True, {}),
+    sp.tanh: (np.tanh, True, {}),
+    sp.asinh: (np.arcsinh, True, {}),
+    sp.acosh: (np.arccosh, True, {'low': 1.0}),
+    sp.atanh: (np.arctanh, True, {'low': -1.0, 'high': 1.0, 'open_low': True, 'open_high': True}),
+    sp.atan: (np.arctan, True, {}),
+    sp.asin: (np.arcsin, True, {'low': -1.0, 'high': 1.0}),
+    sp.acos: (np.arccos, False, {'low': -1.0, 'high': 1.0}),
+    sp.floor: (np.floor, True, {}),
+    sp.ceiling: (np.ceil, True, {}),
+    sp.sign: (np.sign, True, {}),
+}
+
+
+def interval_function(expr: sp.Expr, args: Sequence[str] = ('x', 'y')) -> Callable[..., Interval]:
+    """
+    Compila a expressão para avaliação sobre intervalos.
+
+    Args:
+        expr (sp.Expr): Expressão simbólica.
+        args (Sequence[str], optional): Nomes dos argumentos, na ordem da função gerada.
+
+    Returns:
+        Callable[..., Interval]: Função que recebe, para cada argumento, um par (lo, hi) de arrays
+        (um elemento por bloco) e devolve o Interval da expressão em cada bloco.
+    """
+    symbols = {sp.Symbol(a): n for n, a in enumerate(args)}
+
+    def build(node: sp.Expr) -> Callable[[list], Interval]:
+        if node in symbols:
+            n = symbols[node]
+            return lambda env: env[n]
+        if node.is_number:
+            try:
+                value = np.float64(float(node))
+            except TypeError:
+                # Constante complexa (I, por exemplo).
+                return lambda env: _unknown()
+            return lambda env: Interval(value, value, True)
+        children = [build(arg) for arg in node.args]
+        if node.is_Add:
+            def add(env):
+                result = children[0](env)
+                for child in children[1:]:
+                    result = _add(result, child(env))
+                return result
+            return add
+        if node.is_Mul:
+            def mul(env):
+                result = children[0](env)
+                for child in children[1:]:
+                    result = _mul(result, child(env))
+                return result
+            return mul
+        if node.is_Pow:
+            base, exponent = children
+            e = node.exp
+            if e.is_Integer:
+                return lambda env: _integer_power(base(env), int(e))
+            if e.is_number and e.is_real:
+                return lambda env: _real_power(base(env), float(e))
+            if node.base.is_number and node.base.is_positive:
+                # b**e = exp(e * log(b)) com b constante.
+                log_b = np.float64(float(sp.log(node.base)))
+                return lambda env: _monotone(_mul(exponent(env), Interval(log_b, log_b, True)), np.exp)
+            return lambda env: _unknown(base(env), exponent(env))
+        func = node.func
+        if func in _MONOTONE and len(children) == 1:
+            fn, increasing, domain = _MONOTONE[func]
+            return lambda env: _monotone(children[0](env), fn, increasing, **domain)
+        if func is sp.sin:
+            return lambda env: _sin(children[0](env))
+        if func is sp.cos:
+            return lambda env: _cos(children[0](env))
+        if func is sp.tan:
+            return lambda env: _tan(children[0](env))
+        if func is sp.Abs:
+            return lambda env: _abs(children[0](env))
+        if func is sp.cosh:
+            return lambda env: _monotone(_abs(children[0](env)), np.cosh)
+        if func is sp.Max:
+            return lambda env: _extremum([c(env) for c in children], np.maximum)
+        if func is sp.Min:
+            return lambda env: _extremum([c(env) for c in children], np.minimum)
+        return lambda env: _unknown(*[c(env) for c in children])
+
+    root = build(expr)
+
+    def evaluate(*bounds: Tuple[np.ndarray, np.ndarray]) -> Interval:
+        env = [Interval(np.asarray(lo, dtype=float), np.asarray(hi, dtype=float), True) for lo, hi in bounds]
+        with np.errstate(all='ignore'):
+            result = root(env)
+        shape = np.broadcast(*[b.lo for b in env]).shape
+        return Interval(np.broadcast_to(result.lo, shape), np.broadcast_to(result.hi, shape),
+                        np.broadcast_to(result.defined, shape))
+
+    return evaluate
+
+
+def symbolic_expression(f: Callable) -> Tuple[sp.Expr, Tuple[str, ...]]:
+    """Expressão simbólica e argumentos de uma função compilada pelo glc (atributo compiled), ou None."""
+    compiled = getattr(f, 'compiled', None)
+    if compiled is None:
+        return None
+    return compiled.expr, compiled.args
+
+
+def _fill_values(levels: np.ndarray) -> np.ndarray:
+    # Um valor representante de cada faixa: abaixo do primeiro nível, entre níveis vizinhos e acima do último.
+    spread = (levels[-1] - levels[0]) or 1.0
+    return np.concatenate([[levels[0] - spread], (levels[:-1] + levels[1:]) / 2, [levels[-1] + spread]])
+
+
+def pruned_grid(f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                x: np.ndarray,
+                y: np.ndarray,
+                levels: Sequence[float],
+                expr: sp.Expr = None,
+                args: Sequence[str] = ('x', 'y'),
+                leaf_size: int = None,
+                dense_fraction: float = DEFAULT_DENSE_FRACTION) -> PrunedGrid:
+    """
+    Avalia f só nos blocos da malha que podem ser cruzados por algum nível.
+
+    As curvas extraídas (ax.contour, glc.contour.marching_squares) de Z são as mesmas da malha
+    completa: uma célula só é cruzada por um nível se os seus cantos estão em faixas diferentes, e
+    os pontos não avaliados recebem o representante da faixa em que todo o bloco está.
+
+    Args:
+        f (Callable): Função vetorizada f(x, y).
+        x (np.ndarray): Eixo x (1-D, crescente ou decrescente).
+        y (np.ndarray): Eixo y (1-D).
+        levels (Sequence[float]): Níveis das curvas.
+        expr (sp.Expr, optional): Expressão de f. Se None, vem de f.compiled (funções do glc.cache).
+        args (Sequence[str], optional): Argumentos de expr.
+        leaf_size (int, optional): Lado mínimo dos blocos, em células. Se None, o maior entre
+            DEFAULT_LEAF_SIZE e 1/64 do maior lado da malha.
+        dense_fraction (float, optional): Fração de pontos a avaliar acima da qual a malha inteira é
+            avaliada de uma vez (menos chamadas de f).
+
+    Returns:
+        PrunedGrid: Malha com os pontos fora do domínio mascarados e a contagem de pontos.
+    """
+    if expr is None:
+        found = symbolic_expression(f)
+        if found is None:
+            raise ValueError("A função não tem expressão simbólica; informe expr.")
+        expr, args = found
+    x = np.asarray(x)
+    y = np.asarray(y)
+    nx, ny = x.size, y.size
+    if leaf_size is None:
+        leaf_size = max(DEFAULT_LEAF_SIZE, max(nx, ny) // 64)
+    levels = np.unique(np.asarray(levels, dtype=float))
+    levels = levels[np.isfinite(levels)]
+    fills = _fill_values(levels) if levels.size else np.zeros(1)
+    interval = interval_function(expr, args)
+    xf, yf = x.astype(float), y.astype(float)
+
+    # Blocos como faixas de células [i0, i1) x [j0, j1); os pontos vão de i0 a i1, inclusive.
+    tiles = np.array([[0, max(nx - 1, 1), 0, max(ny - 1, 1)]])
+    evaluate: List[np.ndarray] = []
+    fill: List[Tuple[np.ndarray, int]] = []
+    outside: List[np.ndarray] = []
+    while tiles.size:
+        i0, i1, j0, j1 = tiles.T
+        i1c, j1c = np.minimum(i1, nx - 1), np.minimum(j1, ny - 1)
+        xa, xb = xf[i0], xf[i1c]
+        ya, yb = yf[j0], yf[j1c]
+        iv = interval((np.minimum(xa, xb), np.maximum(xa, xb)), (np.minimum(ya, yb), np.maximum(ya, yb)))
+        band = np.searchsorted(levels, iv.lo, side='right')
+        crosses = (band < levels.size) & (levels[np.minimum(band, max(levels.size - 1, 0))] <= iv.hi) if levels.size else \
+            np.zeros(len(tiles), dtype=bool)
+        outside.append(tiles[~iv.defined])
+        skip = iv.defined & ~crosses
+        fill.extend(zip(tiles[skip], band[skip]))
+        open_ = iv.defined & crosses
+        leaf = open_ & (i1 - i0 <= leaf_size) & (j1 - j0 <= leaf_size)
+        evaluate.append(tiles[leaf])
+        split = tiles[open_ & ~leaf]
+        if not split.size:
+            break
+        # Divide cada bloco ao meio nos eixos maiores que o tamanho mínimo.
+        i0, i1, j0, j1 = split.T
+        im = np.where(i1 - i0 > leaf_size, (i0 + i1) // 2, i1)
+        jm = np.where(j1 - j0 > leaf_size, (j0 + j1) // 2, j1)
+        children = np.concatenate([np.stack(c, axis=1) for c in ((i0, im, j0, jm), (im, i1, j0, jm),
+                                                                (i0, im, jm, j1), (im, i1, jm, j1))])
+        tiles = children[(children[:, 1] > children[:, 0]) & (children[:, 3] > children[:, 2])]
+
+    evaluate = np.concatenate(evaluate) if evaluate else np.empty((0, 4), dtype=np.int64)
+    outside = np.concatenate(outside) if outside else np.empty((0, 4), dtype=np.int64)
+
+    def points(t: np.ndarray) -> int:
+        return int(((np.minimum(t[:, 1], nx - 1) - t[:, 0] + 1) * (np.minimum(t[:, 3], ny - 1) - t[:, 2] + 1)).sum())
+
+    n_eval = points(evaluate)
+    Z = np.empty((ny, nx), dtype=np.result_type(x.dtype, y.dtype, np.float32))
+    if n_eval > dense_fraction * nx * ny:
+        from glc.functions import evaluate_grid
+
+        with np.errstate(all='ignore'):
+            Z[...] = evaluate_grid(f, x, y)
+        return PrunedGrid(np.ma.masked_invalid(Z, copy=False), nx * ny, 0, 0)
+
+    # Os blocos não têm células em comum, só pontos nas bordas. Um ponto de borda compartilhado
+    # por blocos de faixas diferentes não pode estar definido (estaria nos dois intervalos) e fica
+    # NaN; para isso basta guardar a faixa (+1; 0 = nenhuma) dos pontos de borda.
+    mask = np.zeros((ny, nx), dtype=bool)
+    bands = np.zeros((ny, nx), dtype=np.int16)
+    for (i0, i1, j0, j1), band in fill:
+        Z[j0:j1 + 1, i0:i1 + 1] = fills[band]
+        for edge in ((j0, slice(i0, i1 + 1)), (j1, slice(i0, i1 + 1)), (slice(j0, j1 + 1), i0), (slice(j0, j1 + 1), i1)):
+            previous = bands[edge]
+            mask[edge] |= (previous > 0) & (previous != band + 1)
+            bands[edge] = band + 1
+    Z[mask] = np.nan
+    for i0, i1, j0, j1 in outside:
+        Z[j0:j1 + 1, i0:i1 + 1] = np.nan
+        mask[j0:j1 + 1, i0:i1 + 1] = True
+    with np.errstate(all='ignore'):
+        for i0, i1, j0, j1 in evaluate:
+            xs, ys = x[i0:i1 + 1], y[j0:j1 + 1]
+            region = Z[j0:j1 + 1, i0:i1 + 1]
+            region[...] = f(xs[None, :], ys[:, None])
+            mask[j0:j1 + 1, i0:i1 + 1] = ~np.isfinite(region)
+    n_out = points(outside)
+    return PrunedGrid(np.ma.MaskedArray(Z, mask=mask, copy=False), n_eval, max(nx * ny - n_eval - n_out, 0), n_out)
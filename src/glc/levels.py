@@ -0,0 +1,221 @@
+from typing import Tuple
+
+import numpy as np
+
+"""
+Escolha automática dos níveis das curvas a partir de estatísticas acumuladas numa única passada.
+
+O padrão antigo, np.linspace(Z.min(), Z.max(), 10), vira NaN quando o domínio tem pontos inválidos
+(sqrt(x) ou log(y + 1) nos intervalos padrão, por exemplo), gasta níveis com valores extremos isolados
+e precisa de toda a matriz Z na memória. Aqui os valores são resumidos por um ValueSketch: mínimo e
+máximo ignorando NaN e infinitos e um resumo da distribuição (centróides ponderados, no estilo do
+t-digest) do qual saem quantis e histogramas aproximados. O resumo é atualizado bloco a bloco e dois
+resumos (de blocos ou de processos diferentes) podem ser combinados com merge, de modo que os níveis
+de uma avaliação em blocos ou em paralelo saem sem uma segunda passada pelos dados.
+
+Estratégias de níveis (select_levels):
+
+    linear      n níveis igualmente espaçados entre o mínimo e o máximo finitos
+    quantile    n níveis igualmente espaçados entre os quantis tail e 1 - tail (ignora valores extremos)
+    log         n níveis em progressão geométrica entre os mesmos quantis; se os valores mudam de sinal,
+                os níveis são simétricos em torno de zero
+    equal-area  níveis nos quantis i / (n + 1): numa malha uniforme, a área entre dois níveis
+                consecutivos é a mesma
+"""
+
+STRATEGIES = ('quantile', 'linear', 'log', 'equal-area')
+
+DEFAULT_STRATEGY = 'quantile'
+
+# Número máximo de centróides mantidos por resumo.
+DEFAULT_SKETCH_SIZE = 256
+
+# Blocos maiores que isso são resumidos a partir de uma amostra com passo fixo, para que o custo por
+# bloco seja linear (a ordenação é feita só na amostra).
+_SAMPLE_LIMIT = 2 ** 16
+
+# No modo 'log' com valores dos dois sinais, os níveis cobrem esta quantidade de décadas abaixo do maior módulo.
+_SYMMETRIC_LOG_DECADES = 3
+
+
+class ValueSketch:
+    """
+    Resumo mesclável dos valores finitos de uma malha.
+
+    Attributes:
+        min (float): Menor valor finito (NaN se não houver nenhum).
+        max (float): Maior valor finito (NaN se não houver nenhum).
+        count (int): Número de valores finitos.
+        invalid (int): Número de valores NaN ou infinitos.
+        means (np.ndarray): Centróides do resumo, em ordem crescente.
+        weights (np.ndarray): Quantidade de valores representada por cada centróide.
+    """
+
+    def __init__(self, size: int = DEFAULT_SKETCH_SIZE):
+        self.size = size
+        self.min = np.nan
+        self.max = np.nan
+        self.count = 0
+        self.invalid = 0
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values: np.ndarray) -> 'ValueSketch':
+        """
+        Acumula um bloco de valores.
+
+        Args:
+            values (np.ndarray): Valores de qualquer forma; NaN e infinitos são só contados.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        finite = values[np.isfinite(values)]
+        self.invalid += values.size - finite.size
+        if finite.size == 0:
+            return self
+        low, high = float(finite.min()), float(finite.max())
+        self.min = low if self.count == 0 else min(self.min, low)
+        self.max = high if self.count == 0 else max(self.max, high)
+        step = -(-finite.size // _SAMPLE_LIMIT)
+        sample = np.sort(finite[::step])
+        self._absorb(sample, np.full(sample.size, finite.size / sample.size))
+        self.count += finite.size
+        return self
+
+    def merge(self, other: 'ValueSketch') -> 'ValueSketch':
+        """Combina o resumo de outro bloco (de outro processo, por exemplo) neste."""
+        if other.count:
+            self.min = other.min if self.count == 0 else min(self.min, other.min)
+            self.max = other.max if self.count == 0 else max(self.max, other.max)
+            self._absorb(other.means, other.weights)
+            self.count += other.count
+        self.invalid += other.invalid
+        return self
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray) -> None:
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        # Escala do t-digest: os centróides das caudas representam menos valores que os do meio,
+        # o que mantém os quantis extremos (usados pelas estratégias) precisos.
+        bucket = np.minimum(((np.arcsin(2 * q - 1) / np.pi + 0.5) * self.size).astype(np.int64), self.size - 1)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def _knots(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Posição acumulada (em número de valores) de cada centróide, com o mínimo e o máximo nas pontas.
+        positions = np.cumsum(self.weights) - self.weights / 2
+        return (np.concatenate([[0.0], positions, [float(self.count)]]),
+                np.clip(np.concatenate([[self.min], self.means, [self.max]]), self.min, self.max))
+
+    def quantile(self, q) -> np.ndarray:
+        """
+        Quantis aproximados dos valores finitos.
+
+        Args:
+            q (float ou array): Frações entre 0 e 1.
+
+        Returns:
+            np.ndarray: Quantis (NaN se não houver valores finitos).
+        """
+        q = np.clip(np.asarray(q, dtype=float), 0.0, 1.0)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        positions, values = self._knots()
+        return np.interp(q * self.count, positions, values)
+
+    def cdf(self, value) -> np.ndarray:
+        """Fração aproximada dos valores finitos menores ou iguais a value."""
+        value = np.asarray(value, dtype=float)
+        if self.count == 0:
+            return np.full(value.shape, np.nan)
+        positions, values = self._knots()
+        return np.interp(value, values, positions) / self.count
+
+    def histogram(self, bins: int = 10, range: Tuple[float, float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Histograma aproximado, no formato de np.histogram.
+
+        Args:
+            bins (int, optional): Número de intervalos.
+            range (Tuple, optional): Limites (min, max); se None, o mínimo e o máximo finitos.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Contagens e bordas dos intervalos.
+        """
+        low, high = range if range is not None else (self.min, self.max)
+        edges = np.linspace(low, high, bins + 1)
+        if self.count == 0:
+            return np.zeros(bins), edges
+        return np.diff(self.cdf(edges) * self.count), edges
+
+
+def _log_levels(sketch: ValueSketch, n: int, low: float, high: float) -> np.ndarray:
+    if low > 0:
+        return np.geomspace(low, high, n)
+    if high < 0:
+        return -np.geomspace(-low, -high, n)
+    # Valores dos dois sinais: níveis geométricos dos dois lados de zero, divididos conforme a
+    # fração de valores de cada lado, mais o próprio zero.
+    scale = max(-low, high)
+    floor = scale * 10.0 ** -_SYMMETRIC_LOG_DECADES
+    below = float(sketch.cdf(0.0))
+    n_neg = int(round((n - 1) * below)) if low < -floor else 0
+    n_pos = (n - 1 - n_neg) if high > floor else 0
+    if n_pos == 0 and low < -floor:
+        n_neg = n - 1
+    negative = -np.geomspace(-low, floor, n_neg) if n_neg else np.empty(0)
+    positive = np.geomspace(floor, high, n_pos) if n_pos else np.empty(0)
+    return np.concatenate([negative, [0.0], positive])
+
+
+def select_levels(sketch: ValueSketch, n: int = 10, strategy: str = DEFAULT_STRATEGY,
+                  tail: float = 0.01) -> np.ndarray:
+    """
+    Escolhe os níveis das curvas a partir de um resumo dos valores.
+
+    Args:
+        sketch (ValueSketch): Resumo dos valores da malha.
+        n (int, optional): Número de níveis.
+        strategy (str, optional): 'quantile', 'linear', 'log' ou 'equal-area'.
+        tail (float, optional): Fração ignorada em cada extremo nas estratégias 'quantile' e 'log'.
+
+    Returns:
+        np.ndarray: Níveis finitos em ordem crescente (vazio se não houver valores finitos).
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Estratégia de níveis desconhecida: {strategy!r}. Use uma de {STRATEGIES}.")
+    if sketch.count == 0:
+        return np.empty(0)
+    if sketch.max == sketch.min:
+        return np.array([sketch.min])
+
+    if strategy == 'linear':
+        levels = np.linspace(sketch.min, sketch.max, n)
+    elif strategy == 'equal-area':
+        levels = sketch.quantile(np.arange(1, n + 1) / (n + 1))
+    else:
+        low, high = (float(v) for v in sketch.quantile([tail, 1 - tail]))
+        if high <= low:
+            low, high = sketch.min, sketch.max
+        levels = _log_levels(sketch, n, low, high) if strategy == 'log' else np.linspace(low, high, n)
+    # O matplotlib exige níveis estritamente crescentes.
+    return np.unique(levels[np.isfinite(levels)])
+
+
+def auto_levels(Z: np.ndarray, n: int = 10, strategy: str = DEFAULT_STRATEGY) -> np.ndarray:
+    """
+    Níveis automáticos para uma malha já avaliada, ignorando NaN e infinitos.
+
+    Args:
+        Z (np.ndarray): Valores da malha.
+        n (int, optional): Número de níveis.
+        strategy (str, optional): Estratégia de select_levels.
+
+    Returns:
+        np.ndarray: Níveis em ordem crescente.
+    """
+    return select_levels(ValueSketch().update(Z), n, strategy)
@@ -0,0 +1,124 @@
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+"""
+Gráfico das curvas de nível (LC-2D.py / glc-contour).
+
+O matplotlib só é importado quando o gráfico é desenhado.
+"""
+
+
+def plot_contour(f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                 x_range: Tuple[float, float],
+                 y_range: Tuple[float, float],
+                 levels: List[float] = None,
+                 title: str = 'Gráfico das Curvas de Nível para a Função',
+                 save_as_png: bool = False,
+                 filename: str = 'grafico.png',
+                 color_map: str = 'viridis',
+                 line_style: str = '-',
+                 adaptive: bool = False,
+                 show: bool = True,
+                 dtype: type = np.float64,
+                 level_strategy: str = 'quantile',
+                 resolution: int = 400,
+                 prune: bool = True,
+                 progressive: bool = False) -> None:
+    """
+    Plota as curvas de nível da função dada f(x, y).
+
+    Args:
+        f (Callable): Função que aceita dois argumentos (x, y) e retorna um valor.
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        levels (List, optional): Níveis das curvas. Se None, 10 níveis escolhidos por level_strategy.
+        title (str, optional): Título do gráfico.
+        save_as_png (bool, optional): Salva o gráfico em filename.
+        filename (str, optional): Nome do arquivo salvo.
+        color_map (str, optional): Mapa de cores.
+        line_style (str, optional): Estilo de linha.
+        adaptive (bool, optional): Usa amostragem adaptativa em vez da malha uniforme.
+        show (bool, optional): Abre a janela do gráfico; se False, a figura é fechada depois de salva.
+        dtype (type, optional): Tipo da malha (np.float32 reduz a memória pela metade; use com
+            parse_function(..., engine='ufunc', dtype=np.float32)).
+        level_strategy (str, optional): Estratégia dos níveis automáticos: 'quantile', 'linear', 'log' ou
+            'equal-area' (ver glc.levels). NaN e infinitos são ignorados.
+        resolution (int, optional): Pontos por eixo da malha uniforme.
+        prune (bool, optional): Com levels dados, numa malha grande, avalia f só nos blocos que podem
+            ser cruzados por algum nível (ver glc.functions.contour_grid e glc.intervals).
+        progressive (bool, optional): Com a janela aberta, desenha uma prévia grosseira logo e refina a
+            malha em segundo plano até resolution (ver glc.progressive); um zoom refina de novo na nova vista.
+    """
+    import matplotlib.pyplot as plt
+
+    from glc.functions import contour_grid
+    from glc.levels import auto_levels
+    from glc.profiling import stage
+
+    # A prévia só faz sentido com a janela aberta; a amostragem adaptativa já refina por conta própria.
+    progressive = progressive and show and not adaptive
+    if adaptive:
+        from glc.adaptive import adaptive_sample
+
+        # Amostragem adaptativa: refina só as células cruzadas pelos níveis ou com erro alto.
+        samples = adaptive_sample(f, x_range, y_range, levels=levels, level_strategy=level_strategy)
+        X, Y, Z = samples.x, samples.y, samples.Z
+        if levels is None:
+            levels = samples.levels
+    elif not progressive:
+        x = np.linspace(x_range[0], x_range[1], resolution, dtype=dtype)
+        y = np.linspace(y_range[0], y_range[1], resolution, dtype=dtype)
+        # O plt.contour aceita os eixos 1-D no lugar das matrizes do meshgrid; os pontos fora do
+        # domínio chegam mascarados.
+        X, Y, Z = x, y, contour_grid(f, x, y, levels, prune)
+
+    fig = plt.figure(figsize=(8, 8))
+    ax = plt.gca()
+    artists = {}
+
+    def draw(X, Y, Z) -> None:
+        # No modo progressivo, as curvas da malha anterior (e os rótulos do clabel) são trocadas.
+        if 'contours' in artists:
+            artists['contours'].remove()
+        current = levels if levels is not None else auto_levels(Z, strategy=level_strategy)
+        with stage('contour', levels=len(current)):
+            artists['contours'] = ax.contour(X, Y, Z, levels=current, cmap=color_map, linestyles=line_style)
+        with stage('clabel'):
+            ax.clabel(artists['contours'], inline=True, fontsize=8)
+
+    if not progressive:
+        draw(X, Y, Z)
+    plt.title(title)
+    plt.xlabel('x')
+    plt.ylabel('y')
+    plt.grid(True)
+    plt.axhline(0, color='black', linewidth=0.5)
+    plt.axvline(0, color='black', linewidth=0.5)
+
+    if not filename:
+        filename = 'GLC.png'
+    if progressive:
+        from glc.progressive import ProgressiveRenderer
+
+        # Começa depois das linhas dos eixos, para que o autoscale delas não conte como zoom.
+        renderer = ProgressiveRenderer(fig, draw, f, x_range, y_range, resolution, dtype, watch=[ax])
+        renderer.start()
+        plt.show(block=True)
+        if save_as_png:
+            # Grava a malha final da última vista, mesmo que a janela tenha sido fechada antes.
+            renderer.finish()
+            with stage('savefig', path=filename):
+                fig.savefig(filename, format='png')
+            print(f"Gráfico salvo como {filename}")
+        return
+
+    if save_as_png:
+        with stage('savefig', path=filename):
+            plt.savefig(filename, format='png')
+        print(f"Gráfico salvo como {filename}")
+
+    if show:
+        plt.show(block=True)
+    else:
+        plt.close(fig)
@@ -0,0 +1,122 @@
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from glc.decimate import DEFAULT_MAX_TRIANGLES, plot_surface_mesh
+
+"""
+Superfície 3D e curvas de nível lado a lado com o matplotlib (surface3D.py / glc-surface).
+
+O matplotlib só é importado quando o gráfico é desenhado. A superfície é desenhada com uma malha
+triangular reduzida (glc.decimate), com mais triângulos onde ela se curva; as curvas de nível usam
+a malha completa.
+"""
+
+
+def plot_surface_and_contour(f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                             x_range: Tuple[float, float],
+                             y_range: Tuple[float, float],
+                             levels: List[float] = None,
+                             title: str = 'Gráfico da Superfície',
+                             title2: str = 'Gráfico das Curvas de Nível da Função',
+                             save_path: str = None,
+                             show: bool = True,
+                             dtype: type = np.float64,
+                             level_strategy: str = 'quantile',
+                             resolution: int = 400,
+                             progressive: bool = False,
+                             surface_triangles: int = DEFAULT_MAX_TRIANGLES) -> None:
+    """
+    Plota tanto a superfície 3D quanto o gráfico de contorno para a função dada f(x, y).
+
+    Args:
+        f (Callable): Função que aceita dois argumentos (x, y) e retorna um valor.
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        levels (List, optional): Níveis das curvas de contorno a serem plotadas. Se None, 10 níveis escolhidos por level_strategy.
+        title (str, optional): Título do gráfico.
+        title2 (str, optional): Título do gráfico das curvas de nível.
+        save_path (str, optional): Caminho para salvar a imagem do gráfico. Se None, a imagem não será salva.
+        show (bool, optional): Abre a janela do gráfico; se False, a figura é fechada depois de salva.
+        dtype (type, optional): Tipo da malha (np.float32 reduz a memória pela metade; use com
+            parse_function(..., engine='ufunc', dtype=np.float32)).
+        level_strategy (str, optional): Estratégia dos níveis automáticos: 'quantile', 'linear', 'log' ou
+            'equal-area' (ver glc.levels). NaN e infinitos são ignorados.
+        resolution (int, optional): Pontos por eixo da malha.
+        progressive (bool, optional): Com a janela aberta, desenha uma prévia grosseira logo e refina a
+            malha em segundo plano até resolution (ver glc.progressive); um zoom nas curvas de nível
+            refina de novo na nova vista.
+        surface_triangles (int, optional): Orçamento de triângulos da superfície (ver glc.decimate). Se
+            None, a malha vai inteira para o plot_surface, que a reduz a 50x50 pontos igualmente espaçados.
+    """
+    import matplotlib.pyplot as plt
+
+    from glc.functions import evaluate_grid
+    from glc.levels import auto_levels
+    from glc.profiling import stage
+
+    progressive = progressive and show
+
+    fig = plt.figure(figsize=(14, 7))
+
+    ax1 = fig.add_subplot(121, projection='3d')
+    ax1.set_title(f'3D: {title}')
+    ax1.set_xlabel('x')
+    ax1.set_ylabel('y')
+    ax1.set_zlabel('z')
+
+    ax2 = fig.add_subplot(122)
+    ax2.set_title(f'2D: {title2}')
+    ax2.set_xlabel('x')
+    ax2.set_ylabel('y')
+    artists = {}
+
+    def draw(x, y, Z) -> None:
+        # No modo progressivo, a superfície e as curvas da malha anterior são trocadas nos mesmos eixos.
+        if artists:
+            artists['surface'].remove()
+            artists['contours'].remove()
+        if surface_triangles:
+            artists['surface'] = plot_surface_mesh(ax1, x, y, Z, surface_triangles, cmap='viridis', edgecolor='none')
+        else:
+            # plot_surface faz o broadcasting de x[None, :] e y[:, None] com Z; a malha não é montada aqui.
+            with stage('plot_surface', z=Z):
+                artists['surface'] = ax1.plot_surface(x[None, :], y[:, None], Z, cmap='viridis', edgecolor='none')
+        current = levels if levels is not None else auto_levels(Z, strategy=level_strategy)
+        with stage('contour', levels=len(current)):
+            artists['contours'] = ax2.contour(x, y, Z, levels=current, cmap='viridis')
+        with stage('clabel'):
+            ax2.clabel(artists['contours'], inline=True, fontsize=8)
+
+    if not progressive:
+        x = np.linspace(x_range[0], x_range[1], resolution, dtype=dtype)
+        y = np.linspace(y_range[0], y_range[1], resolution, dtype=dtype)
+        draw(x, y, evaluate_grid(f, x, y))
+    ax2.grid(True)
+    ax2.axhline(0, color='black', linewidth=0.5)
+    ax2.axvline(0, color='black', linewidth=0.5)
+
+    if progressive:
+        from glc.progressive import ProgressiveRenderer
+
+        # Um zoom no gráfico das curvas de nível refina as duas vistas no novo intervalo.
+        renderer = ProgressiveRenderer(fig, draw, f, x_range, y_range, resolution, dtype, watch=[ax2])
+        renderer.start()
+        plt.show()
+        if save_path:
+            # Grava a malha final da última vista, mesmo que a janela tenha sido fechada antes.
+            renderer.finish()
+            with stage('savefig', path=save_path):
+                fig.savefig(save_path)
+            print(f"Gráfico salvo em: {save_path}")
+        return
+
+    if save_path:
+        with stage('savefig', path=save_path):
+            plt.savefig(save_path)
+        print(f"Gráfico salvo em: {save_path}")
+
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
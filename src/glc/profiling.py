@@ -0,0 +1,296 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+"""
+Medição das etapas de um gráfico: --profile nos comandos glc-* ou a variável GLC_PROFILE.
+
+Quando um gráfico demora, as etapas candidatas são muitas: sp.sympify, sp.lambdify, a avaliação
+da malha, sp.diff, as análises simbólicas, a integral numérica, plt.contour/clabel, a serialização
+do plotly e o savefig. Cada uma delas roda dentro de um stage('nome'), que registra o tempo de
+relógio, o tempo de CPU do processo, o pico de memória alocada durante a etapa (tracemalloc, que
+também vê os arrays do NumPy) e anotações como a forma e o tamanho dos arrays. O tracemalloc deixa
+as alocações bem mais lentas, por isso só fica ligado enquanto alguma etapa está aberta: fora delas
+(os imports, por exemplo) o programa roda na velocidade normal, e o tempo total do resumo inclui esse
+intervalo não medido.
+
+Ao fim do processo, as etapas são gravadas no formato de trace do Chrome (abra o arquivo em
+chrome://tracing ou em https://ui.perfetto.dev), com os totais por etapa em "otherData", e uma
+linha de resumo vai para a saída de erro:
+
+    perfil: 1.84 s, pico 212.4 MB | lambdify 0.62 s | contour 0.41 s | savefig 0.33 s | ... -> glc-profile.json
+
+Desligado (o padrão), stage() devolve sempre o mesmo objeto vazio: o custo é o de uma chamada de
+função por etapa. Este módulo só usa a biblioteca padrão, para que a linha de comando possa
+ligá-lo antes de importar o resto.
+"""
+
+PROFILE_ENV = 'GLC_PROFILE'
+
+DEFAULT_TRACE_PATH = 'glc-profile.json'
+
+# Etapas mostradas no resumo de uma linha.
+_SUMMARY_STAGES = 6
+
+
+class _NullStage:
+    """Etapa vazia usada com a medição desligada."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullStage':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    def note(self, **info: Any) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('name', 'info', '_wall', '_cpu', '_base', 'peak')
+
+    def __init__(self, name: str, info: Dict[str, Any]):
+        self.name = name
+        self.info = info
+        self.peak = 0
+
+    def __enter__(self) -> '_Stage':
+        _start_tracing()
+        stack = _stack()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # O pico da etapa de fora até aqui é guardado antes de reiniciar a contagem.
+            stack[-1].peak = max(stack[-1].peak, peak)
+        _reset_peak()
+        self._base = current
+        self.peak = current
+        stack.append(self)
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        _, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+        stack = _stack()
+        stack.pop()
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, self.peak)
+        if exc_type is not None:
+            self.info['error'] = exc_type.__name__
+        _record(self.name, self._wall, wall - self._wall, cpu - self._cpu, self.peak - self._base, self.info)
+        _stop_tracing()
+        return None
+
+    def note(self, **info: Any) -> None:
+        """Acrescenta anotações à etapa (arrays viram forma, tipo e bytes)."""
+        self.info.update({k: array_info(v) for k, v in info.items()})
+
+
+_enabled = False
+_trace_path = None
+_start_wall = 0.0
+_start_cpu = 0.0
+_events: List[Dict[str, Any]] = []
+_events_lock = threading.Lock()
+_local = threading.local()
+# Etapas abertas em todas as threads; o tracemalloc é ligado na primeira e desligado na última
+# (a não ser que já estivesse ligado por fora, com python -X tracemalloc, por exemplo).
+_open_stages = 0
+_owns_tracing = False
+_tracing_lock = threading.Lock()
+
+
+def _start_tracing() -> None:
+    global _open_stages, _owns_tracing
+    with _tracing_lock:
+        if _open_stages == 0:
+            _owns_tracing = not tracemalloc.is_tracing()
+            if _owns_tracing:
+                tracemalloc.start()
+        _open_stages += 1
+
+
+def _stop_tracing() -> None:
+    global _open_stages, _owns_tracing
+    with _tracing_lock:
+        _open_stages -= 1
+        if _open_stages == 0 and _owns_tracing:
+            tracemalloc.stop()
+            _owns_tracing = False
+
+
+def _reset_peak() -> None:
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    elif _owns_tracing:
+        # Python 3.8, sem reset_peak: reiniciar o tracemalloc zera o pico, e também a memória atual,
+        # de modo que os picos das etapas que envolvem outras ficam aproximados.
+        tracemalloc.stop()
+        tracemalloc.start()
+
+
+def _stack() -> list:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _record(name: str, start: float, wall: float, cpu: float, peak: int, info: Dict[str, Any]) -> None:
+    event = {'name': name, 'cat': 'glc', 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+             'ts': round((start - _start_wall) * 1e6, 1), 'dur': round(wall * 1e6, 1),
+             'args': dict(info, cpu_ms=round(cpu * 1e3, 3), peak_bytes=max(peak, 0))}
+    with _events_lock:
+        _events.append(event)
+
+
+def array_info(value: Any) -> Any:
+    """Forma, tipo e bytes de um array; outros valores ficam como estão."""
+    shape = getattr(value, 'shape', None)
+    if shape is None or not hasattr(value, 'nbytes'):
+        return value
+    return {'shape': list(shape), 'dtype': str(value.dtype), 'nbytes': int(value.nbytes)}
+
+
+def stage(name: str, **info: Any):
+    """
+    Mede uma etapa, como gerenciador de contexto.
+
+    Args:
+        name (str): Nome da etapa ('sympify', 'evaluate_grid', 'savefig', ...).
+        **info: Anotações gravadas com a etapa; arrays entram pela forma, tipo e bytes.
+
+    Returns:
+        Objeto com __enter__/__exit__ e note(**info); com a medição desligada, um objeto vazio.
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, {k: array_info(v) for k, v in info.items()})
+
+
+def enabled() -> bool:
+    """Indica se a medição está ligada."""
+    return _enabled
+
+
+def enable(path: str = DEFAULT_TRACE_PATH) -> None:
+    """
+    Liga a medição; o trace é gravado em path (e o resumo impresso) ao fim do processo.
+
+    Args:
+        path (str, optional): Arquivo JSON no formato de trace do Chrome.
+    """
+    global _enabled, _trace_path, _start_wall, _start_cpu
+    if _enabled:
+        _trace_path = path
+        return
+    _trace_path = path
+    _start_wall = time.perf_counter()
+    _start_cpu = time.process_time()
+    _enabled = True
+    atexit.register(finish)
+
+
+def totals() -> Dict[str, Dict[str, float]]:
+    """Tempo de relógio, tempo de CPU, pico de memória e número de chamadas de cada etapa."""
+    result: Dict[str, Dict[str, float]] = {}
+    with _events_lock:
+        events = list(_events)
+    for event in events:
+        total = result.setdefault(event['name'], {'seconds': 0.0, 'cpu_seconds': 0.0, 'peak_bytes': 0, 'calls': 0})
+        total['seconds'] += event['dur'] / 1e6
+        total['cpu_seconds'] += event['args']['cpu_ms'] / 1e3
+        total['peak_bytes'] = max(total['peak_bytes'], event['args']['peak_bytes'])
+        total['calls'] += 1
+    return result
+
+
+def summary() -> str:
+    """Resumo de uma linha: tempo total, pico de memória e as etapas mais demoradas."""
+    elapsed = time.perf_counter() - _start_wall
+    stage_totals = totals()
+    peak = max([0] + [t['peak_bytes'] for t in stage_totals.values()])
+    stages = sorted(stage_totals.items(), key=lambda item: -item[1]['seconds'])[:_SUMMARY_STAGES]
+    parts = [f"perfil: {elapsed:.2f} s, pico {peak / 2 ** 20:.1f} MB"]
+    parts += [f"{name} {t['seconds']:.2f} s" + (f" ({t['calls']}x)" if t['calls'] > 1 else '') for name, t in stages]
+    return ' | '.join(parts)
+
+
+def write_trace(path: str) -> None:
+    """Grava as etapas medidas no formato de trace do Chrome."""
+    with _events_lock:
+        events = list(_events)
+    trace = {
+        'traceEvents': events,
+        'displayTimeUnit': 'ms',
+        'otherData': {
+            'argv': sys.argv,
+            'seconds': time.perf_counter() - _start_wall,
+            'cpu_seconds': time.process_time() - _start_cpu,
+            'stages': totals(),
+        },
+    }
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(trace, fh, default=str)
+
+
+def flush() -> None:
+    """
+    Grava o trace com as etapas medidas até aqui, sem desligar a medição.
+
+    Os processos de um pool (os workers do glc-batch) terminam sem chamar as funções do atexit:
+    eles chamam flush() ao fim de cada trabalho.
+    """
+    if _enabled and _events:
+        try:
+            write_trace(_output_path())
+        except OSError:
+            pass
+
+
+def finish() -> None:
+    """Grava o trace, imprime o resumo e desliga a medição (chamada automaticamente ao sair)."""
+    global _enabled
+    if not _enabled:
+        return
+    _enabled = False
+    if not _events:
+        # Nenhuma etapa medida (o processo principal do glc-batch, os workers das análises simbólicas).
+        return
+    path = _output_path()
+    try:
+        write_trace(path)
+    except OSError as e:
+        print(f"perfil: não foi possível gravar {path}: {e}", file=sys.stderr)
+        print(summary(), file=sys.stderr)
+        return
+    print(f"{summary()} -> {path}", file=sys.stderr)
+
+
+def _output_path() -> str:
+    # Os processos filhos (os workers do glc-batch herdam a variável ou o estado do processo
+    # principal) gravam cada um o seu arquivo, com o pid no nome.
+    import multiprocessing
+
+    if multiprocessing.parent_process() is None:
+        return _trace_path
+    root, ext = os.path.splitext(_trace_path)
+    return f"{root}.{os.getpid()}{ext}"
+
+
+if os.environ.get(PROFILE_ENV):
+    # GLC_PROFILE=1 usa o arquivo padrão; qualquer outro valor é o caminho do trace.
+    enable(DEFAULT_TRACE_PATH if os.environ[PROFILE_ENV] == '1' else os.environ[PROFILE_ENV])
@@ -0,0 +1,441 @@
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+
+from glc.cache import CompiledExpression, compile_function
+
+if TYPE_CHECKING:
+    import sympy as sp
+
+"""
+Avaliação de expressões como programas de ufuncs do NumPy com buffers reaproveitados.
+
+A função do lambdify calcula exp(-x**2 - y**2) * sin(x) * cos(y) criando um array novo do
+tamanho da malha para cada operador. Aqui a árvore do SymPy é convertida numa lista linear de
+chamadas de ufuncs (np.square, np.add, np.exp, ...) em que cada resultado intermediário vai para
+um registrador. Na primeira chamada com um dado formato de entrada, os registradores são
+distribuídos entre poucos buffers (um buffer é reaproveitado assim que o último uso do
+registrador anterior passa, inclusive como saída da própria instrução que o consome) e os buffers
+ficam guardados numa arena. As chamadas seguintes não alocam nada além do resultado, ou nem
+isso, se out for passado.
+
+Com dtype=np.float32 as entradas são convertidas uma vez para buffers float32 da arena e toda a
+conta é feita em float32: metade da memória e, em geral, ufuncs transcendentais mais rápidas, com
+precisão de ~7 dígitos.
+
+Expressões com nós sem ufunc equivalente (Piecewise, funções especiais, ...) levantam
+NotImplementedError em compile_program; program_function cai então na função do lambdify.
+"""
+
+DTYPES = {'float64': np.float64, 'float32': np.float32}
+
+# Funções do SymPy de um argumento e a ufunc correspondente, pelo nome da classe.
+_UNARY = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'asinh': np.arcsinh, 'acosh': np.arccosh, 'atanh': np.arctanh,
+    'exp': np.exp, 'log': np.log, 'Abs': np.absolute, 'sign': np.sign,
+    'floor': np.floor, 'ceiling': np.ceil,
+}
+_BINARY = {'atan2': np.arctan2}
+_NARY = {'Max': np.maximum, 'Min': np.minimum}
+
+# Expoentes inteiros até este valor viram multiplicações e quadrados em vez de np.power.
+_MAX_INTEGER_POWER = 16
+
+
+class Instruction(NamedTuple):
+    """
+    Uma chamada ufunc(*inputs, out=registrador).
+
+    Attributes:
+        ufunc (np.ufunc): Ufunc chamada.
+        inputs (Tuple): Operandos: int para registradores (os primeiros são os argumentos) ou float para constantes.
+        output (int): Registrador do resultado.
+    """
+    ufunc: np.ufunc
+    inputs: Tuple[Union[int, float], ...]
+    output: int
+
+
+class _Lowering:
+    # Converte a árvore do SymPy em instruções. Subárvores iguais (o SymPy compartilha os nós)
+    # viram um único registrador.
+
+    def __init__(self, args: Sequence[str]):
+        import sympy as sp
+
+        from glc.separable import group_by_variables
+
+        self.sp = sp
+        self.group_by_variables = group_by_variables
+        self.symbol_list = [sp.Symbol(a) for a in args]
+        self.symbols = {s: i for i, s in enumerate(self.symbol_list)}
+        self.n_registers = len(args)
+        self.instructions: List[Instruction] = []
+        self.memo: Dict[object, Union[int, float]] = {}
+
+    def emit(self, ufunc: np.ufunc, *inputs: Union[int, float]) -> int:
+        output = self.n_registers
+        self.n_registers += 1
+        self.instructions.append(Instruction(ufunc, tuple(inputs), output))
+        return output
+
+    def chain(self, ufunc: np.ufunc, operands: List[Union[int, float]]) -> Union[int, float]:
+        result = operands[0]
+        for operand in operands[1:]:
+            result = self.emit(ufunc, result, operand)
+        return result
+
+    def lower(self, expr) -> Union[int, float]:
+        if expr not in self.memo:
+            self.memo[expr] = self._lower(expr)
+        return self.memo[expr]
+
+    def _lower(self, expr) -> Union[int, float]:
+        if expr in self.symbols:
+            return self.symbols[expr]
+        if expr.is_Symbol:
+            raise NotImplementedError(f"Variável livre sem valor: {expr}")
+        if expr.is_number:
+            value = complex(expr)
+            if value.imag != 0:
+                raise NotImplementedError(f"Constante complexa não suportada: {expr}")
+            return float(value.real)
+        if expr.is_Add:
+            return self._add(expr)
+        if expr.is_Mul:
+            return self._mul(expr)
+        if expr.is_Pow:
+            return self._pow(expr.base, expr.exp)
+        name = type(expr).__name__
+        if name in _UNARY and len(expr.args) == 1:
+            return self.emit(_UNARY[name], self.lower(expr.args[0]))
+        if name in _BINARY and len(expr.args) == 2:
+            return self.emit(_BINARY[name], *[self.lower(a) for a in expr.args])
+        if name in _NARY:
+            return self.chain(_NARY[name], [self.lower(a) for a in expr.args])
+        raise NotImplementedError(f"Operação não suportada pelo programa de ufuncs: {name}")
+
+    def _add(self, expr) -> Union[int, float]:
+        # Os termos que dependem das mesmas variáveis são somados antes de se juntar aos outros: com
+        # entradas x[None, :] e y[:, None], só as somas entre grupos têm o tamanho da malha.
+        result, negated = None, False
+        for _, terms in self.group_by_variables(expr.args, self.symbol_list):
+            part, part_negated = self._sum(terms)
+            if result is None:
+                result, negated = part, part_negated
+            elif part_negated == negated:
+                result = self.emit(np.add, result, part)
+            elif negated:
+                result, negated = self.emit(np.subtract, part, result), False
+            else:
+                result = self.emit(np.subtract, result, part)
+        return self.emit(np.negative, result) if negated else result
+
+    def _sum(self, terms) -> Tuple[Union[int, float], bool]:
+        # Soma de um grupo de termos; se todos forem negativos, retorna a soma dos módulos e True.
+        constant, positive, negative = 0.0, [], []
+        for term in terms:
+            if term.is_number:
+                constant += float(term)
+                continue
+            coeff, rest = term.as_coeff_Mul()
+            if coeff.is_negative:
+                negative.append(self.lower(-coeff * rest))
+            else:
+                positive.append(self.lower(term))
+        if not positive and not negative:
+            return constant, False
+        if positive:
+            result = self.chain(np.add, positive)
+            for operand in negative:
+                result = self.emit(np.subtract, result, operand)
+            if constant:
+                result = self.emit(np.add, result, constant)
+            return result, False
+        result = self.chain(np.add, negative)
+        if constant:
+            return self.emit(np.subtract, constant, result), False
+        return result, True
+
+    def _mul(self, expr) -> Union[int, float]:
+        # Como em _add: os fatores de uma mesma variável são multiplicados primeiro.
+        coeff, factors = expr.as_coeff_mul()
+        result = None
+        for _, group in self.group_by_variables(factors, self.symbol_list):
+            part = self._product(group, coeff if result is None else 1)
+            result = part if result is None else self.emit(np.multiply, result, part)
+        return result
+
+    def _product(self, factors, coeff) -> Union[int, float]:
+        numerator, denominator = [], []
+        for factor in factors:
+            if factor.is_Pow and factor.exp.is_number and factor.exp.is_negative:
+                denominator.append(self.lower(self.sp.Pow(factor.base, -factor.exp)))
+            else:
+                numerator.append(self.lower(factor))
+        coeff = float(coeff)
+        if numerator:
+            result = self.chain(np.multiply, numerator)
+            if coeff == -1.0:
+                result = self.emit(np.negative, result)
+            elif coeff != 1.0:
+                result = self.emit(np.multiply, result, coeff)
+        else:
+            result = coeff
+        if denominator:
+            result = self.emit(np.divide, result, self.chain(np.multiply, denominator))
+        return result
+
+    def _pow(self, base, exponent) -> Union[int, float]:
+        sp = self.sp
+        if base == sp.E:
+            return self.emit(np.exp, self.lower(exponent))
+        if not exponent.is_number:
+            return self.emit(np.power, self.lower(base), self.lower(exponent))
+        if exponent.is_negative:
+            return self.emit(np.divide, 1.0, self._pow(base, -exponent))
+        if exponent.is_Integer and exponent <= _MAX_INTEGER_POWER:
+            return self._integer_pow(base, int(exponent))
+        b = self.lower(base)
+        if exponent == sp.Rational(1, 2):
+            return self.emit(np.sqrt, b)
+        return self.emit(np.power, b, float(exponent))
+
+    def _integer_pow(self, base, n: int) -> int:
+        # Quadrados sucessivos: x**6 = (x**3)**2 e x**3 = x**2 * x, bem mais barato que np.power com
+        # expoente float. As potências intermediárias passam pelo memo e são compartilhadas (x**2
+        # calculado uma vez serve a x**4 e a x**6).
+        sp = self.sp
+        if n % 2 == 0:
+            return self.emit(np.square, self.lower(sp.Pow(base, n // 2)))
+        return self.emit(np.multiply, self.lower(sp.Pow(base, n - 1)), self.lower(base))
+
+
+class BufferArena:
+    """
+    Buffers reaproveitados entre chamadas, um conjunto por formato das entradas.
+
+    Args:
+        max_plans (int, optional): Número de formatos de entrada guardados (descarte LRU).
+    """
+
+    def __init__(self, max_plans: int = 4):
+        self.max_plans = max_plans
+        self._buffers: 'OrderedDict[tuple, List[np.ndarray]]' = OrderedDict()
+        self.allocations = 0
+
+    def get(self, key: tuple, shapes: Sequence[Tuple[int, ...]], dtype: type) -> List[np.ndarray]:
+        """Retorna os buffers do plano key, alocando-os (np.empty) na primeira vez."""
+        buffers = self._buffers.get(key)
+        if buffers is None:
+            buffers = [np.empty(shape, dtype=dtype) for shape in shapes]
+            self.allocations += len(buffers)
+            self._buffers[key] = buffers
+            while len(self._buffers) > self.max_plans:
+                self._buffers.popitem(last=False)
+        self._buffers.move_to_end(key)
+        return buffers
+
+    def nbytes(self) -> int:
+        """Memória ocupada pelos buffers guardados."""
+        return sum(b.nbytes for buffers in self._buffers.values() for b in buffers)
+
+    def clear(self) -> None:
+        self._buffers.clear()
+
+
+class _Plan(NamedTuple):
+    # slot[r]: buffer de cada registrador temporário (None para argumentos e para o resultado).
+    key: tuple
+    slots: List[int]
+    shapes: List[Tuple[int, ...]]
+    input_slots: List[int]
+    out_shape: Tuple[int, ...]
+
+
+class UfuncProgram:
+    """
+    Programa de ufuncs equivalente a uma expressão, chamado como a função do lambdify: f(X, Y).
+
+    Args:
+        instructions (List[Instruction]): Instruções em ordem de execução.
+        result (int | float): Registrador (ou constante) com o resultado.
+        n_args (int): Número de argumentos.
+        dtype (type, optional): Tipo de toda a conta (np.float64 ou np.float32).
+
+    Attributes:
+        arena (BufferArena): Buffers reaproveitados entre chamadas.
+    """
+
+    def __init__(self, instructions: List[Instruction], result: Union[int, float], n_args: int,
+                 dtype: type = np.float64):
+        self.instructions = instructions
+        self.result = result
+        self.n_args = n_args
+        self.dtype = np.dtype(dtype).type
+        self.arena = BufferArena()
+        self._plans: Dict[tuple, _Plan] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.instructions)
+
+    def _plan(self, arg_shapes: Tuple[Tuple[int, ...], ...], cast: Tuple[bool, ...]) -> _Plan:
+        key = (arg_shapes, cast)
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        shapes: Dict[int, Tuple[int, ...]] = dict(enumerate(arg_shapes))
+        last_use: Dict[int, int] = {}
+        for index, ins in enumerate(self.instructions):
+            shapes[ins.output] = np.broadcast_shapes(*[shapes[i] for i in ins.inputs if isinstance(i, int)])
+            for operand in ins.inputs:
+                if isinstance(operand, int):
+                    last_use[operand] = index
+
+        # Varredura linear: o buffer de um registrador volta para a lista de livres depois do seu
+        # último uso, antes de escolher o buffer da saída (a ufunc pode escrever sobre a entrada).
+        slot_shapes: List[Tuple[int, ...]] = []
+        free: Dict[Tuple[int, ...], List[int]] = {}
+        slots = [None] * (self.n_args + len(self.instructions))
+        input_slots = []
+        for r in range(self.n_args):
+            if cast[r]:
+                slots[r] = len(slot_shapes)
+                slot_shapes.append(arg_shapes[r])
+            input_slots.append(slots[r])
+        for index, ins in enumerate(self.instructions):
+            for operand in set(i for i in ins.inputs if isinstance(i, int)):
+                if last_use[operand] == index and slots[operand] is not None:
+                    free.setdefault(shapes[operand], []).append(slots[operand])
+            if ins.output == self.result:
+                continue
+            pool = free.get(shapes[ins.output])
+            if pool:
+                slots[ins.output] = pool.pop()
+            else:
+                slots[ins.output] = len(slot_shapes)
+                slot_shapes.append(shapes[ins.output])
+        out_shape = shapes[self.result] if isinstance(self.result, int) else np.broadcast_shapes(*arg_shapes)
+        plan = _Plan(key, slots, slot_shapes, input_slots, out_shape)
+        self._plans[key] = plan
+        return plan
+
+    def __call__(self, *values, out: np.ndarray = None) -> np.ndarray:
+        """
+        Avalia o programa.
+
+        Args:
+            *values: Argumentos (arrays ou números), na ordem de args.
+            out (np.ndarray, optional): Array de saída do formato do resultado; se None, um array novo é criado.
+
+        Returns:
+            np.ndarray: Resultado, no dtype do programa.
+        """
+        if len(values) != self.n_args:
+            raise TypeError(f"O programa espera {self.n_args} argumentos, recebeu {len(values)}.")
+        arrays = [np.asarray(v) for v in values]
+        cast = tuple(a.dtype != self.dtype for a in arrays)
+        with self._lock:
+            plan = self._plan(tuple(a.shape for a in arrays), cast)
+            buffers = self.arena.get(plan.key, plan.shapes, self.dtype)
+            if out is None:
+                out = np.empty(plan.out_shape, dtype=self.dtype)
+            registers: List[np.ndarray] = [None] * len(plan.slots)
+            for r, array in enumerate(arrays):
+                if plan.input_slots[r] is None:
+                    registers[r] = array
+                else:
+                    registers[r] = buffers[plan.input_slots[r]]
+                    np.copyto(registers[r], array, casting='unsafe')
+            for ins in self.instructions:
+                target = out if ins.output == self.result else buffers[plan.slots[ins.output]]
+                operands = [registers[i] if isinstance(i, int) else self.dtype(i) for i in ins.inputs]
+                ins.ufunc(*operands, out=target)
+                registers[ins.output] = target
+            if not isinstance(self.result, int):
+                out[...] = self.result
+            elif self.result < self.n_args:
+                np.copyto(out, registers[self.result], casting='unsafe')
+        return out
+
+
+def compile_program(expr: 'sp.Expr', args: Sequence[str] = ('x', 'y'), dtype: type = np.float64) -> UfuncProgram:
+    """
+    Converte a expressão num programa de ufuncs.
+
+    Args:
+        expr (sp.Expr): Expressão simbólica.
+        args (Sequence[str], optional): Nomes dos argumentos.
+        dtype (type, optional): np.float64 ou np.float32.
+
+    Returns:
+        UfuncProgram: Programa equivalente à expressão.
+
+    Raises:
+        NotImplementedError: Se a expressão tiver operações sem ufunc equivalente.
+    """
+    lowering = _Lowering(args)
+    result = lowering.lower(expr)
+    return UfuncProgram(lowering.instructions, result, len(args), dtype)
+
+
+_programs: 'OrderedDict[tuple, Callable]' = OrderedDict()
+_programs_lock = threading.Lock()
+_MAX_PROGRAMS = 16
+
+
+def program_function(compiled: CompiledExpression, dtype: type = np.float64) -> Callable[..., np.ndarray]:
+    """
+    Programa de ufuncs de uma expressão compilada, guardado para que chamadas repetidas usem a mesma arena.
+
+    Se a expressão não puder virar um programa de ufuncs, retorna a função do lambdify, com o
+    resultado convertido para dtype.
+
+    Args:
+        compiled (CompiledExpression): Expressão compilada por glc.cache.
+        dtype (type, optional): np.float64 ou np.float32.
+
+    Returns:
+        Callable[..., np.ndarray]: Função com os mesmos argumentos da função do lambdify.
+    """
+    key = (compiled.key, np.dtype(dtype).str)
+    with _programs_lock:
+        program = _programs.get(key)
+        if program is not None:
+            _programs.move_to_end(key)
+            return program
+    try:
+        program = compile_program(compiled.expr, compiled.args, dtype)
+    except NotImplementedError:
+        func = compiled.func
+
+        def fallback(*values):
+            return np.asarray(func(*values), dtype=dtype)
+        program = fallback
+    # Os resultados do programa diferem dos do lambdify no arredondamento: chave própria no cache de resultados.
+    program.cache_key = f"{compiled.key}:ufunc:{np.dtype(dtype).str}"
+    program.compiled = compiled
+    with _programs_lock:
+        _programs[key] = program
+        while len(_programs) > _MAX_PROGRAMS:
+            _programs.popitem(last=False)
+    return program
+
+
+def compile_program_function(func_str: str, fixed_vars: Dict[str, float] = None,
+                             dtype: type = np.float64) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+    """
+    Como glc.cache.compile_function(...).func, mas com o programa de ufuncs.
+
+    Args:
+        func_str (str): String da função que o usuário insere.
+        fixed_vars (Dict[str, float], optional): Variáveis a serem fixadas com seus respectivos valores.
+        dtype (type, optional): np.float64 ou np.float32.
+    """
+    return program_function(compile_function(func_str, fixed_vars), dtype)
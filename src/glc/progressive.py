@@ -0,0 +1,222 @@
+import queue
+import threading
+from typing import Callable, Sequence, Tuple
+
+import numpy as np
+
+from glc.profiling import stage
+
+"""
+Desenho progressivo: uma prévia grosseira em seguida e a malha refinada em segundo plano.
+
+plot_contour e plot_surface_and_contour só mostram a janela depois da avaliação completa da malha
+400x400 e do plt.contour; com expressões caras, ou resoluções maiores, a janela fica em branco por
+segundos. Com progressive=True (--progressive na linha de comando), a primeira malha tem só
+MIN_RESOLUTION pontos por eixo e é desenhada antes de a janela abrir; uma thread avalia as malhas
+seguintes, dobrando a resolução até a pedida, e um timer do matplotlib troca as curvas e a
+superfície nos mesmos eixos a cada malha pronta. Só a thread principal mexe nos artistas.
+
+Cada refinamento tem uma geração. Mudar a vista (zoom ou pan nos eixos do contorno) ou as entradas
+(restart com outra função ou outros intervalos) começa uma geração nova: a thread da anterior é
+avisada e para no próximo bloco de linhas (a malha é avaliada em blocos justamente para isso), e
+os resultados atrasados de gerações antigas são descartados.
+"""
+
+# Pontos por eixo da prévia.
+MIN_RESOLUTION = 50
+
+# Linhas por bloco: entre dois blocos, a thread confere se o refinamento foi cancelado.
+_BAND_POINTS = 2 ** 16
+
+# Intervalo, em ms, com que o timer recolhe as malhas prontas.
+_POLL_INTERVAL = 50
+
+
+def progressive_resolutions(resolution: int, min_resolution: int = MIN_RESOLUTION) -> Tuple[int, ...]:
+    """
+    Resoluções do refinamento: a pedida, dividida por 2 até min_resolution, em ordem crescente.
+
+    Ex.: 400 -> (50, 100, 200, 400).
+    """
+    steps = [int(resolution)]
+    while steps[-1] // 2 >= min_resolution:
+        steps.append(steps[-1] // 2)
+    return tuple(reversed(steps))
+
+
+def _evaluate(f: Callable[[np.ndarray, np.ndarray], np.ndarray], x: np.ndarray, y: np.ndarray,
+              cancel: threading.Event = None) -> np.ma.MaskedArray:
+    # Como contour_grid sem a poda: pontos fora do domínio mascarados e sem avisos do NumPy. Retorna
+    # None se cancel for acionado no meio.
+    Z = np.empty((y.size, x.size), dtype=np.result_type(x.dtype, np.float32))
+    rows = max(1, _BAND_POINTS // max(1, x.size))
+    with np.errstate(all='ignore'):
+        for start in range(0, y.size, rows):
+            if cancel is not None and cancel.is_set():
+                return None
+            Z[start:start + rows] = f(x[None, :], y[start:start + rows, None])
+    return np.ma.masked_invalid(Z)
+
+
+class ProgressiveRenderer:
+    """
+    Refina uma figura do matplotlib em segundo plano, da prévia grosseira até a resolução final.
+
+    Args:
+        fig (Figure): Figura desenhada.
+        draw (Callable): draw(x, y, Z) desenha a malha (eixos 1-D e matriz mascarada), trocando os
+            artistas da malha anterior. É sempre chamada na thread principal.
+        f (Callable): Função que aceita dois argumentos (x, y) e retorna um valor.
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        resolution (int, optional): Pontos por eixo da malha final.
+        dtype (type, optional): Tipo dos eixos da malha.
+        watch (Sequence, optional): Eixos 2-D cujos limites são a vista: um zoom ou pan neles refina de
+            novo nos novos intervalos.
+
+    Attributes:
+        resolution (int): Pontos por eixo da última malha desenhada (0 antes da primeira).
+    """
+
+    def __init__(self, fig, draw: Callable[[np.ndarray, np.ndarray, np.ma.MaskedArray], None],
+                 f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                 x_range: Tuple[float, float], y_range: Tuple[float, float],
+                 resolution: int = 400, dtype: type = np.float64, watch: Sequence = ()):
+        self.fig = fig
+        self._draw = draw
+        self._f = f
+        self._x_range = tuple(x_range)
+        self._y_range = tuple(y_range)
+        self._dtype = dtype
+        self.resolutions = progressive_resolutions(resolution)
+        self.resolution = 0
+        self._generation = 0
+        self._cancel = threading.Event()
+        self._thread = None
+        self._results = queue.Queue()
+        self._timer = fig.canvas.new_timer(interval=_POLL_INTERVAL)
+        self._timer.add_callback(self._poll)
+        self._watch = list(watch)
+        self._view = None
+        self._drawing = False
+        for ax in self._watch:
+            ax.callbacks.connect('xlim_changed', self._on_view)
+            ax.callbacks.connect('ylim_changed', self._on_view)
+
+    @property
+    def done(self) -> bool:
+        """Indica se a malha final da geração atual já foi desenhada."""
+        return self.resolution == self.resolutions[-1]
+
+    def _axes(self, resolution: int) -> Tuple[np.ndarray, np.ndarray]:
+        x = np.linspace(self._x_range[0], self._x_range[1], resolution, dtype=self._dtype)
+        y = np.linspace(self._y_range[0], self._y_range[1], resolution, dtype=self._dtype)
+        return x, y
+
+    def _views(self):
+        return [(ax.get_xlim(), ax.get_ylim()) for ax in self._watch]
+
+    def start(self) -> None:
+        """Desenha a prévia (na thread chamadora) e começa o refinamento em segundo plano."""
+        x, y = self._axes(self.resolutions[0])
+        with stage('progressive_preview', resolution=self.resolutions[0]):
+            self._show(x, y, _evaluate(self._f, x, y), self.resolutions[0])
+        # A vista de referência é a do primeiro desenho, já com o autoscale aplicado.
+        self._view = self._views()
+        self._spawn(self.resolutions[1:])
+
+    def restart(self, f: Callable[[np.ndarray, np.ndarray], np.ndarray] = None,
+                x_range: Tuple[float, float] = None, y_range: Tuple[float, float] = None) -> None:
+        """
+        Cancela o refinamento em andamento e recomeça da prévia com a nova função ou os novos intervalos.
+
+        Args:
+            f (Callable, optional): Nova função. Se None, mantém a atual.
+            x_range (Tuple, optional): Novo intervalo x. Se None, mantém o atual.
+            y_range (Tuple, optional): Novo intervalo y. Se None, mantém o atual.
+        """
+        self._f = f or self._f
+        self._x_range = tuple(x_range or self._x_range)
+        self._y_range = tuple(y_range or self._y_range)
+        self.resolution = 0
+        self._spawn(self.resolutions)
+
+    def cancel(self) -> None:
+        """Cancela o refinamento em andamento; a última malha desenhada fica na figura."""
+        self._cancel.set()
+        self._timer.stop()
+
+    def finish(self, timeout: float = None) -> None:
+        """
+        Espera o refinamento da geração atual terminar e desenha a malha final (na thread chamadora).
+
+        Usado depois do plt.show(), para gravar a figura, e com backends sem janela, em que o timer não roda.
+        """
+        self._timer.stop()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._poll()
+
+    def _spawn(self, resolutions: Sequence[int]) -> None:
+        # Cada geração tem o seu Event: a thread antiga vê o dela acionado, mesmo que outra já tenha começado.
+        self._cancel.set()
+        self._generation += 1
+        self._cancel = threading.Event()
+        if not resolutions:
+            return
+        self._thread = threading.Thread(target=self._refine,
+                                        args=(self._generation, self._cancel, self._f, self._x_range,
+                                              self._y_range, tuple(resolutions)),
+                                        name='glc-progressive', daemon=True)
+        self._thread.start()
+        self._timer.start()
+
+    def _refine(self, generation: int, cancel: threading.Event, f, x_range, y_range, resolutions) -> None:
+        for resolution in resolutions:
+            x = np.linspace(x_range[0], x_range[1], resolution, dtype=self._dtype)
+            y = np.linspace(y_range[0], y_range[1], resolution, dtype=self._dtype)
+            with stage('progressive_refine', resolution=resolution):
+                Z = _evaluate(f, x, y, cancel)
+            if Z is None:
+                return
+            self._results.put((generation, resolution, x, y, Z))
+
+    def _poll(self) -> None:
+        # Só a malha mais fina da geração atual é desenhada; as intermediárias que chegaram juntas e as
+        # de gerações antigas são descartadas.
+        latest = None
+        while True:
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == self._generation and (latest is None or item[1] > latest[1]):
+                latest = item
+        if latest is not None and latest[1] > self.resolution:
+            _, resolution, x, y, Z = latest
+            with stage('progressive_draw', resolution=resolution):
+                self._show(x, y, Z, resolution)
+            self.fig.canvas.draw_idle()
+        if self.done:
+            self._timer.stop()
+
+    def _show(self, x: np.ndarray, y: np.ndarray, Z: np.ma.MaskedArray, resolution: int) -> None:
+        # Um redesenho que reajusta os limites (autoscale) não conta como mudança de vista.
+        self._drawing = True
+        try:
+            self._draw(x, y, Z)
+        finally:
+            self._drawing = False
+        self.resolution = resolution
+        if self._view is not None:
+            self._view = self._views()
+
+    def _on_view(self, ax) -> None:
+        if self._view is None or self._drawing:
+            return
+        views = self._views()
+        if np.allclose(np.ravel(views), np.ravel(self._view)):
+            return
+        self._view = views
+        xlim, ylim = views[self._watch.index(ax)]
+        self.restart(x_range=xlim, y_range=ylim)
@@ -0,0 +1,256 @@
+from typing import Callable, NamedTuple, Tuple
+
+import numpy as np
+
+"""
+Integração numérica dupla vetorizada.
+
+O dblquad do SciPy chama a função do lambdify um ponto de cada vez, a partir do Python, o que
+leva segundos para funções oscilatórias. Aqui há duas alternativas:
+
+- grid_integral: Simpson/Romberg em produto tensorial sobre a malha Z que já está em memória,
+  sem nenhuma avaliação nova de f;
+- gauss_legendre: Gauss-Legendre em produto tensorial, com todos os nós de todos os painéis
+  avaliados numa única chamada vetorizada por rodada e refinamento adaptativo só nos painéis
+  em que a estimativa de erro ainda é grande.
+
+integrate_2d combina as duas: usa a malha quando a estimativa de erro dela é suficiente e
+recorre ao Gauss-Legendre adaptativo caso contrário.
+"""
+
+
+class QuadratureResult(NamedTuple):
+    """
+    Resultado de uma integração.
+
+    Attributes:
+        value (float): Valor estimado da integral.
+        error (float): Estimativa do erro absoluto.
+        n_evals (int): Número de avaliações novas de f.
+        method (str): Método usado ('romberg', 'simpson' ou 'gauss-legendre').
+    """
+    value: float
+    error: float
+    n_evals: int
+    method: str
+
+
+def _simpson_weights(n: int, h: float) -> np.ndarray:
+    # Pesos da regra de Simpson composta para n pontos igualmente espaçados. Com um número ímpar
+    # de intervalos, os três últimos usam a regra 3/8 de Simpson.
+    intervals = n - 1
+    w = np.zeros(n)
+    if intervals == 1:
+        w[:] = h / 2
+        return w
+    even = intervals if intervals % 2 == 0 else intervals - 3
+    if even:
+        w[0:even + 1:2] += 2 * h / 3
+        w[1:even:2] += 4 * h / 3
+        w[0] -= h / 3
+        w[even] -= h / 3
+    if even != intervals:
+        w[even:] += np.array([1, 3, 3, 1]) * 3 * h / 8
+    return w
+
+
+def _trapezoid_weights(n: int, h: float) -> np.ndarray:
+    w = np.full(n, h)
+    w[0] = w[-1] = h / 2
+    return w
+
+
+def _spacing(values: np.ndarray) -> float:
+    h = (values[-1] - values[0]) / (values.size - 1)
+    if not np.allclose(np.diff(values), h, rtol=1e-6, atol=1e-12 * max(abs(h), 1.0)):
+        raise ValueError("A integração na malha exige pontos igualmente espaçados.")
+    return h
+
+
+def _simpson_pair(n: int, h: float):
+    # Pesos de Simpson e uma regra alternativa para estimar o erro, com o fator de escala do erro:
+    # a mesma regra com passo 2h (erro ~ diferença / 15) quando o número de intervalos é par, ou
+    # a regra espelhada (3/8 no início em vez do fim) quando é ímpar.
+    w = _simpson_weights(n, h)
+    if (n - 1) % 2 == 0 and n >= 5:
+        alt = np.zeros(n)
+        alt[::2] = _simpson_weights((n - 1) // 2 + 1, 2 * h)
+        return w, alt, 1 / 15
+    if n >= 4:
+        return w, w[::-1].copy(), 1.0
+    return w, _trapezoid_weights(n, h), 1.0
+
+
+def _romberg_levels(n: int) -> int:
+    # Quantas regras do trapézio (passos h, 2h, 4h, ...) cabem exatamente em n pontos.
+    levels, intervals = 1, n - 1
+    while intervals % 2 == 0 and intervals >= 2:
+        levels += 1
+        intervals //= 2
+    return levels
+
+
+def grid_integral(x: np.ndarray, y: np.ndarray, Z: np.ndarray, method: str = 'romberg') -> QuadratureResult:
+    """
+    Integra uma malha já avaliada por Simpson ou Romberg em produto tensorial.
+
+    Romberg aplica a extrapolação de Richardson às regras do trapézio com passos h, 2h, 4h, ...
+    e exige que o número de intervalos dos dois eixos seja múltiplo de 4 (por exemplo, 401 pontos);
+    caso contrário é usado Simpson. O erro de Romberg é a diferença entre os dois últimos termos
+    da diagonal; o de Simpson compara a malha com a malha de passo 2 (ou com a regra espelhada).
+
+    Args:
+        x (np.ndarray): Eixo x (1-D, igualmente espaçado).
+        y (np.ndarray): Eixo y (1-D, igualmente espaçado).
+        Z (np.ndarray): Valores da função (len(y), len(x)).
+        method (str, optional): 'romberg' ou 'simpson'.
+
+    Returns:
+        QuadratureResult: Valor, erro estimado e número de avaliações (zero).
+    """
+    if method not in ('romberg', 'simpson'):
+        raise ValueError("method deve ser 'romberg' ou 'simpson'.")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    Z = np.asarray(Z, dtype=float)
+    if Z.shape != (y.size, x.size) or x.size < 2 or y.size < 2:
+        raise ValueError("As dimensões de x, y e Z não são compatíveis.")
+    hx, hy = _spacing(x), _spacing(y)
+
+    levels = min(_romberg_levels(x.size), _romberg_levels(y.size))
+    if method == 'romberg' and levels >= 3:
+        # R[k][0]: trapézio com passo h * 2**(levels - 1 - k), do mais grosso para o mais fino.
+        R = []
+        for k in range(levels):
+            step = 2 ** (levels - 1 - k)
+            sub = Z[::step, ::step]
+            row = [_trapezoid_weights(sub.shape[0], hy * step) @ sub @ _trapezoid_weights(sub.shape[1], hx * step)]
+            for j in range(1, k + 1):
+                row.append(row[j - 1] + (row[j - 1] - R[k - 1][j - 1]) / (4 ** j - 1))
+            R.append(row)
+        value = R[-1][-1]
+        return QuadratureResult(float(value), float(abs(value - R[-2][-1])), 0, 'romberg')
+
+    wx, alt_x, scale_x = _simpson_pair(x.size, hx)
+    wy, alt_y, scale_y = _simpson_pair(y.size, hy)
+    Zwx = Z @ wx
+    value = wy @ Zwx
+    error = abs(value - wy @ Z @ alt_x) * scale_x + abs(value - alt_y @ Zwx) * scale_y
+    return QuadratureResult(float(value), float(error), 0, 'simpson')
+
+
+def gauss_legendre(f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                   x_range: Tuple[float, float],
+                   y_range: Tuple[float, float],
+                   order: int = 8,
+                   panels: int = 4,
+                   abs_tol: float = 1e-8,
+                   rel_tol: float = 1e-8,
+                   max_rounds: int = 8,
+                   max_evals: int = 4_000_000) -> QuadratureResult:
+    """
+    Integra f em [x0, x1] x [y0, y1] por Gauss-Legendre adaptativo em produto tensorial.
+
+    O domínio começa dividido em panels x panels painéis. Em cada rodada, os quatro filhos de
+    todos os painéis ativos são avaliados numa única chamada de f; um painel cuja integral difere
+    da soma dos filhos por mais que a sua parte da tolerância é substituído pelos filhos.
+
+    Args:
+        f (Callable): Função vetorizada f(x, y).
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        order (int, optional): Número de nós de Gauss por eixo em cada painel.
+        panels (int, optional): Número inicial de painéis por eixo.
+        abs_tol (float, optional): Tolerância absoluta.
+        rel_tol (float, optional): Tolerância relativa.
+        max_rounds (int, optional): Número máximo de rodadas de refinamento.
+        max_evals (int, optional): Limite de avaliações de f.
+
+    Returns:
+        QuadratureResult: Valor, erro estimado e número de avaliações.
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    nodes = (nodes + 1) / 2
+    weights = weights / 2
+    n_evals = 0
+
+    def panel_integrals(x0, x1, y0, y1):
+        nonlocal n_evals
+        dx = (x1 - x0)[:, None, None]
+        dy = (y1 - y0)[:, None, None]
+        px = x0[:, None, None] + dx * nodes[None, None, :]
+        py = y0[:, None, None] + dy * nodes[None, :, None]
+        with np.errstate(all='ignore'):
+            values = np.broadcast_to(np.asarray(f(px, py), dtype=float), (x0.size, order, order))
+        n_evals += values.size
+        return np.einsum('pij,i,j->p', values, weights, weights) * (dx * dy)[:, 0, 0]
+
+    def children(x0, x1, y0, y1):
+        xm, ym = (x0 + x1) / 2, (y0 + y1) / 2
+        return (np.concatenate([x0, xm, x0, xm]), np.concatenate([xm, x1, xm, x1]),
+                np.concatenate([y0, y0, ym, ym]), np.concatenate([ym, ym, y1, y1]))
+
+    edges_x = np.linspace(x_range[0], x_range[1], panels + 1)
+    edges_y = np.linspace(y_range[0], y_range[1], panels + 1)
+    gx0, gy0 = np.meshgrid(edges_x[:-1], edges_y[:-1])
+    gx1, gy1 = np.meshgrid(edges_x[1:], edges_y[1:])
+    active = (gx0.ravel(), gx1.ravel(), gy0.ravel(), gy1.ravel())
+    coarse = panel_integrals(*active)
+    total_area = abs((x_range[1] - x_range[0]) * (y_range[1] - y_range[0])) or 1.0
+
+    done_value = 0.0
+    done_error = 0.0
+    for round_ in range(max_rounds):
+        kids = children(*active)
+        fine = panel_integrals(*kids)
+        n = active[0].size
+        fine_sum = fine[:n] + fine[n:2 * n] + fine[2 * n:3 * n] + fine[3 * n:]
+        error = np.abs(fine_sum - coarse)
+        estimate = done_value + fine_sum.sum()
+        tol = max(abs_tol, rel_tol * abs(estimate))
+        area = np.abs((active[1] - active[0]) * (active[3] - active[2]))
+        converged = error <= tol * area / total_area
+        last = round_ == max_rounds - 1 or n_evals + 4 * 4 * (~converged).sum() * order ** 2 > max_evals
+        if last:
+            converged[:] = True
+        done_value += fine_sum[converged].sum()
+        done_error += error[converged].sum()
+        if converged.all():
+            break
+        refine = np.tile(~converged, 4)
+        active = tuple(a[refine] for a in kids)
+        coarse = fine[refine]
+
+    return QuadratureResult(float(done_value), float(done_error), n_evals, 'gauss-legendre')
+
+
+def integrate_2d(f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                 x_range: Tuple[float, float],
+                 y_range: Tuple[float, float],
+                 grid: Tuple[np.ndarray, np.ndarray, np.ndarray] = None,
+                 abs_tol: float = 1e-6,
+                 rel_tol: float = 1e-6) -> QuadratureResult:
+    """
+    Integral dupla de f, reaproveitando a malha já avaliada quando ela for precisa o bastante.
+
+    Args:
+        f (Callable): Função vetorizada f(x, y).
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        grid (Tuple, optional): Eixos x, y e a malha Z já avaliada sobre todo o domínio.
+        abs_tol (float, optional): Tolerância absoluta.
+        rel_tol (float, optional): Tolerância relativa.
+
+    Returns:
+        QuadratureResult: Valor, erro estimado, avaliações novas de f e o método usado.
+    """
+    if grid is not None:
+        x, y, Z = grid
+        try:
+            result = grid_integral(x, y, Z)
+        except ValueError:
+            result = None
+        if result is not None and np.isfinite(result.value) and \
+                result.error <= max(abs_tol, rel_tol * abs(result.value)):
+            return result
+    return gauss_legendre(f, x_range, y_range, abs_tol=abs_tol, rel_tol=rel_tol)
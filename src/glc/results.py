@@ -0,0 +1,340 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+"""
+Cache em disco dos resultados já calculados: malhas, derivadas parciais, malhas de superfícies de nível,
+tiles com as curvas de nível e análises simbólicas.
+
+Rodar de novo o LC-2D.py, o surface3D.py ou o intsurf3D.py com a mesma função, as mesmas variáveis
+fixadas, os mesmos intervalos, a mesma resolução e os mesmos níveis refaz toda a conta. Aqui cada
+resultado é gravado com o hash canônico das entradas como nome de arquivo (endereçamento pelo
+conteúdo): a função entra pela chave da expressão compilada (glc.cache, que já é canônica: 'x+y' e
+'y + x' dão a mesma chave) e os eixos pelo hash dos seus valores.
+
+Formatos: uma matriz vira um .npy, lido de volta com np.load(..., mmap_mode='r') (só as páginas
+usadas são lidas do disco); várias matrizes viram um .npz; resultados simbólicos e tiles viram JSON.
+
+Vários processos podem usar o mesmo diretório: cada arquivo é gravado num temporário e trocado de
+uma vez com os.replace, de modo que um leitor vê o arquivo inteiro ou nenhum; um arquivo ilegível
+conta como ausente. Quando o diretório passa do tamanho máximo, os arquivos usados há mais tempo
+(a data de modificação é atualizada a cada leitura) são apagados; um arquivo apagado enquanto outro
+processo o tem mapeado continua válido para esse processo.
+
+O cache é desligado por padrão. Para ligá-lo, defina GLC_RESULT_CACHE_DIR (glc-contour, glc-surface,
+glc-interactive e glc-analyze usam ~/.cache/glc/results; glc-batch tem a opção --result-cache) e,
+opcionalmente, GLC_RESULT_CACHE_SIZE com o tamanho máximo em MB.
+"""
+
+RESULT_CACHE_DIR_ENV = 'GLC_RESULT_CACHE_DIR'
+RESULT_CACHE_SIZE_ENV = 'GLC_RESULT_CACHE_SIZE'
+
+DEFAULT_MAX_BYTES = 1024 * 2 ** 20
+
+_FORMAT_VERSION = 1
+_EXTENSIONS = ('.npy', '.npz', '.json')
+
+# Temporários mais antigos que isso são de um processo que morreu no meio da gravação.
+_STALE_TMP_SECONDS = 3600
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return array_digest(value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, type):
+        return np.dtype(value).str
+    return value
+
+
+def array_digest(array: np.ndarray) -> str:
+    """Hash do formato, do tipo e dos valores de um array (usado para identificar eixos e níveis)."""
+    array = np.ascontiguousarray(array)
+    digest = hashlib.sha256(f"{array.dtype.str}{array.shape}".encode('utf-8'))
+    digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def result_key(kind: str, **params: Any) -> str:
+    """
+    Calcula a chave canônica de um resultado.
+
+    Args:
+        kind (str): Tipo do resultado ('grid', 'gradient', 'isosurface', ...).
+        **params: Entradas do cálculo. Arrays entram pelo hash dos valores; tuplas e listas são equivalentes.
+
+    Returns:
+        str: Hash hexadecimal das entradas.
+    """
+    payload = [_FORMAT_VERSION, kind, _canonical(params)]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def function_key(f: Any) -> Optional[str]:
+    """
+    Chave da expressão de uma função compilada pelo glc (atributo cache_key), ou None.
+
+    Funções sem chave (escritas à mão, por exemplo) não passam pelo cache de resultados.
+    """
+    return getattr(f, 'cache_key', None)
+
+
+class ResultCache:
+    """
+    Cache de resultados em disco, endereçado pelo conteúdo, com descarte dos menos usados.
+
+    Args:
+        cache_dir (str): Diretório dos arquivos.
+        max_bytes (int, optional): Tamanho máximo do diretório; ao passar dele, os arquivos usados há
+            mais tempo são apagados.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 1:
+            raise ValueError("O tamanho do cache de resultados deve ser positivo.")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.cache_dir, key + extension)
+
+    def _hit(self, path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+
+    def _miss(self, path: str = None) -> None:
+        # Um arquivo que existe mas não pôde ser lido (gravado por outra versão, disco cheio...) é apagado.
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self.misses += 1
+
+    def _write(self, path: str, write: Callable[[Any], None], mode: str = 'wb') -> None:
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, mode) as fh:
+                write(fh)
+            os.replace(tmp, path)
+        except OSError:
+            # No Windows, os.replace falha se outro processo tiver o arquivo mapeado: o resultado
+            # simplesmente não é gravado desta vez.
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def get_array(self, key: str) -> Optional[np.ndarray]:
+        """Matriz gravada com put_array, mapeada em memória (somente leitura), ou None."""
+        path = self._path(key, '.npy')
+        if not os.path.exists(path):
+            self._miss()
+            return None
+        try:
+            array = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            self._miss(path)
+            return None
+        self._hit(path)
+        return array
+
+    def put_array(self, key: str, array: np.ndarray) -> None:
+        """Grava uma matriz como .npy."""
+        array = np.asarray(array)
+        self._write(self._path(key, '.npy'), lambda fh: np.save(fh, array, allow_pickle=False))
+
+    def get_arrays(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Matrizes gravadas com put_arrays, já carregadas na memória, ou None."""
+        path = self._path(key, '.npz')
+        if not os.path.exists(path):
+            self._miss()
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError):
+            self._miss(path)
+            return None
+        self._hit(path)
+        return arrays
+
+    def put_arrays(self, key: str, arrays: Dict[str, np.ndarray]) -> None:
+        """Grava várias matrizes num .npz (sem compressão)."""
+        arrays = {name: np.asarray(value) for name, value in arrays.items()}
+        self._write(self._path(key, '.npz'), lambda fh: np.savez(fh, **arrays))
+
+    def get_json(self, key: str) -> Any:
+        """Valor gravado com put_json, ou None."""
+        path = self._path(key, '.json')
+        try:
+            with open(path, encoding='utf-8') as fh:
+                value = json.load(fh)
+        except FileNotFoundError:
+            self._miss()
+            return None
+        except (OSError, ValueError):
+            self._miss(path)
+            return None
+        self._hit(path)
+        return value
+
+    def put_json(self, key: str, value: Any) -> None:
+        """Grava um valor serializável em JSON."""
+        self._write(self._path(key, '.json'), lambda fh: json.dump(value, fh), mode='w')
+
+    def size(self) -> int:
+        """Tamanho em bytes dos resultados gravados."""
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        entries = []
+        now = time.time()
+        try:
+            scan = os.scandir(self.cache_dir)
+        except OSError:
+            return entries
+        with scan:
+            for entry in scan:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith('.tmp') and now - stat.st_mtime > _STALE_TMP_SECONDS:
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+                elif entry.name.endswith(_EXTENSIONS):
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self) -> int:
+        """
+        Apaga os resultados usados há mais tempo até o diretório caber em max_bytes.
+
+        Returns:
+            int: Bytes liberados.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Já apagado por outro processo, ou (no Windows) ainda mapeado.
+                continue
+            freed += size
+        return freed
+
+    def clear(self) -> None:
+        """Apaga todos os resultados gravados."""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def info(self) -> Dict[str, int]:
+        """Retorna estatísticas de uso do cache."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'bytes': self.size(), 'max_bytes': self.max_bytes}
+
+
+_default_cache: Optional[ResultCache] = None
+_default_dir: Optional[str] = None
+_default_lock = threading.Lock()
+
+
+def default_result_cache() -> Optional[ResultCache]:
+    """
+    Retorna o cache de resultados do processo, ou None se GLC_RESULT_CACHE_DIR não estiver definida.
+
+    A variável é lida a cada chamada, de modo que um comando pode ligar o cache depois do import.
+    """
+    global _default_cache, _default_dir
+    cache_dir = os.environ.get(RESULT_CACHE_DIR_ENV) or None
+    with _default_lock:
+        if cache_dir != _default_dir:
+            _default_dir = cache_dir
+            _default_cache = None
+            if cache_dir:
+                max_bytes = int(float(os.environ.get(RESULT_CACHE_SIZE_ENV, DEFAULT_MAX_BYTES / 2 ** 20)) * 2 ** 20)
+                try:
+                    _default_cache = ResultCache(cache_dir, max_bytes)
+                except OSError:
+                    _default_cache = None
+        return _default_cache
+
+
+def cached_array(kind: str, compute: Callable[[], np.ndarray], **params: Any) -> np.ndarray:
+    """
+    Retorna a matriz do cache de resultados ou a calcula com compute() e a grava.
+
+    Se o cache estiver desligado, ou algum parâmetro for None (uma função sem chave, por exemplo),
+    apenas chama compute().
+
+    Args:
+        kind (str): Tipo do resultado.
+        compute (Callable[[], np.ndarray]): Cálculo do resultado.
+        **params: Entradas do cálculo (ver result_key).
+    """
+    cache = default_result_cache()
+    if cache is None or any(v is None for v in params.values()):
+        return compute()
+    key = result_key(kind, **params)
+    array = cache.get_array(key)
+    if array is None:
+        array = compute()
+        cache.put_array(key, array)
+    return array
+
+
+def cached_arrays(kind: str, compute: Callable[[], Dict[str, np.ndarray]], **params: Any) -> Dict[str, np.ndarray]:
+    """Como cached_array, para um dicionário de matrizes (gravado como .npz)."""
+    cache = default_result_cache()
+    if cache is None or any(v is None for v in params.values()):
+        return compute()
+    key = result_key(kind, **params)
+    arrays = cache.get_arrays(key)
+    if arrays is None:
+        arrays = compute()
+        cache.put_arrays(key, arrays)
+    return arrays
+
+
+def cached_json(kind: str, compute: Callable[[], Any], **params: Any) -> Any:
+    """Como cached_array, para um valor serializável em JSON."""
+    cache = default_result_cache()
+    if cache is None or any(v is None for v in params.values()):
+        return compute()
+    key = result_key(kind, **params)
+    value = cache.get_json(key)
+    if value is None:
+        value = compute()
+        cache.put_json(key, value)
+    return value
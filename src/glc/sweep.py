@@ -0,0 +1,245 @@
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from glc.cache import CompiledExpression, compile_function
+from glc.functions import normalize_function
+from glc.levels import ValueSketch, select_levels
+from glc.tiled import DEFAULT_MEMORY_BUDGET
+
+"""
+Varredura de parâmetros para animações (como o graph7.gif).
+
+Fixar z=1 no parse_function substitui o valor na expressão antes do lambdify; uma animação com
+100 valores de z exigiria 100 sympify, 100 lambdify e 100 avaliações. Aqui as variáveis da
+varredura continuam livres: a função é compilada uma vez como f(x, y, z) e todos os quadros
+são avaliados numa só chamada, com x, y e z arranjados para broadcasting num array
+(quadros, len(y), len(x)), ou em lotes de quadros quando o array não cabe no orçamento de memória.
+
+render_sweep desenha os quadros numa única figura do matplotlib, trocando só a superfície e as
+curvas de nível de um quadro para o outro.
+"""
+
+# Fator aproximado de temporários criados pela função do lambdify (como em glc.tiled).
+_TEMPORARIES = 8
+
+
+def compile_sweep(func_str: str, params: Sequence[str], fixed_vars: Dict[str, float] = None) -> CompiledExpression:
+    """
+    Compila a função com as variáveis da varredura como argumentos, depois de x e y.
+
+    Args:
+        func_str (str): String da função que o usuário insere.
+        params (Sequence[str]): Nomes das variáveis varridas (ex.: ['z']).
+        fixed_vars (Dict[str, float], optional): Outras variáveis, fixadas com seus valores.
+
+    Returns:
+        CompiledExpression: Função f(x, y, *params).
+    """
+    overlap = set(params) & set(fixed_vars or {})
+    if overlap:
+        raise ValueError(f"As variáveis {sorted(overlap)} não podem ser fixadas e varridas ao mesmo tempo.")
+    try:
+        return compile_function(normalize_function(func_str), fixed_vars, args=('x', 'y', *params))
+    except (ValueError, TypeError) as e:  # SympifyError é um ValueError
+        raise ValueError(f"Erro ao interpretar a função: {e}")
+
+
+def parse_sweep(text: str) -> Tuple[str, np.ndarray]:
+    """
+    Interpreta uma varredura no formato 'z=início:fim:quadros' (ex.: 'z=0:2:50') ou 'z=0.5,1,1.5'.
+
+    Returns:
+        Tuple[str, np.ndarray]: Nome da variável e valores de cada quadro.
+    """
+    var, _, spec = text.partition('=')
+    var, spec = var.strip(), spec.strip()
+    try:
+        if not var or not spec:
+            raise ValueError
+        if ':' in spec:
+            start, stop, count = spec.split(':')
+            return var, np.linspace(float(start), float(stop), int(count))
+        return var, np.array([float(v) for v in spec.split(',')])
+    except ValueError:
+        raise ValueError("Use o formato variável=início:fim:quadros, ex.: z=0:2:50.")
+
+
+def frames_per_batch(n_points: int, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> int:
+    """Número de quadros de n_points pontos avaliados de uma vez dentro do orçamento de memória."""
+    return max(1, memory_budget // (n_points * 8 * _TEMPORARIES))
+
+
+def evaluate_sweep(f, x: np.ndarray, y: np.ndarray, values: Dict[str, np.ndarray],
+                   memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Iterator[np.ndarray]:
+    """
+    Avalia f(x, y, *params) para todos os quadros, em lotes.
+
+    Args:
+        f (Callable): Função compilada por compile_sweep.
+        x (np.ndarray): Eixo x (1-D).
+        y (np.ndarray): Eixo y (1-D).
+        values (Dict[str, np.ndarray]): Valores de cada variável varrida, um por quadro, na ordem dos argumentos de f.
+        memory_budget (int, optional): Memória em bytes usada por lote.
+
+    Yields:
+        np.ndarray: Lotes de quadros com forma (quadros do lote, len(y), len(x)).
+    """
+    columns = [np.asarray(v, dtype=float) for v in values.values()]
+    n_frames = len(columns[0]) if columns else 1
+    if any(len(c) != n_frames for c in columns):
+        raise ValueError("Todas as variáveis varridas devem ter o mesmo número de quadros.")
+    step = frames_per_batch(x.size * y.size, memory_budget)
+    X = x[None, None, :]
+    Y = y[None, :, None]
+    for start in range(0, n_frames, step):
+        params = [c[start:start + step, None, None] for c in columns]
+        count = min(step, n_frames - start)
+        with np.errstate(all='ignore'):
+            batch = f(X, Y, *params)
+        yield np.broadcast_to(np.asarray(batch, dtype=float), (count, y.size, x.size))
+
+
+def sweep_frames(f, x: np.ndarray, y: np.ndarray, values: Dict[str, np.ndarray],
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Iterator[np.ndarray]:
+    """Como evaluate_sweep, mas um quadro (len(y), len(x)) de cada vez."""
+    for batch in evaluate_sweep(f, x, y, values, memory_budget):
+        yield from batch
+
+
+def sweep_sketch(f, x_range: Tuple[float, float], y_range: Tuple[float, float],
+                 values: Dict[str, np.ndarray], coarse: int = 32) -> ValueSketch:
+    """
+    Resume os valores de f em todos os quadros numa malha grossa, um lote de quadros de cada vez.
+
+    Returns:
+        ValueSketch: Resumo mesclado de todos os lotes (ver glc.levels).
+    """
+    x = np.linspace(x_range[0], x_range[1], coarse)
+    y = np.linspace(y_range[0], y_range[1], coarse)
+    sketch = ValueSketch()
+    for batch in evaluate_sweep(f, x, y, values):
+        sketch.merge(ValueSketch().update(batch))
+    return sketch
+
+
+def sweep_range(f, x_range: Tuple[float, float], y_range: Tuple[float, float],
+                values: Dict[str, np.ndarray], coarse: int = 32,
+                sketch: ValueSketch = None) -> Tuple[float, float]:
+    """
+    Estima o menor e o maior valor de f em todos os quadros numa malha grossa.
+
+    Usado para fixar os níveis das curvas e a escala de cores de toda a animação antes de desenhar o primeiro quadro.
+    Se sketch for dado (de sweep_sketch), a malha não é avaliada de novo.
+    """
+    if sketch is None:
+        sketch = sweep_sketch(f, x_range, y_range, values, coarse)
+    if sketch.count == 0:
+        return 0.0, 1.0
+    low, high = sketch.min, sketch.max
+    return (low, high) if high > low else (low - 0.5, high + 0.5)
+
+
+def render_sweep(func_str: str,
+                 x_range: Tuple[float, float],
+                 y_range: Tuple[float, float],
+                 param: str,
+                 values: Sequence[float],
+                 fixed_vars: Dict[str, float] = None,
+                 levels: List[float] = None,
+                 resolution: int = 200,
+                 save_path: str = None,
+                 fps: int = 10,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 title: str = 'Gráfico da Superfície',
+                 level_strategy: str = 'quantile') -> int:
+    """
+    Anima a superfície 3D e as curvas de nível de f(x, y, param) ao longo dos valores de param.
+
+    A figura, os eixos, os rótulos e os limites são criados uma vez; em cada quadro só a superfície
+    e as curvas de nível são trocadas.
+
+    Args:
+        func_str (str): String da função que o usuário insere.
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        param (str): Variável varrida.
+        values (Sequence[float]): Valor de param em cada quadro.
+        fixed_vars (Dict[str, float], optional): Outras variáveis fixadas.
+        levels (List, optional): Níveis das curvas. Se None, 10 níveis escolhidos por level_strategy
+            sobre os valores de toda a varredura.
+        resolution (int, optional): Pontos por eixo.
+        save_path (str, optional): Arquivo da animação (.gif com Pillow, .mp4 com ffmpeg). Se None, a animação é exibida.
+        fps (int, optional): Quadros por segundo.
+        memory_budget (int, optional): Memória em bytes usada por lote de quadros.
+        title (str, optional): Título do gráfico.
+        level_strategy (str, optional): Estratégia dos níveis automáticos (ver glc.levels).
+
+    Returns:
+        int: Número de quadros desenhados.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib import animation
+
+    f = compile_sweep(func_str, [param], fixed_vars).func
+    values = {param: np.asarray(values, dtype=float)}
+    x = np.linspace(x_range[0], x_range[1], resolution)
+    y = np.linspace(y_range[0], y_range[1], resolution)
+    X, Y = x[None, :], y[:, None]
+    sketch = sweep_sketch(f, x_range, y_range, values)
+    z_min, z_max = sweep_range(f, x_range, y_range, values, sketch=sketch)
+    if levels is None:
+        levels = select_levels(sketch, strategy=level_strategy)
+
+    fig = plt.figure(figsize=(14, 7))
+    ax1 = fig.add_subplot(121, projection='3d')
+    ax1.set_xlabel('x')
+    ax1.set_ylabel('y')
+    ax1.set_zlabel('z')
+    ax1.set_zlim(z_min, z_max)
+    ax2 = fig.add_subplot(122)
+    ax2.set_xlabel('x')
+    ax2.set_ylabel('y')
+    ax2.grid(True)
+    ax2.axhline(0, color='black', linewidth=0.5)
+    ax2.axvline(0, color='black', linewidth=0.5)
+    artists = {'surface': None, 'contours': None}
+
+    def draw(index: int, Z: np.ndarray) -> None:
+        # plot_surface e contour não atualizam os dados de um artista existente: os artistas do quadro
+        # anterior são removidos e os novos são desenhados nos mesmos eixos.
+        if artists['surface'] is not None:
+            # ContourSet.remove() também remove os rótulos criados por clabel.
+            artists['surface'].remove()
+            artists['contours'].remove()
+        artists['surface'] = ax1.plot_surface(X, Y, Z, cmap='viridis', edgecolor='none', vmin=z_min, vmax=z_max)
+        artists['contours'] = ax2.contour(x, y, Z, levels=levels, cmap='viridis', vmin=z_min, vmax=z_max)
+        ax2.clabel(artists['contours'], inline=True, fontsize=8)
+        ax1.set_title(f'3D: {title} ({param} = {values[param][index]:.3g})')
+        ax2.set_title(f'2D: Curvas de Nível ({param} = {values[param][index]:.3g})')
+
+    frames = enumerate(sweep_frames(f, x, y, values, memory_budget))
+    count = 0
+    if save_path:
+        writer_class = animation.PillowWriter if save_path.lower().endswith('.gif') else animation.FFMpegWriter
+        writer = writer_class(fps=fps)
+        with writer.saving(fig, save_path, dpi=fig.dpi):
+            for index, Z in frames:
+                draw(index, Z)
+                writer.grab_frame()
+                count += 1
+        plt.close(fig)
+        print(f"Animação salva em: {save_path}")
+        return count
+
+    def update(item):
+        nonlocal count
+        draw(*item)
+        count += 1
+        return []
+
+    anim = animation.FuncAnimation(fig, update, frames=frames, interval=1000 / fps, repeat=False,
+                                   cache_frame_data=False, save_count=len(values[param]))
+    plt.show()
+    del anim
+    return count
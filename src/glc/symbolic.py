@@ -0,0 +1,353 @@
+import atexit
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, NamedTuple, Tuple
+
+import sympy as sp
+
+from glc.profiling import stage
+
+"""
+Análises simbólicas (integrais e limites) em processos separados, com prazo.
+
+sp.integrate e sp.limit podem levar minutos, ou não terminar, para expressões comuns. Aqui cada
+análise é enviada a um pool de processos assim que a expressão é conhecida, corre em paralelo
+com a avaliação numérica da malha e tem o seu próprio prazo, aplicado com SIGALRM dentro do
+processo de trabalho (como no glc.batch). O prazo conta a partir do início da análise no processo
+de trabalho, e não do envio: com mais análises que processos (máquinas com poucas CPUs), as que
+esperam na fila atrás de uma integral demorada não perdem o seu. Quem monta o gráfico espera no
+máximo até o prazo e recebe 'timeout' no lugar do resultado.
+
+Os resultados são memorizados pela forma canônica da análise (sp.srepr da expressão e dos
+argumentos), de modo que a mesma função não é integrada duas vezes na mesma sessão. Com o cache de
+resultados ligado (glc.results), os resultados 'ok' também ficam em disco e valem entre execuções.
+"""
+
+DEFAULT_TIMEOUT = 5.0
+
+# Tempo extra dado ao processo de trabalho além do prazo antes de ser considerado travado.
+_GRACE = 1.0
+
+# Intervalo, em segundos, com que result() confere se uma análise ainda na fila já começou.
+_POLL_INTERVAL = 0.05
+
+KINDS = ('integrate', 'limit')
+
+
+class SymbolicTimeout(Exception):
+    """Levantada dentro do processo de trabalho quando o prazo da análise se esgota."""
+
+
+class SymbolicResult(NamedTuple):
+    """
+    Resultado de uma análise simbólica.
+
+    Attributes:
+        status (str): 'ok', 'timeout' ou 'error'.
+        value (sp.Expr): Resultado, ou None se status não for 'ok'.
+        error (str): Mensagem de erro ou de prazo excedido.
+        seconds (float): Tempo gasto no processo de trabalho.
+    """
+    status: str
+    value: sp.Expr
+    error: str
+    seconds: float
+
+    def text(self) -> str:
+        """Resultado em texto para anotações do gráfico (sp.pretty, ou a mensagem de erro)."""
+        if self.status == 'ok':
+            return sp.pretty(self.value)
+        if self.status == 'timeout':
+            return f"tempo esgotado ({self.error})"
+        return f"erro ({self.error})"
+
+
+def _raise_timeout(signum, frame):
+    raise SymbolicTimeout()
+
+
+def _evaluate(kind: str, expr: sp.Expr, args: Tuple) -> sp.Expr:
+    if kind == 'integrate':
+        return sp.integrate(expr, *args)
+    # Limite iterado: args é uma sequência de pares (variável, ponto).
+    for symbol, point in args:
+        expr = sp.limit(expr, symbol, point)
+    return expr
+
+
+def run_analysis(kind: str, expr_srepr: str, args_srepr: str, timeout: float = None) -> Tuple[str, str, str, float]:
+    """
+    Executa uma análise no processo atual, sem deixar exceções escaparem.
+
+    A expressão e os argumentos chegam e voltam como sp.srepr, que é estável entre processos.
+
+    Args:
+        kind (str): 'integrate' ou 'limit'.
+        expr_srepr (str): sp.srepr da expressão.
+        args_srepr (str): sp.srepr da tupla de argumentos.
+        timeout (float, optional): Prazo em segundos. Se None, não há prazo.
+
+    Returns:
+        Tuple[str, str, str, float]: status, sp.srepr do resultado, erro e tempo gasto.
+    """
+    use_alarm = bool(timeout) and hasattr(signal, 'setitimer')
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        value = _evaluate(kind, sp.sympify(expr_srepr), sp.sympify(args_srepr))
+        status, result, error = 'ok', sp.srepr(value), None
+    except SymbolicTimeout:
+        status, result, error = 'timeout', None, f"prazo de {timeout} s excedido"
+    except Exception as e:
+        status, result, error = 'error', None, f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return status, result, error, time.perf_counter() - start
+
+
+# No processo de trabalho: fila pela qual o início de cada análise é avisado ao processo principal.
+_started_queue = None
+
+
+def _run_queued(token: int, kind: str, expr_srepr: str, args_srepr: str, timeout: float) -> Tuple[str, str, str, float]:
+    # O prazo de uma análise conta a partir daqui, e não do envio: com mais análises que processos,
+    # as últimas esperam na fila sem gastar o prazo.
+    _started_queue.put((token, time.time()))
+    return run_analysis(kind, expr_srepr, args_srepr, timeout)
+
+
+def _init_worker(started_queue) -> None:
+    global _started_queue
+    _started_queue = started_queue
+    # Ctrl+C no terminal interrompe o programa principal, não as análises em andamento.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Carrega o SymPy uma vez por processo, e não na primeira análise.
+    sp.integrate(sp.Symbol('x'), sp.Symbol('x'))
+
+
+class SymbolicAnalyzer:
+    """
+    Pool de processos para análises simbólicas, com prazo por análise e memorização dos resultados.
+
+    Args:
+        workers (int, optional): Número de processos. Se None, usa até 4 (limitado pelo número de CPUs).
+        timeout (float, optional): Prazo padrão de cada análise, em segundos.
+        cache_size (int, optional): Número máximo de resultados memorizados.
+    """
+
+    def __init__(self, workers: int = None, timeout: float = DEFAULT_TIMEOUT, cache_size: int = 256):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._results: 'OrderedDict[Tuple[str, str, str], SymbolicResult]' = OrderedDict()
+        # Chave -> (future, número da análise, hora do envio, prazo).
+        self._pending: Dict[Tuple[str, str, str], Tuple[Future, int, float, float]] = {}
+        self._tokens = itertools.count()
+        # Número da análise -> hora em que ela começou no processo de trabalho.
+        self._started: Dict[int, float] = {}
+        self._started_queue = None
+        self._pool: ProcessPoolExecutor = None
+        self._stuck = False
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._started_queue = multiprocessing.SimpleQueue()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self._started_queue,))
+        return self._pool
+
+    def submit(self, kind: str, expr: sp.Expr, *args, timeout: float = None) -> Tuple[str, str, str]:
+        """
+        Envia uma análise ao pool e retorna imediatamente a chave para result().
+
+        Args:
+            kind (str): 'integrate' (args como em sp.integrate) ou 'limit' (args são pares (variável, ponto),
+                aplicados em sequência).
+            expr (sp.Expr): Expressão analisada.
+            timeout (float, optional): Prazo em segundos. Se None, usa o prazo padrão.
+
+        Returns:
+            Tuple[str, str, str]: Chave canônica da análise.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Análise desconhecida: {kind!r}. Use uma de {KINDS}.")
+        timeout = self.timeout if timeout is None else timeout
+        key = (kind, sp.srepr(sp.sympify(expr)), sp.srepr(sp.Tuple(*args)))
+        with self._lock:
+            if key in self._results or key in self._pending:
+                return key
+            stored = self._load(key)
+            if stored is not None:
+                self._results[key] = stored
+                return key
+            token = next(self._tokens)
+            future = self._executor().submit(_run_queued, token, kind, key[1], key[2], timeout)
+            self._pending[key] = (future, token, time.time(), timeout)
+        return key
+
+    def result(self, key: Tuple[str, str, str]) -> SymbolicResult:
+        """
+        Espera o resultado de uma análise enviada, no máximo até o fim do seu prazo (contado do seu início).
+
+        Args:
+            key (Tuple[str, str, str]): Chave retornada por submit().
+
+        Returns:
+            SymbolicResult: Resultado; status 'timeout' se o prazo se esgotou.
+        """
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+            future, token, submitted, timeout = self._pending[key]
+            ahead = [(other_future, other, t) for other_future, other, _, t in self._pending.values() if other < token]
+        # Na medição (glc.profiling), a etapa é a espera; o tempo gasto no outro processo vai em worker_seconds.
+        with stage(key[0]) as profile:
+            try:
+                status, value, error, seconds = self._wait(future, token, timeout, ahead)
+                result = SymbolicResult(status, sp.sympify(value) if value is not None else None, error, seconds)
+                if status == 'ok':
+                    self._store(key, value, seconds)
+            except TimeoutError:  # o de concurrent.futures: antes do Python 3.11, não é o TimeoutError embutido
+                # A análise ainda estava na fila ou não respondeu ao SIGALRM (presa em código C, ou sistema
+                # sem SIGALRM). Os outros processos do pool continuam atendendo as análises pendentes; o
+                # pool é reiniciado quando nenhuma outra estiver esperando por ele.
+                stuck = not future.cancel()
+                result = SymbolicResult('timeout', None, f"prazo de {timeout} s excedido", timeout)
+            except BrokenProcessPool as e:
+                result = SymbolicResult('error', None, f"BrokenProcessPool: {e}", 0.0)
+                stuck = True
+            else:
+                stuck = False
+            profile.note(status=result.status, worker_seconds=result.seconds)
+
+        with self._lock:
+            self._pending.pop(key, None)
+            self._started.pop(token, None)
+            self._stuck = self._stuck or stuck
+            restart = self._stuck and not self._pending
+            # Prazos excedidos não são memorizados: outra chamada pode dar mais tempo à análise.
+            if result.status != 'timeout':
+                self._results[key] = result
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        if restart:
+            self._restart()
+        return result
+
+    def _wait(self, future: Future, token: int, timeout: float, ahead: list) -> Tuple[str, str, str, float]:
+        # O prazo, mais _GRACE, conta a partir do início da análise no processo de trabalho. Na fila, a
+        # espera só termina antes se alguma análise enviada antes (ahead) passou do prazo sem terminar:
+        # o processo dela está preso e a fila pode não andar mais.
+        if not timeout:
+            return future.result()
+        while True:
+            started = self._start_time(token)
+            if started is None:
+                if self._stuck_ahead(ahead):
+                    raise TimeoutError()
+                wait = _POLL_INTERVAL
+            else:
+                wait = max(0.0, started + timeout + _GRACE - time.time())
+            try:
+                return future.result(timeout=wait)
+            except TimeoutError:
+                if started is not None:
+                    raise
+
+    def _stuck_ahead(self, ahead: list) -> bool:
+        now = time.time()
+        for other_future, other, timeout in ahead:
+            started = self._start_time(other)
+            if timeout and started is not None and not other_future.done() and now > started + timeout + _GRACE:
+                return True
+        return False
+
+    def _start_time(self, token: int) -> float:
+        with self._lock:
+            while self._started_queue is not None and not self._started_queue.empty():
+                other, started = self._started_queue.get()
+                self._started[other] = started
+            return self._started.get(token)
+
+    @staticmethod
+    def _stored_key(key: Tuple[str, str, str]) -> str:
+        from glc.results import result_key
+
+        # O sp.srepr do resultado pode mudar entre versões do SymPy.
+        return result_key('symbolic', analysis=key[0], expr=key[1], args=key[2], sympy=sp.__version__)
+
+    def _load(self, key: Tuple[str, str, str]) -> SymbolicResult:
+        from glc.results import default_result_cache
+
+        cache = default_result_cache()
+        stored = cache.get_json(self._stored_key(key)) if cache is not None else None
+        if stored is None:
+            return None
+        try:
+            return SymbolicResult('ok', sp.sympify(stored['value']), None, stored['seconds'])
+        except (KeyError, TypeError, sp.SympifyError):
+            return None
+
+    def _store(self, key: Tuple[str, str, str], value: str, seconds: float) -> None:
+        from glc.results import default_result_cache
+
+        cache = default_result_cache()
+        if cache is not None:
+            cache.put_json(self._stored_key(key), {'value': value, 'seconds': seconds})
+
+    def analyze(self, kind: str, expr: sp.Expr, *args, timeout: float = None) -> SymbolicResult:
+        """Como submit() seguido de result()."""
+        return self.result(self.submit(kind, expr, *args, timeout=timeout))
+
+    def _restart(self) -> None:
+        # Encerra os processos (inclusive os presos) e cria um novo pool na próxima análise.
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._started_queue = None
+            self._started.clear()
+            self._stuck = False
+        if pool is None:
+            return
+        processes = list((getattr(pool, '_processes', None) or {}).values())
+        pool.shutdown(wait=False)
+        for process in processes:
+            process.terminate()
+
+    def shutdown(self) -> None:
+        """Encerra o pool, interrompendo as análises ainda em andamento."""
+        with self._lock:
+            # As análises ainda na fila são canceladas aqui (shutdown(cancel_futures=True) exige o Python 3.9).
+            for future, _, _, _ in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+        self._restart()
+
+
+_default_analyzer: SymbolicAnalyzer = None
+
+
+def default_analyzer() -> SymbolicAnalyzer:
+    """
+    Retorna o analisador compartilhado do processo, criado na primeira chamada.
+
+    O prazo padrão pode ser definido pela variável de ambiente GLC_SYMBOLIC_TIMEOUT (segundos).
+    """
+    global _default_analyzer
+    if _default_analyzer is None:
+        timeout = float(os.environ.get('GLC_SYMBOLIC_TIMEOUT', DEFAULT_TIMEOUT))
+        _default_analyzer = SymbolicAnalyzer(timeout=timeout)
+        atexit.register(_default_analyzer.shutdown)
+    return _default_analyzer
@@ -0,0 +1,263 @@
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, Tuple, Union
+
+import numpy as np
+
+from glc.levels import DEFAULT_STRATEGY, ValueSketch, select_levels
+
+"""
+Avaliação da malha em blocos (tiles), com saída em arquivos .npy mapeados em memória.
+
+Para resoluções muito altas (20000x20000, por exemplo) as matrizes Z, Z_fx e Z_fy não cabem na
+memória. Aqui a malha é avaliada em faixas de linhas cujo tamanho é escolhido a partir de um
+orçamento fixo de memória. Cada faixa é gravada num arquivo .npy, depois aberto com
+np.load(..., mmap_mode='r'), e as estatísticas (mínimo, máximo e suas posições e o resumo da
+distribuição usado para escolher os níveis das curvas, ver glc.levels) são acumuladas durante a
+avaliação, sem uma segunda passada pelos dados.
+"""
+
+DEFAULT_MEMORY_BUDGET = 256 * 2 ** 20
+
+# Fator aproximado de temporários criados pela função do lambdify por saída avaliada.
+_TEMPORARIES_PER_OUTPUT = 8
+
+
+class GridStats:
+    """
+    Estatísticas acumuladas de uma malha, ignorando NaN e infinitos.
+
+    Attributes:
+        min (float): Menor valor finito encontrado (NaN se não houver nenhum).
+        max (float): Maior valor finito encontrado (NaN se não houver nenhum).
+        argmin (Tuple[int, int]): Posição (linha, coluna) do mínimo.
+        argmax (Tuple[int, int]): Posição (linha, coluna) do máximo.
+        count (int): Número de valores finitos.
+        invalid (int): Número de valores NaN ou infinitos.
+        sketch (ValueSketch): Resumo da distribuição dos valores finitos.
+    """
+
+    def __init__(self):
+        self.min = np.nan
+        self.max = np.nan
+        self.argmin: Tuple[int, int] = None
+        self.argmax: Tuple[int, int] = None
+        self.count = 0
+        self.invalid = 0
+        self.total = 0.0
+        self.sketch = ValueSketch()
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else np.nan
+
+    def update(self, tile: np.ndarray, row_offset: int = 0, col_offset: int = 0) -> None:
+        """
+        Acumula as estatísticas de um bloco da malha.
+
+        Args:
+            tile (np.ndarray): Bloco 2-D de valores.
+            row_offset (int, optional): Linha da malha completa em que o bloco começa.
+            col_offset (int, optional): Coluna da malha completa em que o bloco começa.
+        """
+        self.sketch.update(tile)
+        finite = np.isfinite(tile)
+        n_finite = int(np.count_nonzero(finite))
+        self.invalid += tile.size - n_finite
+        if n_finite == 0:
+            return
+        values = np.where(finite, tile, np.inf)
+        i_min = int(np.argmin(values))
+        values = np.where(finite, tile, -np.inf)
+        i_max = int(np.argmax(values))
+        tile_min = float(tile.flat[i_min])
+        tile_max = float(tile.flat[i_max])
+        r_min, c_min = np.unravel_index(i_min, tile.shape)
+        r_max, c_max = np.unravel_index(i_max, tile.shape)
+        if self.count == 0 or tile_min < self.min:
+            self.min = tile_min
+            self.argmin = (int(r_min) + row_offset, int(c_min) + col_offset)
+        if self.count == 0 or tile_max > self.max:
+            self.max = tile_max
+            self.argmax = (int(r_max) + row_offset, int(c_max) + col_offset)
+        self.count += n_finite
+        self.total += float(np.sum(tile, where=finite))
+
+    def merge(self, other: 'GridStats') -> 'GridStats':
+        """Combina as estatísticas de outro bloco (de outro processo, por exemplo) nestas."""
+        if other.count:
+            if self.count == 0 or other.min < self.min:
+                self.min, self.argmin = other.min, other.argmin
+            if self.count == 0 or other.max > self.max:
+                self.max, self.argmax = other.max, other.argmax
+        self.count += other.count
+        self.invalid += other.invalid
+        self.total += other.total
+        self.sketch.merge(other.sketch)
+        return self
+
+    def levels(self, n: int = 10, strategy: str = DEFAULT_STRATEGY) -> np.ndarray:
+        """Níveis das curvas escolhidos a partir do resumo acumulado (ver glc.levels.select_levels)."""
+        return select_levels(self.sketch, n, strategy)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {'min': self.min, 'max': self.max, 'argmin': self.argmin, 'argmax': self.argmax,
+                'count': self.count, 'invalid': self.invalid, 'mean': self.mean}
+
+
+class TiledGrid:
+    """
+    Malha avaliada em blocos e gravada em disco.
+
+    Attributes:
+        x (np.ndarray): Eixo x (1-D).
+        y (np.ndarray): Eixo y (1-D).
+        arrays (Dict[str, np.memmap]): Matrizes (linhas = y, colunas = x) mapeadas a partir dos arquivos .npy.
+        paths (Dict[str, str]): Caminho do arquivo .npy de cada matriz.
+        stats (Dict[str, GridStats]): Estatísticas acumuladas de cada matriz.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, out_dir: str, owns_dir: bool):
+        self.x = x
+        self.y = y
+        self.out_dir = out_dir
+        self.arrays: Dict[str, np.memmap] = {}
+        self.paths: Dict[str, str] = {}
+        self.stats: Dict[str, GridStats] = {}
+        self._owns_dir = owns_dir
+
+    def location(self, name: str, which: str = 'min') -> Tuple[float, float, float]:
+        """
+        Retorna (x, y, valor) do mínimo ou do máximo de uma matriz.
+
+        Args:
+            name (str): Nome da matriz.
+            which (str, optional): 'min' ou 'max'.
+        """
+        stats = self.stats[name]
+        row, col = stats.argmin if which == 'min' else stats.argmax
+        value = stats.min if which == 'min' else stats.max
+        return float(self.x[col]), float(self.y[row]), value
+
+    def preview(self, name: str, max_points: int = 500) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Retorna uma versão reduzida (por amostragem com passo fixo) da matriz, já em memória.
+
+        Args:
+            name (str): Nome da matriz.
+            max_points (int, optional): Número máximo de pontos por eixo.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Eixos x, y e a matriz reduzida.
+        """
+        step_y = max(1, int(np.ceil(self.y.size / max_points)))
+        step_x = max(1, int(np.ceil(self.x.size / max_points)))
+        return (self.x[::step_x], self.y[::step_y],
+                np.array(self.arrays[name][::step_y, ::step_x]))
+
+    def close(self) -> None:
+        """Libera os mapeamentos e apaga os arquivos se o diretório foi criado automaticamente."""
+        self.arrays.clear()
+        if self._owns_dir:
+            shutil.rmtree(self.out_dir, ignore_errors=True)
+
+    def __enter__(self) -> 'TiledGrid':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def rows_per_tile(n_cols: int, n_outputs: int, memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                  itemsize: int = 8) -> int:
+    """
+    Calcula quantas linhas da malha cabem num bloco dentro do orçamento de memória.
+
+    Args:
+        n_cols (int): Número de colunas da malha.
+        n_outputs (int): Número de matrizes avaliadas por bloco.
+        memory_budget (int, optional): Memória disponível em bytes.
+        itemsize (int, optional): Tamanho em bytes de cada valor.
+    """
+    bytes_per_row = n_cols * itemsize * max(n_outputs, 1) * _TEMPORARIES_PER_OUTPUT
+    return max(1, memory_budget // bytes_per_row)
+
+
+def evaluate_tiled(funcs: Dict[Union[str, Tuple[str, ...]], Callable[[np.ndarray, np.ndarray], np.ndarray]],
+                   x_range: Tuple[float, float],
+                   y_range: Tuple[float, float],
+                   resolution: int,
+                   derived: Dict[str, Callable[[Dict[str, np.ndarray]], np.ndarray]] = None,
+                   memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                   out_dir: str = None,
+                   dtype: type = np.float64) -> TiledGrid:
+    """
+    Avalia várias funções sobre a mesma malha, bloco a bloco, gravando cada resultado num arquivo .npy.
+
+    Args:
+        funcs (Dict[str, Callable]): Funções f(x, y) a avaliar, indexadas pelo nome da matriz de saída.
+            Uma chave do tipo tupla de nomes indica uma função que retorna várias matrizes de uma vez
+            (como o GradientEvaluator).
+        x_range (Tuple): Intervalo para o eixo x (min, max).
+        y_range (Tuple): Intervalo para o eixo y (min, max).
+        resolution (int): Número de pontos para x e y.
+        derived (Dict[str, Callable], optional): Matrizes calculadas a partir dos blocos já avaliados
+            (por exemplo, o módulo do gradiente a partir de Z_fx e Z_fy).
+        memory_budget (int, optional): Memória em bytes usada por bloco.
+        out_dir (str, optional): Diretório dos arquivos .npy. Se None, é criado um diretório temporário,
+            apagado por TiledGrid.close().
+        dtype (type, optional): Tipo dos valores gravados.
+
+    Returns:
+        TiledGrid: Eixos, matrizes mapeadas em memória e estatísticas de cada matriz.
+    """
+    derived = derived or {}
+    owns_dir = out_dir is None
+    if owns_dir:
+        out_dir = tempfile.mkdtemp(prefix='glc-grid-')
+    else:
+        os.makedirs(out_dir, exist_ok=True)
+
+    x = np.linspace(x_range[0], x_range[1], resolution)
+    y = np.linspace(y_range[0], y_range[1], resolution)
+    grid = TiledGrid(x, y, out_dir, owns_dir)
+    # Os blocos são gravados com escrita sequencial no arquivo (e não pelo memmap), para que as
+    # páginas já escritas não se acumulem na memória do processo.
+    outputs = {name: key for key in funcs for name in (key if isinstance(key, tuple) else (key,))}
+    files = {}
+    for name in list(outputs) + list(derived):
+        path = os.path.join(out_dir, f"{name}.npy")
+        header = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(resolution, resolution))
+        offset = header.offset
+        del header
+        files[name] = open(path, 'r+b')
+        files[name].seek(offset)
+        grid.paths[name] = path
+        grid.stats[name] = GridStats()
+
+    step = rows_per_tile(resolution, len(outputs) + len(derived), memory_budget, np.dtype(dtype).itemsize)
+    X = x[None, :]
+    try:
+        for start in range(0, resolution, step):
+            Y = y[start:start + step, None]
+            shape = (Y.shape[0], resolution)
+            tile: Dict[str, np.ndarray] = {}
+            with np.errstate(all='ignore'):
+                for key, func in funcs.items():
+                    names = key if isinstance(key, tuple) else (key,)
+                    values = func(X, Y) if isinstance(key, tuple) else (func(X, Y),)
+                    for name, value in zip(names, values):
+                        tile[name] = np.broadcast_to(np.asarray(value, dtype=dtype), shape)
+                for name, func in derived.items():
+                    tile[name] = np.broadcast_to(np.asarray(func(tile), dtype=dtype), shape)
+            for name, values in tile.items():
+                files[name].write(np.ascontiguousarray(values).tobytes())
+                grid.stats[name].update(values, row_offset=start)
+    finally:
+        for fh in files.values():
+            fh.close()
+
+    for name in files:
+        grid.arrays[name] = np.load(grid.paths[name], mmap_mode='r')
+    return grid
@@ -0,0 +1,525 @@
+import argparse
+import base64
+import json
+import re
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from glc.contour import marching_squares
+from glc.functions import parse_function
+from glc.levels import STRATEGIES, ValueSketch, select_levels
+from glc.results import cached_json, function_key
+
+"""
+Servidor local de tiles para explorar uma função com zoom, sem reexecutar o script.
+
+O domínio inicial (x_range x y_range) é o tile (0, 0) do nível 0; no nível z cada tile tem
+1/2**z da largura e da altura do domínio, e os índices (i, j) podem sair do domínio inicial
+para navegar além dele. Cada tile é uma malha tile_size x tile_size da função, avaliada pela
+mesma função compilada do parse_function (glc.functions), com as curvas de nível extraídas por
+glc.contour.marching_squares.
+
+Os tiles ficam num cache LRU. Ao servir um tile, os 8 vizinhos e os 4 tiles do nível seguinte
+que o cobrem são calculados em segundo plano, de modo que o deslocamento e o zoom
+encontrem os tiles prontos, mas num pool à parte e com uma fila limitada: os tiles pedidos pelo
+visualizador nunca esperam atrás das antecipações. Um zoom profundo custa só os tiles visíveis.
+
+Uso:
+
+    PYTHONPATH=src python -m glc.tileserver "sin(x) * cos(y)" --x-range 0 10 --y-range -5 5
+
+e abra http://127.0.0.1:8765/ no navegador. Rotas:
+
+    /                visualizador (arrastar desloca, roda do mouse aproxima)
+    /info            domínio, níveis das curvas e tamanho dos tiles
+    /tile/z/i/j      um tile em JSON (valores em float32/base64 e curvas de nível)
+    /stats           estatísticas do cache
+"""
+
+DEFAULT_TILE_SIZE = 128
+DEFAULT_CACHE_SIZE = 512
+# Antecipações na fila, no máximo; as mais antigas são canceladas primeiro.
+DEFAULT_MAX_PREFETCH = 32
+MAX_ZOOM = 40
+
+_TILE_ROUTE = re.compile(r'^/tile/(-?\d+)/(-?\d+)/(-?\d+)$')
+
+
+class TileCache:
+    """
+    Cache LRU de tiles, com cálculo em segundo plano e sem cálculos repetidos do mesmo tile.
+
+    Os tiles pedidos e os antecipados (prefetch) são calculados em pools separados: um tile visível
+    nunca espera na fila atrás dos vizinhos antecipados, e uma antecipação só começa quando nenhum
+    tile pedido está sendo calculado. As antecipações ainda na fila são canceladas quando passam de
+    max_prefetch (as mais antigas primeiro) ou quando o zoom muda de nível, e o pedido de um tile
+    cuja antecipação ainda está na fila passa à frente dela.
+
+    Args:
+        compute (Callable): Função (z, i, j) -> tile (qualquer objeto; o servidor guarda o JSON já codificado).
+        maxsize (int, optional): Número máximo de tiles guardados.
+        workers (int, optional): Número de threads de cálculo dos tiles pedidos; as antecipações usam uma só.
+        max_prefetch (int, optional): Número máximo de antecipações na fila.
+    """
+
+    def __init__(self, compute, maxsize: int = DEFAULT_CACHE_SIZE, workers: int = 4,
+                 max_prefetch: int = DEFAULT_MAX_PREFETCH):
+        self.compute = compute
+        self.maxsize = maxsize
+        self.max_prefetch = max_prefetch
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.cancelled = 0
+        self._tiles: 'OrderedDict[Tuple[int, int, int], Any]' = OrderedDict()
+        self._running: Dict[Tuple[int, int, int], Future] = {}
+        # Antecipações que ainda não começaram, da mais antiga para a mais recente.
+        self._queued: 'OrderedDict[Tuple[int, int, int], Future]' = OrderedDict()
+        self._lock = threading.Lock()
+        # As antecipações só começam quando nenhum tile pedido está sendo calculado.
+        self._requests = 0
+        self._no_requests = threading.Condition(self._lock)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='glc-tile')
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='glc-prefetch')
+
+    def _submit(self, key: Tuple[int, int, int], prefetch: bool = False) -> Future:
+        # Chamado com o lock adquirido.
+        future = self._running.get(key)
+        if future is not None and not prefetch and self._queued.pop(key, None) is future and future.cancel():
+            # A antecipação ainda estava na fila: o pedido passa à frente, no pool dos tiles pedidos.
+            future = None
+        if future is None:
+            pool = self._prefetch_pool if prefetch else self._pool
+            future = pool.submit(self._compute, key, prefetch)
+            self._running[key] = future
+            if prefetch:
+                self._queued[key] = future
+        return future
+
+    def _cancel_prefetch(self, key: Tuple[int, int, int]) -> None:
+        # Chamado com o lock adquirido.
+        future = self._queued.pop(key)
+        if future.cancel():
+            self._running.pop(key, None)
+            self.cancelled += 1
+
+    def _compute(self, key: Tuple[int, int, int], prefetch: bool = False) -> Any:
+        with self._lock:
+            if prefetch:
+                self._no_requests.wait_for(lambda: self._requests == 0)
+            else:
+                self._requests += 1
+            self._queued.pop(key, None)
+        try:
+            tile = self.compute(*key)
+            with self._lock:
+                self._tiles[key] = tile
+                while len(self._tiles) > self.maxsize:
+                    self._tiles.popitem(last=False)
+            return tile
+        finally:
+            with self._lock:
+                self._running.pop(key, None)
+                if not prefetch:
+                    self._requests -= 1
+                    self._no_requests.notify_all()
+
+    def get(self, key: Tuple[int, int, int]) -> Any:
+        """Retorna o tile, calculando-o (ou esperando o cálculo em andamento) se necessário."""
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+            self.misses += 1
+            future = self._submit(key)
+        return future.result()
+
+    def prefetch(self, keys: Sequence[Tuple[int, int, int]]) -> None:
+        """
+        Agenda o cálculo dos tiles que ainda não estão no cache.
+
+        As antecipações na fila de níveis de zoom fora de keys são canceladas: a vista já mudou de nível.
+        """
+        with self._lock:
+            levels = {key[0] for key in keys}
+            for key in [key for key in self._queued if key[0] not in levels]:
+                self._cancel_prefetch(key)
+            for key in keys:
+                if key in self._queued:
+                    self._queued.move_to_end(key)
+                elif key not in self._tiles and key not in self._running:
+                    self.prefetched += 1
+                    self._submit(key, prefetch=True)
+            while len(self._queued) > self.max_prefetch:
+                self._cancel_prefetch(next(iter(self._queued)))
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {'size': len(self._tiles), 'maxsize': self.maxsize, 'hits': self.hits,
+                    'misses': self.misses, 'prefetched': self.prefetched, 'cancelled': self.cancelled,
+                    'queued': len(self._queued), 'running': len(self._running)}
+
+    def close(self) -> None:
+        # Os tiles ainda na fila são cancelados aqui (shutdown(cancel_futures=True) exige o Python 3.9).
+        with self._lock:
+            for future in self._running.values():
+                future.cancel()
+            self._running.clear()
+            self._queued.clear()
+        self._pool.shutdown(wait=False)
+        self._prefetch_pool.shutdown(wait=False)
+
+
+class TileSource:
+    """
+    Avalia a função e as curvas de nível de um tile.
+
+    Args:
+        func_str (str): Expressão em x e y.
+        x_range (Tuple): Domínio do nível 0 no eixo x (min, max).
+        y_range (Tuple): Domínio do nível 0 no eixo y (min, max).
+        fixed_vars (Dict[str, float], optional): Variáveis fixadas.
+        tile_size (int, optional): Pontos por eixo em cada tile.
+        n_levels (int, optional): Número de níveis das curvas, calculados sobre o tile do nível 0.
+        level_strategy (str, optional): Estratégia dos níveis (ver glc.levels).
+    """
+
+    def __init__(self, func_str: str, x_range: Tuple[float, float], y_range: Tuple[float, float],
+                 fixed_vars: Dict[str, float] = None, tile_size: int = DEFAULT_TILE_SIZE, n_levels: int = 10,
+                 level_strategy: str = 'quantile'):
+        self.func_str = func_str
+        self.f = parse_function(func_str, fixed_vars)
+        self.x_range = tuple(map(float, x_range))
+        self.y_range = tuple(map(float, y_range))
+        self.tile_size = tile_size
+        _, _, Z = self.evaluate(0, 0, 0)
+        sketch = ValueSketch().update(Z)
+        if sketch.count:
+            self.z_min, self.z_max = sketch.min, sketch.max
+        else:
+            self.z_min = self.z_max = 0.0
+        self.levels = select_levels(sketch, n_levels, level_strategy) if sketch.count else np.array([self.z_min])
+
+    def bounds(self, z: int, i: int, j: int) -> Tuple[float, float, float, float]:
+        """Retorna (x0, x1, y0, y1) do tile."""
+        width = (self.x_range[1] - self.x_range[0]) / 2 ** z
+        height = (self.y_range[1] - self.y_range[0]) / 2 ** z
+        x0 = self.x_range[0] + i * width
+        y0 = self.y_range[0] + j * height
+        return x0, x0 + width, y0, y0 + height
+
+    def evaluate(self, z: int, i: int, j: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        x0, x1, y0, y1 = self.bounds(z, i, j)
+        # Os tiles vizinhos compartilham a borda, para que as curvas de nível se encontrem.
+        x = np.linspace(x0, x1, self.tile_size)
+        y = np.linspace(y0, y1, self.tile_size)
+        with np.errstate(all='ignore'):
+            Z = np.broadcast_to(np.asarray(self.f(x[None, :], y[:, None]), dtype=float), (y.size, x.size))
+        return x, y, Z
+
+    def tile(self, z: int, i: int, j: int) -> Dict[str, Any]:
+        """
+        Calcula um tile.
+
+        Returns:
+            Dict[str, Any]: Limites do tile, valores (float32 em base64, linhas = y) e as curvas de nível
+            de cada nível como listas [xs, ys].
+        """
+        # Com o cache de resultados ligado (glc.results), os tiles sobrevivem ao reinício do servidor.
+        return cached_json('tile', lambda: self._tile(z, i, j), function=function_key(self.f),
+                           x_range=self.x_range, y_range=self.y_range, tile_size=self.tile_size,
+                           levels=self.levels, z=z, i=i, j=j)
+
+    def _tile(self, z: int, i: int, j: int) -> Dict[str, Any]:
+        x, y, Z = self.evaluate(z, i, j)
+        x0, x1, y0, y1 = self.bounds(z, i, j)
+        Z = np.where(np.isfinite(Z), Z, np.nan)
+        contours = []
+        for level, paths in zip(self.levels, marching_squares(x, y, Z, self.levels)):
+            for path in paths:
+                contours.append({'level': float(level), 'x': path[:, 0].tolist(), 'y': path[:, 1].tolist()})
+        return {
+            'z': z, 'i': i, 'j': j,
+            'x0': x0, 'x1': x1, 'y0': y0, 'y1': y1,
+            'size': self.tile_size,
+            'values': base64.b64encode(Z.astype('<f4').tobytes()).decode('ascii'),
+            'contours': contours,
+        }
+
+    def info(self) -> Dict[str, Any]:
+        return {'expression': self.func_str, 'x_range': self.x_range, 'y_range': self.y_range,
+                'tile_size': self.tile_size, 'levels': self.levels.tolist(),
+                'z_min': self.z_min, 'z_max': self.z_max, 'max_zoom': MAX_ZOOM}
+
+
+def neighbours(z: int, i: int, j: int) -> List[Tuple[int, int, int]]:
+    """Tiles a calcular antecipadamente: os 8 vizinhos no mesmo nível e os 4 filhos no nível seguinte."""
+    keys = [(z, i + di, j + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj]
+    if z < MAX_ZOOM:
+        keys += [(z + 1, 2 * i + di, 2 * j + dj) for di in (0, 1) for dj in (0, 1)]
+    return keys
+
+
+class TileServer(ThreadingHTTPServer):
+    """
+    Servidor HTTP dos tiles e do visualizador.
+
+    Args:
+        address (Tuple[str, int]): Endereço e porta.
+        source (TileSource): Origem dos tiles.
+        cache_size (int, optional): Número máximo de tiles no cache.
+        prefetch (bool, optional): Calcula os vizinhos de cada tile servido em segundo plano.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], source: TileSource, cache_size: int = DEFAULT_CACHE_SIZE,
+                 prefetch: bool = True):
+        self.source = source
+        self.cache = TileCache(lambda z, i, j: _encode(source.tile(z, i, j)), cache_size)
+        self.prefetch = prefetch
+        super().__init__(address, _TileHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.cache.close()
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+    server: TileServer
+
+    def _send(self, body: bytes, content_type: str = 'application/json', status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        path = self.path.split('?', 1)[0]
+        if path == '/':
+            self._send(_VIEWER_HTML.encode('utf-8'), 'text/html; charset=utf-8')
+        elif path == '/info':
+            self._send(_encode(self.server.source.info()))
+        elif path == '/stats':
+            self._send(_encode(self.server.cache.info()))
+        else:
+            match = _TILE_ROUTE.match(path)
+            if not match:
+                self._send(_encode({'error': 'rota desconhecida'}), status=404)
+                return
+            key = tuple(int(v) for v in match.groups())
+            if not 0 <= key[0] <= MAX_ZOOM:
+                self._send(_encode({'error': f"nível de zoom fora do intervalo 0..{MAX_ZOOM}"}), status=400)
+                return
+            self._send(self.server.cache.get(key))
+            if self.server.prefetch:
+                self.server.cache.prefetch(neighbours(*key))
+
+    def log_message(self, format: str, *args) -> None:
+        # Sem uma linha no terminal para cada tile.
+        pass
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servidor local de tiles de uma função f(x, y), com zoom sob demanda.")
+    parser.add_argument('expression', help="expressão em x e y, ex.: 'sin(x) * cos(y)'")
+    parser.add_argument('--x-range', type=float, nargs=2, default=(0.0, 10.0))
+    parser.add_argument('--y-range', type=float, nargs=2, default=(-5.0, 5.0))
+    parser.add_argument('--fix', action='append', default=[], metavar='VAR=VALOR', help="fixa uma variável, ex.: z=1")
+    parser.add_argument('--tile-size', type=int, default=DEFAULT_TILE_SIZE)
+    parser.add_argument('--levels', type=int, default=10, help="número de níveis das curvas")
+    parser.add_argument('--level-strategy', choices=STRATEGIES, default='quantile', help="escolha dos níveis (ver glc.levels)")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, help="número máximo de tiles no cache")
+    parser.add_argument('--no-prefetch', action='store_true', help="não calcula os tiles vizinhos antecipadamente")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    fixed_vars = {}
+    for item in args.fix:
+        var, _, value = item.partition('=')
+        fixed_vars[var.strip()] = float(value)
+    try:
+        source = TileSource(args.expression, args.x_range, args.y_range, fixed_vars, args.tile_size, args.levels,
+                            args.level_strategy)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    server = TileServer((args.host, args.port), source, args.cache_size, prefetch=not args.no_prefetch)
+    print(f"Servindo {args.expression} em http://{args.host}:{server.server_address[1]}/ (Ctrl+C para sair)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+_VIEWER_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>GLC - tiles</title>
+<style>
+  html, body { margin: 0; height: 100%; background: #111; color: #ddd; font: 13px sans-serif; }
+  canvas { display: block; width: 100%; height: 100%; cursor: grab; }
+  #status { position: absolute; top: 8px; left: 8px; background: rgba(0,0,0,.6); padding: 4px 8px; }
+</style>
+</head>
+<body>
+<canvas id="view"></canvas>
+<div id="status"></div>
+<script>
+"use strict";
+const canvas = document.getElementById('view');
+const ctx = canvas.getContext('2d');
+const status = document.getElementById('status');
+const tiles = new Map();
+let info = null;
+// Janela visível em coordenadas da função.
+let view = null;
+
+// Viridis aproximado por interpolação linear entre 5 cores.
+const STOPS = [[68, 1, 84], [59, 82, 139], [33, 145, 140], [94, 201, 98], [253, 231, 37]];
+function color(t) {
+  t = Math.min(1, Math.max(0, t)) * (STOPS.length - 1);
+  const k = Math.min(STOPS.length - 2, Math.floor(t)), u = t - k;
+  return STOPS[k].map((c, n) => Math.round(c + (STOPS[k + 1][n] - c) * u));
+}
+
+function decode(tile) {
+  const bytes = Uint8Array.from(atob(tile.values), c => c.charCodeAt(0));
+  const values = new Float32Array(bytes.buffer);
+  const n = tile.size, image = new ImageData(n, n), span = (info.z_max - info.z_min) || 1;
+  for (let r = 0; r < n; r++) {
+    for (let c = 0; c < n; c++) {
+      const v = values[r * n + c], p = ((n - 1 - r) * n + c) * 4;
+      if (Number.isNaN(v)) { image.data[p + 3] = 0; continue; }
+      const [R, G, B] = color((v - info.z_min) / span);
+      image.data[p] = R; image.data[p + 1] = G; image.data[p + 2] = B; image.data[p + 3] = 255;
+    }
+  }
+  const bitmap = document.createElement('canvas');
+  bitmap.width = bitmap.height = n;
+  bitmap.getContext('2d').putImageData(image, 0, 0);
+  tile.bitmap = bitmap;
+  return tile;
+}
+
+function request(z, i, j) {
+  const key = z + '/' + i + '/' + j;
+  if (!tiles.has(key)) {
+    tiles.set(key, null);
+    // Um tile que saiu da vista enquanto chegava não é decodificado.
+    fetch('/tile/' + key).then(r => r.json()).then(t => { if (tiles.has(key)) { tiles.set(key, decode(t)); draw(); } })
+      .catch(() => tiles.delete(key));
+  }
+  return tiles.get(key);
+}
+
+// Tiles de outros níveis ou fora da vista (com a margem de um tile) saem da memória.
+function evict(z, i0, i1, j0, j1) {
+  for (const key of tiles.keys()) {
+    const [tz, ti, tj] = key.split('/').map(Number);
+    if (tz !== z || ti < i0 - 1 || ti > i1 + 1 || tj < j0 - 1 || tj > j1 + 1) tiles.delete(key);
+  }
+}
+
+function toScreen(x, y) {
+  return [(x - view.x0) / (view.x1 - view.x0) * canvas.width,
+          (view.y1 - y) / (view.y1 - view.y0) * canvas.height];
+}
+
+function draw() {
+  if (!info) return;
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+  const width0 = info.x_range[1] - info.x_range[0], height0 = info.y_range[1] - info.y_range[0];
+  // Nível em que um tile ocupa cerca de tile_size pixels na tela.
+  const pixels = canvas.width / (view.x1 - view.x0) * width0;
+  const z = Math.max(0, Math.min(info.max_zoom, Math.round(Math.log2(pixels / info.tile_size))));
+  const w = width0 / 2 ** z, h = height0 / 2 ** z;
+  const i0 = Math.floor((view.x0 - info.x_range[0]) / w), i1 = Math.floor((view.x1 - info.x_range[0]) / w);
+  const j0 = Math.floor((view.y0 - info.y_range[0]) / h), j1 = Math.floor((view.y1 - info.y_range[0]) / h);
+  evict(z, i0, i1, j0, j1);
+  let loaded = 0, total = 0;
+  for (let i = i0; i <= i1; i++) {
+    for (let j = j0; j <= j1; j++) {
+      total++;
+      const tile = request(z, i, j);
+      if (!tile) continue;
+      loaded++;
+      const [sx0, sy1] = toScreen(tile.x0, tile.y0), [sx1, sy0] = toScreen(tile.x1, tile.y1);
+      ctx.imageSmoothingEnabled = true;
+      ctx.drawImage(tile.bitmap, sx0, sy0, sx1 - sx0, sy1 - sy0);
+      ctx.strokeStyle = 'rgba(255,255,255,.8)';
+      ctx.lineWidth = 1;
+      for (const line of tile.contours) {
+        ctx.beginPath();
+        for (let k = 0; k < line.x.length; k++) {
+          const [px, py] = toScreen(line.x[k], line.y[k]);
+          if (k === 0) ctx.moveTo(px, py); else ctx.lineTo(px, py);
+        }
+        ctx.stroke();
+      }
+    }
+  }
+  status.textContent = info.expression + '   x: [' + view.x0.toPrecision(6) + ', ' + view.x1.toPrecision(6) +
+    ']   y: [' + view.y0.toPrecision(6) + ', ' + view.y1.toPrecision(6) + ']   nível ' + z +
+    '   tiles ' + loaded + '/' + total;
+}
+
+function resize() {
+  canvas.width = canvas.clientWidth;
+  canvas.height = canvas.clientHeight;
+  draw();
+}
+
+let drag = null;
+canvas.addEventListener('mousedown', e => { drag = [e.clientX, e.clientY, { ...view }]; canvas.style.cursor = 'grabbing'; });
+window.addEventListener('mouseup', () => { drag = null; canvas.style.cursor = 'grab'; });
+window.addEventListener('mousemove', e => {
+  if (!drag) return;
+  const dx = (e.clientX - drag[0]) / canvas.width * (drag[2].x1 - drag[2].x0);
+  const dy = (e.clientY - drag[1]) / canvas.height * (drag[2].y1 - drag[2].y0);
+  view = { x0: drag[2].x0 - dx, x1: drag[2].x1 - dx, y0: drag[2].y0 + dy, y1: drag[2].y1 + dy };
+  draw();
+});
+canvas.addEventListener('wheel', e => {
+  e.preventDefault();
+  const factor = Math.exp(e.deltaY * 0.0015);
+  const fx = e.offsetX / canvas.width, fy = 1 - e.offsetY / canvas.height;
+  const x = view.x0 + fx * (view.x1 - view.x0), y = view.y0 + fy * (view.y1 - view.y0);
+  view = { x0: x - (x - view.x0) * factor, x1: x + (view.x1 - x) * factor,
+           y0: y - (y - view.y0) * factor, y1: y + (view.y1 - y) * factor };
+  draw();
+}, { passive: false });
+window.addEventListener('resize', resize);
+
+fetch('/info').then(r => r.json()).then(data => {
+  info = data;
+  view = { x0: info.x_range[0], x1: info.x_range[1], y0: info.y_range[0], y1: info.y_range[1] };
+  resize();
+});
+</script>
+</body>
+</html>
+"""
+
+
+if __name__ == '__main__':
+    sys.exit(main())